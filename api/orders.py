@@ -0,0 +1,234 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, Field
+
+from database.database import get_db
+from orderfetch import ORDER_VIEWS, MAX_BATCH_ORDERS, fetch_order_view, iter_order_view, order_view_etag
+from services.order_summary_service import OrderSummaryService
+from services.export_service import ORDER_CSV_COLUMNS, export_response, order_csv_rows
+from services.response_cache import response_cache
+from services.db_executor import db_executor
+from services.dataloader import order_loader, request_singleflight, run_with_session
+from services.etag import etag_matches, not_modified
+from services.json_response import FastJSONResponse
+from services.auth_service import AuthService, oauth2_scheme
+
+router = APIRouter(
+    prefix="/orders",
+    tags=["orders"],
+    responses={404: {"description": "Not found"}},
+)
+
+class OrderBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_ORDERS)
+
+@router.get("/summary", response_model=Dict[str, Any])
+async def get_order_summary(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Get the number of orders in each dashboard tab for the authenticated user
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+        return {
+            "success": True,
+            "data": OrderSummaryService.get_order_summary(user_id, db)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _get_order_batch(token: str, order_ids: List[int]):
+    # Verify token and get user ID
+    user_id = AuthService.get_current_user_id(token)
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+    order_ids = list(dict.fromkeys(order_ids))
+    if len(order_ids) > MAX_BATCH_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ORDERS} orders can be fetched at once")
+
+    # Coalesced with the lookups of concurrent requests into one query
+    loaded = await order_loader.load_many(order_ids)
+    orders = {
+        order_id: order for order_id, order in loaded.items()
+        if order is not None and order["buyer_id"] == user_id
+    }
+    return FastJSONResponse({
+        "success": True,
+        "data": {
+            "orders": orders,
+            "missing": [order_id for order_id in order_ids if order_id not in orders]
+        }
+    })
+
+@router.get("/batch", response_class=FastJSONResponse)
+async def get_order_batch(
+    ids: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Get up to MAX_BATCH_ORDERS orders of the authenticated user with their products,
+    keyed by order ID; `ids` is comma-separated
+    """
+    try:
+        try:
+            order_ids = [int(order_id) for order_id in ids.split(",") if order_id.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be a comma-separated list of order IDs")
+        if not order_ids:
+            raise HTTPException(status_code=400, detail="ids must not be empty")
+        return await _get_order_batch(token, order_ids)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch", response_class=FastJSONResponse)
+async def post_order_batch(
+    request: OrderBatchRequest,
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Same as GET /orders/batch with the IDs in the request body
+    """
+    try:
+        return await _get_order_batch(token, request.ids)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/view/{view_name}", response_class=FastJSONResponse)
+async def get_order_view(
+    view_name: str,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    order_search_item: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    source_option: Optional[str] = "ALL",
+    store_by: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: str = "exact",
+    fields: Optional[str] = None,
+    include_products: bool = True,
+    token: str = Depends(oauth2_scheme),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get one page of a dashboard tab for the authenticated user through the
+    column-tuple fetch path, encoded straight to JSON bytes.
+    `fields` is a comma-separated sparse fieldset (e.g. order_serial,date_purchased,status,total_quantity);
+    include_products=false leaves the products out without loading product rows
+    (total_quantity, if requested, is summed in SQL).
+    Answers 304 when If-None-Match carries the current ETag.
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+        if view_name not in ORDER_VIEWS:
+            raise HTTPException(status_code=404, detail=f"Unknown order view: {view_name}")
+
+        field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        filters = (view_name, user_id, from_date, to_date, order_search_item)
+        etag = await db_executor.run(
+            run_with_session, order_view_etag, *filters, source_option,
+            page=page, page_size=page_size, store_by=store_by, cursor=cursor, count_mode=count_mode,
+            fields=field_list, include_products=include_products
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        # Identical requests in flight at the same time share one fetch
+        flight_key = (user_id, view_name, from_date, to_date, order_search_item, page, page_size, source_option,
+                      store_by, cursor, count_mode, tuple(field_list) if field_list else None, include_products)
+        data = await request_singleflight.do(flight_key, lambda: db_executor.run(
+            run_with_session, fetch_order_view, *filters, page, page_size, source_option, store_by, cursor,
+            fetch_mode="columns", count_mode=count_mode, fields=field_list, include_products=include_products
+        ))
+        return FastJSONResponse({"success": True, "data": data}, headers={"ETag": etag})
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache-metrics", response_model=Dict[str, Any])
+async def get_cache_metrics(token: str = Depends(oauth2_scheme)):
+    """
+    Get hit / miss counters of the order list response cache
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+        return {
+            "success": True,
+            "data": response_cache.metrics()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+async def export_orders(
+    view: str = "all",
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    order_search_item: Optional[str] = None,
+    source_option: Optional[str] = "ALL",
+    store_by: Optional[str] = None,
+    export_format: str = Query("csv", alias="format"),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Stream every order of a dashboard tab for the authenticated user as CSV or NDJSON
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+        if view not in ORDER_VIEWS:
+            raise HTTPException(status_code=400, detail=f"Invalid view. Use one of {', '.join(ORDER_VIEWS)}")
+
+        return export_response(
+            lambda db: iter_order_view(
+                db, view, user_id, from_date, to_date, order_search_item, source_option, store_by
+            ),
+            export_format,
+            filename=f"orders-{view}",
+            csv_columns=ORDER_CSV_COLUMNS,
+            csv_rows=order_csv_rows,
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
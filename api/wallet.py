@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional
-from pydantic import BaseModel
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, Field
 
 from database.database import get_db
 from services.stats_service import StatsService
+from services.db_executor import db_executor
+from services.dataloader import balance_loader
+from services.wallet_group_commit import wallet_group_committer
+from services.ledger_service import LedgerService
+from services.export_service import WALLET_CSV_COLUMNS, export_response
+from services.etag import etag_matches, not_modified
 from services.auth_service import AuthService, oauth2_scheme
 from models.customer_balance import CustomerBalance
 
@@ -14,15 +22,27 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Most updates accepted by one /wallet/update-batch call
+MAX_BATCH_UPDATES = 1000
+
 class WalletUpdateRequest(BaseModel):
-    amount: float
+    amount: Decimal = Field(..., gt=0, max_digits=10, decimal_places=2)
     transaction_type: str  # "add" or "subtract"
     description: Optional[str] = None
 
+class WalletBatchUpdateRequest(BaseModel):
+    updates: List[WalletUpdateRequest] = Field(..., min_length=1, max_length=MAX_BATCH_UPDATES)
+
 @router.get("/balance", response_model=Dict)
-async def get_wallet_balance(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_wallet_balance(
+    response: Response,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
+):
     """
-    Get the current wallet balance for the authenticated user
+    Get the current wallet balance for the authenticated user.
+    Answers 304 when If-None-Match carries the current ETag.
     """
     try:
         # Verify token and get user ID
@@ -31,21 +51,27 @@ async def get_wallet_balance(token: str = Depends(oauth2_scheme), db: Session =
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
         
-        # Get user's wallet balance using the existing service
-        balance_data = StatsService.get_reseller_balance(user_id, db)
+        etag = await db_executor.run(StatsService.get_wallet_etag, user_id, db)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
+        # Get user's wallet balance; concurrent lookups share one query
+        balance_data = await balance_loader.load(user_id)
+        response.headers["ETag"] = etag
         
         return {
             "success": True,
             "data": balance_data
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/update", response_model=Dict[str, Any])
 async def update_wallet_balance(
     request: WalletUpdateRequest,
-    token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme)
 ):
     """
     Update the wallet balance by adding or subtracting an amount
@@ -59,13 +85,12 @@ async def update_wallet_balance(
         
         description = request.description or f"Wallet {request.transaction_type} of {request.amount}"
         
-        # Update balance using the enhanced service
-        result = StatsService.update_reseller_balance(
+        # Update balance; concurrent updates share one commit
+        result = await wallet_group_committer.submit(
             customer_id=user_id,
             amount=request.amount,
             transaction_type=request.transaction_type,
-            description=description,
-            db=db
+            description=description
         )
         
         return {
@@ -78,16 +103,59 @@ async def update_wallet_balance(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/update-batch", response_model=Dict[str, Any])
+async def update_wallet_balance_batch(
+    request: WalletBatchUpdateRequest,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply many wallet updates atomically: either all of them succeed or none is applied
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+        
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        
+        updates = [
+            {
+                "customer_id": user_id,
+                "amount": update.amount,
+                "transaction_type": update.transaction_type,
+                "description": update.description or f"Wallet {update.transaction_type} of {update.amount}",
+            }
+            for update in request.updates
+        ]
+        results = await db_executor.run(StatsService.apply_balance_updates, updates, db)
+        
+        return {
+            "success": True,
+            "data": results,
+            "message": f"{len(results)} wallet updates applied successfully"
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/transactions", response_model=Dict[str, Any])
 async def get_wallet_transactions(
+    response: Response,
     transaction_type: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_count: bool = True,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
-    Get wallet transaction history for the authenticated user
+    Get wallet transaction history for the authenticated user.
+    Pass the returned next_cursor to fetch the following page; include_count=false
+    skips counting the whole history. Answers 304 when If-None-Match carries the current ETag.
     """
     try:
         # Verify token and get user ID
@@ -103,18 +171,151 @@ async def get_wallet_transactions(
                 detail="Invalid transaction_type. Must be 'add', 'subtract', or omitted for all transactions."
             )
         
+        etag = await db_executor.run(
+            StatsService.get_wallet_etag, user_id, db, transaction_type, page, page_size, cursor, include_count
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
         # Get transaction history
-        transactions = StatsService.get_wallet_transactions(
+        transactions = await db_executor.run(
+            StatsService.get_wallet_transactions,
             customer_id=user_id,
             transaction_type=transaction_type,
             page=page,
             page_size=page_size,
-            db=db
+            db=db,
+            cursor=cursor,
+            include_count=include_count
         )
+        response.headers["ETag"] = etag
         
         return {
             "success": True,
             "data": transactions
         }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/transactions/export")
+async def export_wallet_transactions(
+    transaction_type: Optional[str] = None,
+    export_format: str = Query("csv", alias="format"),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Stream the authenticated user's whole wallet history as CSV or NDJSON, oldest first
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+        
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        
+        # Validate transaction_type if provided
+        if transaction_type and transaction_type not in ["add", "subtract"]:
+            raise HTTPException(
+                status_code=400, 
+                detail="Invalid transaction_type. Must be 'add', 'subtract', or omitted for all transactions."
+            )
+        
+        return export_response(
+            lambda db: StatsService.iter_wallet_transactions(user_id, transaction_type, db),
+            export_format,
+            filename="wallet-transactions",
+            csv_columns=WALLET_CSV_COLUMNS,
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/ledger/balance-at", response_model=Dict[str, Any])
+async def get_balance_at(
+    at: datetime,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the authenticated user's wallet balance as it was at a point in time
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+        
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        
+        balance = await db_executor.run(LedgerService.balance_at, user_id, at, db)
+        
+        return {
+            "success": True,
+            "data": balance
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/ledger/summary", response_model=Dict[str, Any])
+async def get_ledger_summary(
+    start: datetime,
+    end: datetime,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the authenticated user's wallet adds and subtracts between two points in time
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+        
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        
+        summary = await db_executor.run(LedgerService.range_summary, user_id, start, end, db)
+        
+        return {
+            "success": True,
+            "data": summary
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/ledger/verify", response_model=Dict[str, Any])
+async def verify_wallet_ledger(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Check that the authenticated user's wallet balance matches their transaction ledger
+    """
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+        
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        
+        report = await db_executor.run(LedgerService.verify_balances, db, [user_id])
+        
+        return {
+            "success": True,
+            "data": {"consistent": not report["mismatches"], **report}
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
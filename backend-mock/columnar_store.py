@@ -0,0 +1,103 @@
+from datetime import date
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: orderController falls back to order_store.OrderStore
+    np = None
+
+from order_store import OrderSelection, parse_date
+
+
+class ColumnarOrderStore:
+    """
+    Mock orders held as NumPy columns instead of one dict per order:
+    amount, date ordinal, status and marketplace codes, the text fields as
+    byte arrays, and the items of all orders as flat arrays sliced by
+    `item_offsets`. Filters evaluate as vectorized boolean masks and order
+    dicts are built only for the orders a page returns. The columns come
+    from mock_data.load_or_generate; "search" holds "order id\nrecipient
+    name" lowercased for the search box.
+
+    Same interface as order_store.OrderStore (filter, get, len).
+    """
+
+    def __init__(self, columns: Dict):
+        self.columns = columns
+        self.statuses: List[str] = list(columns["statuses"])
+        self.marketplaces: List[str] = list(columns["marketplaces"])
+        self._status_codes = {status: code for code, status in enumerate(self.statuses)}
+        self._marketplace_codes = {marketplace: code for code, marketplace in enumerate(self.marketplaces)}
+        # Sorted order IDs and their positions, for get() by bisection
+        self._id_order = columns.get("id_order")
+        if self._id_order is None:
+            self._id_order = np.argsort(columns["order_id"], kind="stable")
+        self._sorted_ids = columns["order_id"][self._id_order]
+
+    def __len__(self):
+        return len(self.columns["amount"])
+
+    def __getitem__(self, position) -> Dict:
+        """The order at `position` as a dict, in the generate_mock_orders format."""
+        c = self.columns
+        position = int(position)
+        start, end = int(c["item_offsets"][position]), int(c["item_offsets"][position + 1])
+        return {
+            "order_id": c["order_id"][position].decode(),
+            "marketplace": self.marketplaces[c["marketplace"][position]],
+            "status": self.statuses[c["status"][position]],
+            "amount": float(c["amount"][position]),
+            "date_purchased": date.fromordinal(int(c["date"][position])).isoformat(),
+            "delivery_name": c["delivery_name"][position].decode(),
+            "delivery_address": c["delivery_address"][position].decode(),
+            "delivery_phone": c["delivery_phone"][position].decode(),
+            "items": [
+                {
+                    "item_id": item_id.decode(),
+                    "product_name": product_name.decode(),
+                    "quantity": int(quantity),
+                    "price": float(price),
+                }
+                for item_id, product_name, quantity, price in zip(
+                    c["item_id"][start:end], c["item_product_name"][start:end],
+                    c["item_quantity"][start:end], c["item_price"][start:end],
+                )
+            ],
+        }
+
+    def get(self, order_id: str) -> Optional[Dict]:
+        key = order_id.encode()
+        index = int(np.searchsorted(self._sorted_ids, key))
+        if index < len(self._sorted_ids) and self._sorted_ids[index] == key:
+            return self[self._id_order[index]]
+        return None
+
+    def filter(self, from_date=None, to_date=None, order_search_item=None, source_option=None, status=None) -> OrderSelection:
+        """Same filters and result order as OrderStore.filter."""
+        c = self.columns
+        mask = np.ones(len(self), dtype=bool)
+        if status:
+            code = self._status_codes.get(status)
+            if code is None:
+                return OrderSelection(self, [])
+            mask &= c["status"] == code
+        if source_option and source_option != "All":
+            code = self._marketplace_codes.get(source_option)
+            if code is None:
+                return OrderSelection(self, [])
+            mask &= c["marketplace"] == code
+
+        # Invalid dates are ignored, as before
+        low, high = parse_date(from_date), parse_date(to_date)
+        if low is not None:
+            mask &= c["date"] >= low
+        if high is not None:
+            mask &= c["date"] <= high
+
+        if order_search_item and order_search_item.strip():
+            term = order_search_item.lower()
+            if "\n" in term:
+                # Would straddle the two fields of the search column
+                return OrderSelection(self, [])
+            mask &= np.char.find(c["search"], term.encode()) >= 0
+        return OrderSelection(self, np.flatnonzero(mask))
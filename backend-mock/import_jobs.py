@@ -0,0 +1,216 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Optional
+
+import order_import
+from order_import import ImportStats
+
+# Background import workers
+IMPORT_WORKERS = int(os.environ.get("MOCK_IMPORT_WORKERS", "2"))
+# Uploaded files are kept here until their job completes
+SPOOL_DIR = os.environ.get(
+    "MOCK_IMPORT_SPOOL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_spool")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS import_jobs (
+    job_id TEXT PRIMARY KEY,
+    filename TEXT,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total_bytes INTEGER NOT NULL,
+    byte_offset INTEGER NOT NULL DEFAULT 0,
+    lines_read INTEGER NOT NULL DEFAULT 0,
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    rows_rejected INTEGER NOT NULL DEFAULT 0,
+    orders_upserted INTEGER NOT NULL DEFAULT 0,
+    elapsed REAL NOT NULL DEFAULT 0,
+    errors TEXT NOT NULL DEFAULT '[]',
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+# Jobs left in these states by a stopped server are picked up again on startup
+UNFINISHED = ("queued", "running")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_stopping = threading.Event()
+
+
+class _Interrupted(Exception):
+    """Raised inside a batch transaction to stop a job at shutdown; the batch rolls back."""
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def connect() -> sqlite3.Connection:
+    conn = order_import.connect()
+    conn.executescript(SCHEMA)
+    conn.row_factory = sqlite3.Row
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(import_jobs)")}
+    if "lines_read" not in columns:
+        # Job tables created before line numbers were checkpointed
+        conn.execute("ALTER TABLE import_jobs ADD COLUMN lines_read INTEGER NOT NULL DEFAULT 0")
+    return conn
+
+
+def _submit(job_id: str) -> None:
+    global _executor
+    _stopping.clear()
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="order-import")
+    _executor.submit(run_job, job_id)
+
+
+def create_job(stream: BinaryIO, filename: Optional[str]) -> str:
+    """
+    Spool an upload to disk, check its header and queue it for import.
+    Raises order_import.CSVImportError when the file can not be imported at all.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    path = os.path.join(SPOOL_DIR, f"{job_id}.csv")
+    stream.seek(0)
+    with open(path, "wb") as spooled:
+        shutil.copyfileobj(stream, spooled, 1024 * 1024)
+    try:
+        with open(path, "rb") as spooled:
+            order_import.read_header(spooled)
+    except order_import.CSVImportError:
+        os.remove(path)
+        raise
+
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO import_jobs (job_id, filename, path, status, total_bytes, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, filename, path, os.path.getsize(path), _now(), _now()),
+            )
+    finally:
+        conn.close()
+    _submit(job_id)
+    return job_id
+
+
+def run_job(job_id: str) -> None:
+    """Import a job's file from its last checkpoint, checkpointing after every batch."""
+    conn = connect()
+    try:
+        job = conn.execute("SELECT * FROM import_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if job is None or job["status"] not in UNFINISHED:
+            return
+        with conn:
+            conn.execute("UPDATE import_jobs SET status = 'running', updated_at = ? WHERE job_id = ?", (_now(), job_id))
+
+        stats = ImportStats(
+            rows_processed=job["rows_processed"],
+            rows_rejected=job["rows_rejected"],
+            orders_upserted=job["orders_upserted"],
+            bytes_processed=job["byte_offset"],
+            lines_read=job["lines_read"],
+            elapsed=job["elapsed"],
+            errors=json.loads(job["errors"]),
+        )
+
+        def checkpoint(stats: ImportStats, offset: int):
+            conn.execute(
+                "UPDATE import_jobs SET byte_offset = ?, lines_read = ?, rows_processed = ?, rows_rejected = ?, "
+                "orders_upserted = ?, elapsed = ?, errors = ?, updated_at = ? WHERE job_id = ?",
+                (offset, stats.lines_read, stats.rows_processed, stats.rows_rejected, stats.orders_upserted,
+                 stats.elapsed, json.dumps(stats.errors), _now(), job_id),
+            )
+            if _stopping.is_set():
+                raise _Interrupted()
+
+        try:
+            with open(job["path"], "rb") as stream:
+                order_import.import_orders(
+                    stream, conn, start_offset=job["byte_offset"], stats=stats, on_batch=checkpoint
+                )
+        except _Interrupted:
+            # Still "running": resumed from the last checkpoint on next startup
+            return
+        except Exception as e:
+            with conn:
+                conn.execute(
+                    "UPDATE import_jobs SET status = 'failed', error = ?, updated_at = ? WHERE job_id = ?",
+                    (str(e), _now(), job_id),
+                )
+            return
+
+        with conn:
+            conn.execute("UPDATE import_jobs SET status = 'completed', updated_at = ? WHERE job_id = ?", (_now(), job_id))
+        os.remove(job["path"])
+    finally:
+        conn.close()
+
+
+def get_job(job_id: str) -> Optional[Dict]:
+    conn = connect()
+    try:
+        job = conn.execute("SELECT * FROM import_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if job is None:
+        return None
+
+    total, offset, elapsed = job["total_bytes"], job["byte_offset"], job["elapsed"]
+    eta = None
+    if job["status"] == "completed":
+        eta = 0.0
+    elif job["status"] in UNFINISHED and offset and elapsed:
+        # Remaining bytes at the average byte rate so far
+        eta = round(elapsed * (total - offset) / offset, 1)
+    return {
+        "job_id": job["job_id"],
+        "filename": job["filename"],
+        "status": job["status"],
+        "rows_processed": job["rows_processed"],
+        "rows_rejected": job["rows_rejected"],
+        "orders_upserted": job["orders_upserted"],
+        "bytes_processed": offset,
+        "total_bytes": total,
+        "progress": round(offset / total, 4) if total else 1.0,
+        "rows_per_second": round(job["rows_processed"] / elapsed, 1) if elapsed else 0.0,
+        "eta_seconds": eta,
+        "errors": json.loads(job["errors"]),
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+def resume_unfinished_jobs() -> int:
+    """Queue every job an earlier server process did not finish; returns how many."""
+    conn = connect()
+    try:
+        placeholders = ", ".join("?" for _ in UNFINISHED)
+        job_ids = [row["job_id"] for row in conn.execute(
+            f"SELECT job_id FROM import_jobs WHERE status IN ({placeholders}) ORDER BY created_at", UNFINISHED
+        )]
+    finally:
+        conn.close()
+    for job_id in job_ids:
+        _submit(job_id)
+    return len(job_ids)
+
+
+def shutdown() -> None:
+    """Stop workers after their current batch; interrupted jobs resume on next startup."""
+    global _executor
+    _stopping.set()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,9 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import uvicorn
 import orderController
+import import_jobs
 
-app = FastAPI(title="Dropship Nexus API Mock")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Continue imports interrupted by a restart from their last checkpoint
+    import_jobs.resume_unfinished_jobs()
+    yield
+    import_jobs.shutdown()
+
+app = FastAPI(lifespan=lifespan, title="Dropship Nexus API Mock")
 
 # Setup CORS
 app.add_middleware(
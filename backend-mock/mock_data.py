@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import date
+from typing import Dict, Optional
+
+import numpy as np
+
+# Bump when the generated data changes, so stale caches are not reused
+GENERATOR_VERSION = 1
+
+CACHE_DIR = os.environ.get(
+    "MOCK_DATA_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_data_cache")
+)
+
+# (value, share of orders)
+MARKETPLACES = [("Amazon", 0.38), ("Flipkart", 0.27), ("Meesho", 0.17), ("Shopify", 0.10), ("Others", 0.08)]
+STATUSES = [
+    ("delivered", 0.34), ("shipped", 0.18), ("processing", 0.12), ("paid", 0.10), ("pending", 0.07),
+    ("awaiting-payment", 0.06), ("cancelled", 0.06), ("ticketed", 0.04), ("abnormal", 0.03),
+]
+CITIES = ["Mumbai", "Delhi", "Bengaluru", "Hyderabad", "Chennai", "Kolkata", "Pune", "Ahmedabad", "Jaipur", "Lucknow"]
+# Orders are spread over this many days before the epoch, recent days busier
+DAYS = 60
+
+
+def _categorical(rng, choices, count):
+    values, shares = zip(*choices)
+    return list(values), rng.choice(len(values), size=count, p=np.array(shares) / sum(shares)).astype(np.int8)
+
+
+def _text(*parts):
+    """
+    Concatenate byte strings and arrays elementwise into one byte array,
+    narrowed to its longest value (int-to-bytes casts are 21 bytes wide).
+    """
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    width = int(np.char.str_len(result).max()) if result.size else 1
+    return result.astype(f"S{width}")
+
+
+def generate_columns(count: int, seed: int) -> Dict:
+    """
+    Generate `count` orders as the columns ColumnarOrderStore takes, with
+    NumPy's generator seeded by `seed`: the same (count, seed) always gives
+    the same orders. Dates are stored as days before the epoch ("days_ago")
+    and resolved when loaded, so one cache serves any epoch.
+    """
+    rng = np.random.default_rng(seed)
+    numbers = (np.arange(1, count + 1) + 100000).astype(np.bytes_)
+    customers = np.arange(1, count + 1).astype(np.bytes_)
+
+    marketplaces, marketplace = _categorical(rng, MARKETPLACES, count)
+    statuses, status = _categorical(rng, STATUSES, count)
+    days_ago = (1 + rng.exponential(DAYS / 3, count).astype(np.int16) % DAYS).astype(np.int16)
+    amount = np.round(np.clip(rng.lognormal(np.log(2500), 0.7, count), 500, 15000), 2)
+
+    # 70% of orders have one item, the rest two to five
+    item_counts = np.where(rng.random(count) < 0.7, 1, rng.integers(2, 6, count))
+    item_offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(item_counts, out=item_offsets[1:])
+    items = int(item_offsets[-1])
+    item_order = np.repeat(np.arange(count), item_counts)
+    item_numbers = (np.arange(items) - item_offsets[item_order] + 1).astype(np.bytes_)
+    item_customers = customers[item_order]
+
+    order_id = _text(b"ORD-", numbers)
+    delivery_name = _text(b"Customer ", customers)
+    city = np.array([name.encode() for name in CITIES], dtype=np.bytes_)[rng.integers(0, len(CITIES), count)]
+    return {
+        "order_id": order_id,
+        "delivery_name": delivery_name,
+        "delivery_address": _text(b"Address ", customers, b", ", city, b", India"),
+        "delivery_phone": _text(b"+91 ", rng.integers(7000000000, 10000000000, count).astype(np.bytes_)),
+        "search": np.char.lower(_text(order_id, b"\n", delivery_name)),
+        "amount": amount,
+        "days_ago": days_ago,
+        "status": status,
+        "statuses": statuses,
+        "marketplace": marketplace,
+        "marketplaces": marketplaces,
+        # Sorted once here and cached, so ColumnarOrderStore skips it on start
+        "id_order": np.argsort(order_id, kind="stable"),
+        "item_offsets": item_offsets,
+        "item_id": _text(b"ITEM-", item_customers, b"-", item_numbers),
+        "item_product_name": _text(b"Product ", item_customers, b"-", item_numbers),
+        "item_quantity": np.minimum(rng.geometric(0.55, items), 5).astype(np.int16),
+        "item_price": np.round(np.clip(rng.lognormal(np.log(700), 0.6, items), 100, 3000), 2),
+    }
+
+
+def _resolve_dates(columns: Dict, epoch: date) -> Dict:
+    columns["date"] = epoch.toordinal() - columns["days_ago"].astype(np.int32)
+    return columns
+
+
+def save_columns(columns: Dict, path: str) -> None:
+    """
+    Write every array column to `path/<name>.npy` and the category lists to
+    `path/meta.json`. The directory is written under a temporary name and
+    renamed, so a reader never sees a partial cache.
+    """
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        meta = {}
+        for name, value in columns.items():
+            if isinstance(value, np.ndarray):
+                np.save(os.path.join(staging, f"{name}.npy"), value)
+            else:
+                meta[name] = value
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.replace(staging, path)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+
+
+def load_columns(path: str) -> Dict:
+    """Map the columns saved by save_columns read-only; pages load from disk on first access."""
+    with open(os.path.join(path, "meta.json")) as f:
+        columns = json.load(f)
+    for filename in os.listdir(path):
+        if filename.endswith(".npy"):
+            columns[filename[:-4]] = np.load(os.path.join(path, filename), mmap_mode="r")
+    return columns
+
+
+def load_or_generate(count: int, seed: int, cache_dir: str = CACHE_DIR, epoch: Optional[date] = None) -> Dict:
+    """
+    Columns for (count, seed): mapped from the cache when an earlier run
+    generated them, otherwise generated and cached for the next start.
+    Dates count back from `epoch` (default: today).
+    """
+    path = os.path.join(cache_dir, f"orders-{count}-seed{seed}-v{GENERATOR_VERSION}")
+    if not os.path.isfile(os.path.join(path, "meta.json")):
+        save_columns(generate_columns(count, seed), path)
+    return _resolve_dates(load_columns(path), epoch or date.today())
@@ -1,105 +1,108 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, Body
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 import json
-from datetime import datetime, timedelta
+import os
+from datetime import date, timedelta
 import random
 import csv
-from io import StringIO
+import order_import
+import import_jobs
+from order_store import OrderStore
+from columnar_store import ColumnarOrderStore, np
 
 router = APIRouter()
 
 # Mock data generator
-def generate_mock_orders(count=50):
+def generate_mock_orders(count=50, seed=None, epoch=None):
+    return list(iter_mock_orders(count, seed, epoch))
+
+def iter_mock_orders(count=50, seed=None, epoch=None):
+    # Same seed and epoch, same orders; dates fall in the 60 days before `epoch`
+    rng = random.Random(seed)
+    epoch = epoch or mock_data_epoch()
     statuses = ["shipped", "processing", "delivered", "pending", "paid", "cancelled", "awaiting-payment", "ticketed", "abnormal"]
     marketplaces = ["Amazon", "Flipkart", "Meesho", "Shopify", "Others"]
     
-    orders = []
     for i in range(1, count + 1):
-        order_date = datetime.now() - timedelta(days=random.randint(1, 60))
-        status = random.choice(statuses)
+        order_date = epoch - timedelta(days=rng.randint(1, 60))
+        status = rng.choice(statuses)
         
         order = {
             "order_id": f"ORD-{100000 + i}",
-            "marketplace": random.choice(marketplaces),
+            "marketplace": rng.choice(marketplaces),
             "status": status,
-            "amount": round(random.uniform(500, 15000), 2),
+            "amount": round(rng.uniform(500, 15000), 2),
             "date_purchased": order_date.strftime("%Y-%m-%d"),
             "delivery_name": f"Customer {i}",
             "delivery_address": f"Address {i}, City, Country",
-            "delivery_phone": f"+91 {random.randint(7000000000, 9999999999)}",
+            "delivery_phone": f"+91 {rng.randint(7000000000, 9999999999)}",
             "items": [
                 {
                     "item_id": f"ITEM-{i}-1",
                     "product_name": f"Product {i}-1",
-                    "quantity": random.randint(1, 5),
-                    "price": round(random.uniform(100, 3000), 2)
+                    "quantity": rng.randint(1, 5),
+                    "price": round(rng.uniform(100, 3000), 2)
                 }
             ]
         }
         
         # Add more items for some orders
-        if random.random() > 0.7:
-            for j in range(2, random.randint(3, 6)):
+        if rng.random() > 0.7:
+            for j in range(2, rng.randint(3, 6)):
                 order["items"].append({
                     "item_id": f"ITEM-{i}-{j}",
                     "product_name": f"Product {i}-{j}",
-                    "quantity": random.randint(1, 3),
-                    "price": round(random.uniform(100, 3000), 2)
+                    "quantity": rng.randint(1, 3),
+                    "price": round(rng.uniform(100, 3000), 2)
                 })
         
-        orders.append(order)
-    
-    return orders
+        yield order
+
+# Orders to generate; raise it (e.g. to 100000) for frontend load testing
+MOCK_ORDER_COUNT = int(os.environ.get("MOCK_ORDER_COUNT", "100"))
+# Seed of the generated orders, so every start serves the same data
+MOCK_DATA_SEED = int(os.environ.get("MOCK_DATA_SEED", "42"))
+# Day (YYYY-MM-DD) the generated dates count back from, so the seeded data
+# does not shift with the calendar; "today" follows the clock instead
+MOCK_DATA_EPOCH = os.environ.get("MOCK_DATA_EPOCH", "2025-01-01")
+
+
+def mock_data_epoch() -> date:
+    if MOCK_DATA_EPOCH == "today":
+        return date.today()
+    return date.fromisoformat(MOCK_DATA_EPOCH)
+
+
+# "indexed" keeps the orders as dicts with precomputed indexes, "columnar"
+# (opt-in, needs numpy) as NumPy arrays, which take far less memory per order.
+# The two do not serve the same data for one MOCK_DATA_SEED: columnar
+# generates with NumPy (mock_data.generate_columns), indexed with Python's
+# random (generate_mock_orders). Order IDs and names match, but statuses,
+# amounts, dates and items differ, and addresses read "Address 7, Mumbai,
+# India" instead of "Address 7, City, Country".
+MOCK_ORDER_STORE = os.environ.get("MOCK_ORDER_STORE", "indexed")
 
 # Pre-generate some mock orders
-mock_orders = generate_mock_orders(100)
+if MOCK_ORDER_STORE == "columnar":
+    if np is None:
+        raise RuntimeError("MOCK_ORDER_STORE=columnar requires numpy")
+    # Generated vectorized on the first start and memory-mapped from
+    # mock_data_cache/ afterwards (see mock_data.py)
+    import mock_data
+    order_store = ColumnarOrderStore(mock_data.load_or_generate(MOCK_ORDER_COUNT, MOCK_DATA_SEED, epoch=mock_data_epoch()))
+else:
+    # Dates, status/marketplace posting lists and search text, indexed once
+    order_store = OrderStore(generate_mock_orders(MOCK_ORDER_COUNT, MOCK_DATA_SEED, mock_data_epoch()))
+
+# Most orders returned by one /orders/batch call
+MAX_BATCH_ORDERS = 100
 
 # Helper function to filter orders
-def filter_orders(orders, from_date=None, to_date=None, order_search_item=None, source_option=None, status=None):
-    filtered_orders = orders.copy()
-    
-    # Filter by status
-    if status:
-        filtered_orders = [order for order in filtered_orders if order["status"] == status]
-    
-    # Filter by marketplace (source)
-    if source_option and source_option != "All":
-        filtered_orders = [order for order in filtered_orders if order["marketplace"] == source_option]
-    
-    # Filter by date range
-    if from_date and from_date.strip():
-        try:
-            from_datetime = datetime.strptime(from_date, "%Y-%m-%d")
-            filtered_orders = [
-                order for order in filtered_orders 
-                if datetime.strptime(order["date_purchased"], "%Y-%m-%d") >= from_datetime
-            ]
-        except ValueError:
-            # Skip date filtering if format is invalid
-            pass
-    
-    if to_date and to_date.strip():
-        try:
-            to_datetime = datetime.strptime(to_date, "%Y-%m-%d")
-            filtered_orders = [
-                order for order in filtered_orders 
-                if datetime.strptime(order["date_purchased"], "%Y-%m-%d") <= to_datetime
-            ]
-        except ValueError:
-            # Skip date filtering if format is invalid
-            pass
-    
-    # Filter by search term (across order ID or recipient name)
-    if order_search_item and order_search_item.strip():
-        search_term = order_search_item.lower()
-        filtered_orders = [
-            order for order in filtered_orders 
-            if (search_term in order["order_id"].lower() or 
-                search_term in order["delivery_name"].lower())
-        ]
-    
-    return filtered_orders
+def filter_orders(store, from_date=None, to_date=None, order_search_item=None, source_option=None, status=None):
+    # Runs on the store's precomputed indexes instead of scanning every order
+    return store.filter(from_date, to_date, order_search_item, source_option, status)
 
 # Helper function to paginate results
 def paginate_orders(orders, page=1, page_size=20):
@@ -124,7 +127,7 @@ async def get_all_orders(
     page_size: int = Query(20, ge=1, le=100)
 ):
     filtered_orders = filter_orders(
-        mock_orders, 
+        order_store, 
         from_date, 
         to_date, 
         order_search_item, 
@@ -143,7 +146,7 @@ async def get_confirmed_orders(
 ):
     # Filter by confirmed status - we'll consider 'paid' as confirmed
     filtered_orders = filter_orders(
-        mock_orders, 
+        order_store, 
         from_date, 
         to_date, 
         order_search_item, 
@@ -162,7 +165,7 @@ async def get_unshipped_orders(
     page_size: int = Query(20, ge=1, le=100)
 ):
     filtered_orders = filter_orders(
-        mock_orders, 
+        order_store, 
         from_date, 
         to_date, 
         order_search_item, 
@@ -181,7 +184,7 @@ async def get_unpaid_orders(
     page_size: int = Query(20, ge=1, le=100)
 ):
     filtered_orders = filter_orders(
-        mock_orders, 
+        order_store, 
         from_date, 
         to_date, 
         order_search_item, 
@@ -201,7 +204,7 @@ async def get_returned_orders(
 ):
     # Consider 'abnormal' as returned for this mock
     filtered_orders = filter_orders(
-        mock_orders, 
+        order_store, 
         from_date, 
         to_date, 
         order_search_item, 
@@ -220,7 +223,7 @@ async def get_cancelled_orders(
     page_size: int = Query(20, ge=1, le=100)
 ):
     filtered_orders = filter_orders(
-        mock_orders, 
+        order_store, 
         from_date, 
         to_date, 
         order_search_item, 
@@ -232,45 +235,64 @@ async def get_cancelled_orders(
 @router.get('/orders/order/{order_id}')
 async def get_order_by_id(order_id: str):
     # Find the order with the given ID
-    for order in mock_orders:
-        if order["order_id"] == order_id:
-            return order
+    order = order_store.get(order_id)
+    if order is not None:
+        return order
     
     # If no order is found, raise a 404 error
     raise HTTPException(status_code=404, detail=f"Order with ID {order_id} not found")
 
-@router.post('/orders/upload')
+def get_orders_batch(order_ids: List[str]):
+    order_ids = list(dict.fromkeys(order_id.strip() for order_id in order_ids if order_id.strip()))
+    if not order_ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(order_ids) > MAX_BATCH_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ORDERS} orders can be fetched at once")
+    
+    orders = {}
+    for order_id in order_ids:
+        order = order_store.get(order_id)
+        if order is not None:
+            orders[order_id] = order
+    return {
+        "orders": orders,
+        "missing": [order_id for order_id in order_ids if order_id not in orders]
+    }
+
+@router.get('/orders/batch')
+async def get_orders_by_ids(ids: str):
+    return get_orders_batch(ids.split(","))
+
+@router.post('/orders/batch')
+async def post_orders_by_ids(ids: List[str] = Body(..., embed=True)):
+    return get_orders_batch(ids)
+
+@router.post('/orders/upload', status_code=202)
 async def upload_orders(file: UploadFile = File(...)):
     try:
-        # Read the file content
-        content = await file.read()
-        
-        # Process CSV file
-        content_str = content.decode('utf-8')
-        csv_reader = csv.DictReader(StringIO(content_str))
-        
-        # Validate CSV structure (just checking if we can read rows)
-        rows = list(csv_reader)
-        if not rows:
-            raise HTTPException(status_code=422, detail="The uploaded CSV file is empty or has no valid rows")
-        
-        # Count of processed orders
-        orders_processed = len(rows)
-        
-        # In a real implementation, you would save these orders to a database
-        
+        # Spool the upload and queue it; parsing and inserting run on the import workers
+        job_id = await run_in_threadpool(import_jobs.create_job, file.file, file.filename)
+
         return {
-            "status": "success",
-            "orders_processed": orders_processed,
-            "message": f"Successfully processed {orders_processed} orders from {file.filename}"
+            "status": "accepted",
+            "job_id": job_id,
+            "status_url": f"/orders/upload/{job_id}",
+            "message": f"Import of {file.filename} queued"
         }
-    except UnicodeDecodeError:
-        raise HTTPException(status_code=422, detail="The file is not a valid CSV or contains unsupported characters")
+    except order_import.CSVImportError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except csv.Error as e:
         raise HTTPException(status_code=422, detail=f"CSV parsing error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process order file: {str(e)}")
 
+@router.get('/orders/upload/{job_id}')
+async def get_upload_job(job_id: str):
+    job = await run_in_threadpool(import_jobs.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Import job {job_id} not found")
+    return job
+
 # Legacy endpoint for compatibility
 @router.get('/orders')
 async def get_orders_legacy(
@@ -283,7 +305,7 @@ async def get_orders_legacy(
     page_size: int = Query(20, ge=1, le=100)
 ):
     filtered_orders = filter_orders(
-        mock_orders, 
+        order_store, 
         from_date, 
         to_date, 
         order_search_item, 
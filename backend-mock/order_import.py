@@ -0,0 +1,249 @@
+import csv
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Columns of a marketplace order export (see amazon_orders.csv)
+REQUIRED_COLUMNS = ["order-id", "order-item-id", "sku", "quantity-purchased", "consumer_price"]
+ORDER_COLUMNS = {
+    "recipient-name": "recipient_name",
+    "ship-address-1": "ship_address_1",
+    "ship-address-2": "ship_address_2",
+    "ship-city": "ship_city",
+    "ship-state": "ship_state",
+    "ship-postal-code": "ship_postal_code",
+    "ship-phone-number": "ship_phone_number",
+    "source": "source",
+    "customers_email_address": "customers_email_address",
+}
+
+DEFAULT_BATCH_SIZE = 2000
+# Rejected rows whose reason is kept in ImportStats.errors
+MAX_REPORTED_ERRORS = 50
+
+IMPORT_DB_PATH = os.environ.get(
+    "MOCK_IMPORT_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_imports.sqlite3")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS imported_orders (
+    order_id TEXT PRIMARY KEY,
+    recipient_name TEXT,
+    ship_address_1 TEXT,
+    ship_address_2 TEXT,
+    ship_city TEXT,
+    ship_state TEXT,
+    ship_postal_code TEXT,
+    ship_phone_number TEXT,
+    source INTEGER,
+    customers_email_address TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imported_order_items (
+    order_item_id TEXT PRIMARY KEY,
+    order_id TEXT NOT NULL REFERENCES imported_orders(order_id),
+    sku TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    consumer_price TEXT NOT NULL,
+    orders_remark TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_imported_order_items_order_id ON imported_order_items(order_id);
+"""
+
+_ORDER_FIELDS = ["order_id", *ORDER_COLUMNS.values(), "updated_at"]
+UPSERT_ORDER = "INSERT INTO imported_orders ({cols}) VALUES ({marks}) ON CONFLICT(order_id) DO UPDATE SET {updates}".format(
+    cols=", ".join(_ORDER_FIELDS),
+    marks=", ".join("?" for _ in _ORDER_FIELDS),
+    updates=", ".join(f"{c} = excluded.{c}" for c in _ORDER_FIELDS[1:]),
+)
+UPSERT_ITEM = """
+INSERT INTO imported_order_items (order_item_id, order_id, sku, quantity, consumer_price, orders_remark)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(order_item_id) DO UPDATE SET
+    order_id = excluded.order_id, sku = excluded.sku, quantity = excluded.quantity,
+    consumer_price = excluded.consumer_price, orders_remark = excluded.orders_remark
+"""
+
+
+class CSVImportError(ValueError):
+    """The upload can not be imported at all (bad header, not UTF-8, ...)."""
+
+
+@dataclass
+class ImportStats:
+    rows_processed: int = 0
+    rows_rejected: int = 0
+    orders_upserted: int = 0
+    bytes_processed: int = 0
+    # Lines up to bytes_processed, header included; a resumed import numbers on from here
+    lines_read: int = 0
+    elapsed: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.rows_processed / self.elapsed, 1) if self.elapsed else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "rows_processed": self.rows_processed,
+            "rows_rejected": self.rows_rejected,
+            "orders_upserted": self.orders_upserted,
+            "bytes_processed": self.bytes_processed,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "rows_per_second": self.rows_per_second,
+            "errors": self.errors,
+        }
+
+
+def connect(path: str = IMPORT_DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def read_header(stream: BinaryIO) -> Tuple[List[str], int]:
+    """Parse the header line; returns (column names, byte offset of the first data row)."""
+    stream.seek(0)
+    line = stream.readline()
+    try:
+        text = line.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise CSVImportError("The file is not a valid CSV or contains unsupported characters")
+    header = next(csv.reader([text]), None)
+    if not header:
+        raise CSVImportError("The uploaded CSV file is empty or has no valid rows")
+    header = [name.strip() for name in header]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise CSVImportError(f"Missing required columns: {', '.join(missing)}")
+    return header, len(line)
+
+
+def iter_rows(
+    stream: BinaryIO, header: List[str], start_offset: int, start_line: int = 1
+) -> Iterator[Tuple[int, Dict[str, str], int]]:
+    """
+    Yield (line number, row, byte offset just past the row) from `start_offset`,
+    where `start_line` lines of the file end, reading one line at a time so
+    memory does not depend on the file size. Quoted fields spanning several
+    lines are handled by the csv module.
+    """
+    stream.seek(start_offset)
+    position = {"offset": start_offset, "line": start_line}
+
+    def lines():
+        for line in iter(stream.readline, b""):
+            position["offset"] += len(line)
+            position["line"] += 1
+            try:
+                yield line.decode("utf-8")
+            except UnicodeDecodeError:
+                raise CSVImportError(f"Line {position['line']} is not valid UTF-8")
+
+    for values in csv.reader(lines()):
+        if not any(value.strip() for value in values):
+            continue
+        yield position["line"], dict(zip(header, values)), position["offset"]
+
+
+def normalize_row(row: Dict[str, str]) -> Dict:
+    """Validate and clean one CSV row; raises ValueError with the reason."""
+    row = {key: (value or "").strip() for key, value in row.items()}
+    for name in REQUIRED_COLUMNS:
+        if not row.get(name):
+            raise ValueError(f"missing {name}")
+    try:
+        quantity = int(row["quantity-purchased"])
+    except ValueError:
+        raise ValueError("quantity-purchased is not a number")
+    if quantity <= 0:
+        raise ValueError("quantity-purchased must be positive")
+    try:
+        price = Decimal(row["consumer_price"]).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError("consumer_price is not a number")
+    if price < 0:
+        raise ValueError("consumer_price must not be negative")
+
+    order = {column: row.get(name) or None for name, column in ORDER_COLUMNS.items()}
+    if order["source"] is not None:
+        try:
+            order["source"] = int(order["source"])
+        except ValueError:
+            raise ValueError("source is not a number")
+    return {
+        "order_id": row["order-id"],
+        "order": order,
+        "item": (row["order-item-id"], row["order-id"], row["sku"], quantity, str(price), row.get("orders_remark") or None),
+    }
+
+
+def write_batch(conn: sqlite3.Connection, batch: List[Dict]) -> int:
+    """
+    Upsert one batch, grouping items under their order, in the caller's
+    transaction; returns the number of orders written.
+    """
+    orders: Dict[str, Dict] = {}
+    for entry in batch:
+        orders[entry["order_id"]] = entry["order"]
+    now = time.strftime("%Y-%m-%dT%H:%M:%S")
+    conn.executemany(
+        UPSERT_ORDER,
+        [(order_id, *order.values(), now) for order_id, order in orders.items()],
+    )
+    conn.executemany(UPSERT_ITEM, [entry["item"] for entry in batch])
+    return len(orders)
+
+
+def import_orders(
+    stream: BinaryIO,
+    conn: sqlite3.Connection,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_offset: int = 0,
+    stats: Optional[ImportStats] = None,
+    on_batch: Optional[Callable[[ImportStats, int], None]] = None,
+) -> ImportStats:
+    """
+    Stream a marketplace order CSV into the import tables.
+
+    Rows are validated as they are read and written in batches of
+    `batch_size` with INSERT ... ON CONFLICT, so an order's items may arrive
+    in several batches. `on_batch(stats, offset)` runs inside every batch's
+    transaction with the byte offset the next batch starts at; passing that
+    offset (and the stats, whose `lines_read` keeps line numbers right) back
+    continues an interrupted import without applying or counting any row twice.
+    """
+    stats = stats or ImportStats()
+    header, data_offset = read_header(stream)
+    started = time.perf_counter() - stats.elapsed
+
+    batch: List[Dict] = []
+    offset = max(start_offset, data_offset)
+    line_no = max(stats.lines_read, 1) if offset > data_offset else 1
+
+    def flush(offset: int, line_no: int):
+        with conn:
+            stats.orders_upserted += write_batch(conn, batch)
+            stats.rows_processed += len(batch)
+            stats.bytes_processed = offset
+            stats.lines_read = line_no
+            stats.elapsed = time.perf_counter() - started
+            if on_batch:
+                on_batch(stats, offset)
+        batch.clear()
+
+    for line_no, row, offset in iter_rows(stream, header, offset, line_no):
+        try:
+            batch.append(normalize_row(row))
+        except ValueError as e:
+            stats.rows_rejected += 1
+            if len(stats.errors) < MAX_REPORTED_ERRORS:
+                stats.errors.append(f"line {line_no}: {e}")
+        if len(batch) >= batch_size:
+            flush(offset, line_no)
+    flush(offset, line_no)
+    return stats
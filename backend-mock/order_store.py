@@ -0,0 +1,109 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def parse_date(value: Optional[str]) -> Optional[int]:
+    """Day ordinal of a YYYY-MM-DD string, or None when it is blank or malformed."""
+    if not value or not value.strip():
+        return None
+    try:
+        return datetime.strptime(value, DATE_FORMAT).toordinal()
+    except ValueError:
+        return None
+
+
+class OrderSelection(Sequence):
+    """
+    Orders of an OrderStore at the given positions, in store order. Only the
+    positions are held; the dicts are looked up as they are read, so slicing
+    a page out of a large selection touches just that page.
+    """
+
+    def __init__(self, orders: List[Dict], positions: Sequence):
+        self._orders = orders
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._orders[position] for position in self._positions[index]]
+        return self._orders[self._positions[index]]
+
+
+class OrderStore:
+    """
+    Mock orders with the indexes filter_orders needs, built once:
+
+    - the purchase date of every order as a day ordinal, plus the positions
+      sorted by date for bisecting a date range;
+    - a posting list (ascending positions) per status and per marketplace;
+    - "order id\\0delivery name" lowercased, for the search box.
+
+    A query starts from the smallest candidate list among the indexed
+    filters and checks the remaining conditions on those orders only.
+    """
+
+    def __init__(self, orders: List[Dict]):
+        self.orders = orders
+        self._dates = [date.fromisoformat(order["date_purchased"]).toordinal() for order in orders]
+        self._by_date = sorted(range(len(orders)), key=self._dates.__getitem__)
+        self._sorted_dates = [self._dates[position] for position in self._by_date]
+        self._statuses = [order["status"] for order in orders]
+        self._marketplaces = [order["marketplace"] for order in orders]
+        self._by_status = self._posting_lists(self._statuses)
+        self._by_marketplace = self._posting_lists(self._marketplaces)
+        self._search = [f"{order['order_id']}\0{order['delivery_name']}".lower() for order in orders]
+        self._by_id = {order["order_id"]: order for order in orders}
+
+    def __len__(self):
+        return len(self.orders)
+
+    def get(self, order_id: str) -> Optional[Dict]:
+        return self._by_id.get(order_id)
+
+    @staticmethod
+    def _posting_lists(values: List[str]) -> Dict[str, List[int]]:
+        postings: Dict[str, List[int]] = {}
+        for position, value in enumerate(values):
+            postings.setdefault(value, []).append(position)
+        return postings
+
+    def filter(self, from_date=None, to_date=None, order_search_item=None, source_option=None, status=None) -> OrderSelection:
+        """Same filters and result order as the list-scanning filter_orders it replaces."""
+        candidates = []
+        checks = []
+        if status:
+            candidates.append(self._by_status.get(status, []))
+            checks.append(lambda position: self._statuses[position] == status)
+        if source_option and source_option != "All":
+            candidates.append(self._by_marketplace.get(source_option, []))
+            checks.append(lambda position: self._marketplaces[position] == source_option)
+
+        # Invalid dates are ignored, as before
+        low, high = parse_date(from_date), parse_date(to_date)
+        if low is not None or high is not None:
+            start = bisect_left(self._sorted_dates, low) if low is not None else 0
+            end = bisect_right(self._sorted_dates, high) if high is not None else len(self._sorted_dates)
+            candidates.append(sorted(self._by_date[start:end]) if start < end else [])
+            checks.append(lambda position: (low is None or self._dates[position] >= low)
+                          and (high is None or self._dates[position] <= high))
+
+        if order_search_item and order_search_item.strip():
+            term = order_search_item.lower()
+            checks.append(lambda position: term in self._search[position])
+
+        if not candidates:
+            positions = range(len(self.orders))
+        else:
+            smallest = min(range(len(candidates)), key=lambda i: len(candidates[i]))
+            positions = candidates[smallest]
+            del checks[smallest]
+        for check in checks:
+            positions = [position for position in positions if check(position)]
+        return OrderSelection(self.orders, positions)
@@ -0,0 +1,314 @@
+"""
+Latency / throughput benchmark for the order and wallet APIs.
+
+Builds main.py's app against a temporary SQLite database seeded with
+`--orders` orders (`--products` lines each) and `--transactions` wallet
+transactions for one reseller, then:
+
+1. profiles every route: `--profile-requests` sequential calls each, with
+   the response cache cleared before every call, counting the SQL
+   statements a cold request issues;
+2. drives a weighted mix of the routes (`--mix`) with `--concurrency`
+   clients for `--requests` requests and reports p50/p95/p99 latency and
+   throughput per route and overall.
+
+The report is JSON (stdout, or `--output`) and records the git commit, so
+runs of two commits can be compared; `--baseline` adds the ratio of each
+latency percentile and of throughput to those of an earlier report.
+
+    python -m benchmarks.api_bench --orders 20000 --requests 3000 --concurrency 32
+    python -m benchmarks.api_bench --output after.json --baseline before.json
+    python -m benchmarks.api_bench --mix all_orders=5,order=3,balance=2 --no-cache
+
+Uploads use the rows of amazon_orders.csv with fresh order IDs on every call.
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+
+import httpx
+from fastapi import Request
+from sqlalchemy import create_engine, event, insert
+
+from benchmarks.order_serialization import BUYER_ID, seed as seed_orders
+from benchmarks.wallet_load import summarize
+from database.database import Base, SessionLocal, get_db
+from main import app
+from models.customer_balance import CustomerBalance
+from models.wallet_transaction import WalletTransaction
+from services.auth_service import AuthService, oauth2_scheme
+from services.response_cache import response_cache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPLOAD_TEMPLATE = os.path.join(REPO_ROOT, "amazon_orders.csv")
+
+ORDER_VIEWS = ("all", "confirmed", "unshipped", "unpaid", "returned", "cancelled")
+VIEW_PARAMS = {"page": 1, "page_size": 20, "store_by": "last_modified"}
+
+
+def build_routes(orders):
+    """name -> callable(client, rng) issuing one request of that route."""
+    routes = {}
+    for view in ORDER_VIEWS:
+        routes[f"{view}_orders"] = (
+            lambda client, rng, path=f"/orders/get-{view}-orders": client.get(path, params=VIEW_PARAMS)
+        )
+    routes["order"] = lambda client, rng: client.get(f"/orders/order/{rng.randint(1, orders)}")
+    routes["upload"] = lambda client, rng: client.post("/orders/upload", files={"file": upload_file()})
+    routes["balance"] = lambda client, rng: client.get("/wallet/balance")
+    routes["transactions"] = lambda client, rng: client.get("/wallet/transactions", params={"page_size": 20})
+    routes["update"] = lambda client, rng: client.post(
+        "/wallet/update", json={"amount": 1.25, "transaction_type": "add"}
+    )
+    routes["ledger_summary"] = lambda client, rng: client.get(
+        "/wallet/ledger/summary", params={"start": "2000-01-01T00:00:00", "end": "2100-01-01T00:00:00"}
+    )
+    return routes
+
+
+# Upload weight defaults low: every upload grows the order tables
+DEFAULT_MIX = {name: 1 for name in (*(f"{view}_orders" for view in ORDER_VIEWS), "order", "balance",
+                                     "transactions", "update", "ledger_summary")}
+DEFAULT_MIX["upload"] = 0.1
+
+_upload_rows = None
+_upload_ids = itertools.count(1)
+
+
+def upload_file():
+    """amazon_orders.csv with fresh order / order-item IDs, as a (name, bytes, type) upload."""
+    global _upload_rows
+    if _upload_rows is None:
+        with open(UPLOAD_TEMPLATE, newline="") as f:
+            _upload_rows = list(csv.DictReader(f))
+    batch = next(_upload_ids)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(_upload_rows[0]))
+    writer.writeheader()
+    for line, row in enumerate(_upload_rows):
+        writer.writerow({**row, "order-id": f"BENCH-{batch}-{line}", "order-item-id": f"BENCH-{batch}-{line}-1"})
+    return ("orders.csv", buffer.getvalue().encode(), "text/csv")
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class StatementCounter:
+    """Counts the statements an engine executes, from any thread."""
+
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def seed_wallet(SessionLocal, transactions, rng):
+    balance = 1000000.0
+    rows = []
+    for _ in range(transactions):
+        amount = round(rng.uniform(1, 500), 2)
+        kind = rng.choice(("add", "subtract"))
+        after = balance + amount if kind == "add" else balance - amount
+        rows.append({"customer_id": BUYER_ID, "amount": amount, "transaction_type": kind,
+                     "description": "seed", "balance_before": balance, "balance_after": after})
+        balance = after
+    with SessionLocal() as db:
+        db.add(CustomerBalance(customer_id=BUYER_ID, currencies_balance=balance))
+        if rows:
+            db.execute(insert(WalletTransaction), rows)
+        db.commit()
+
+
+def build_app(db_path, orders, products, transactions, rng):
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=64,
+        max_overflow=0,
+    )
+    Base.metadata.create_all(engine)
+    # Services open sessions from the shared factory, so rebinding it moves all of them
+    SessionLocal.configure(bind=engine)
+    seed_orders(SessionLocal, orders, products, rng)
+    seed_wallet(SessionLocal, transactions, rng)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def bearer(request: Request):
+        return request.headers.get("Authorization", f"Bearer {BUYER_ID}").partition(" ")[2]
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Bearer token is the customer ID
+    app.dependency_overrides[oauth2_scheme] = bearer
+    AuthService.get_current_user_id = staticmethod(lambda token: int(token))
+    return StatementCounter(engine)
+
+
+def client_for(app):
+    # ASGITransport skips the lifespan, so the periodic reconcile/checkpoint tasks stay off
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                             headers={"Authorization": f"Bearer {BUYER_ID}"}, timeout=120)
+
+
+async def profile(routes, statements, requests, rng):
+    report = {}
+    async with client_for(app) as client:
+        for name, call in routes.items():
+            latencies, counts, errors = [], [], 0
+            for _ in range(requests):
+                response_cache.clear()
+                before = statements.count
+                started = time.perf_counter()
+                response = await call(client, rng)
+                latencies.append(time.perf_counter() - started)
+                counts.append(statements.count - before)
+                errors += response.status_code >= 400
+            report[name] = {
+                "queries_per_request": round(sum(counts) / len(counts), 2),
+                "max_queries": max(counts),
+                "cold": summarize(latencies),
+                "errors": errors,
+            }
+    return report
+
+
+async def drive(routes, mix, statements, requests, concurrency, rng):
+    names = [name for name in mix if mix[name] > 0]
+    plan = rng.choices(names, weights=[mix[name] for name in names], k=requests)
+    queue = asyncio.Queue()
+    for name in plan:
+        queue.put_nowait(name)
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+
+    async with client_for(app) as client:
+        async def worker():
+            while not queue.empty():
+                name = queue.get_nowait()
+                started = time.perf_counter()
+                response = await routes[name](client, rng)
+                latencies[name].append(time.perf_counter() - started)
+                errors[name] += response.status_code >= 400
+
+        before = statements.count
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "queries_per_request": round((statements.count - before) / requests, 2),
+        "overall": summarize([sample for samples in latencies.values() for sample in samples]),
+        "errors": sum(errors.values()),
+        "routes": {
+            name: {**summarize(samples), "throughput_rps": round(len(samples) / elapsed, 1), "errors": errors[name]}
+            for name, samples in latencies.items()
+        },
+    }
+
+
+def compare(report, baseline):
+    """Ratio of each latency percentile and of throughput to the baseline report (<1 is faster / lower)."""
+    ratios = {}
+
+    def ratio(new, old):
+        return round(new / old, 3) if old else None
+
+    load, base = report["load"], baseline.get("load", {})
+    ratios["throughput_rps"] = ratio(load["throughput_rps"], base.get("throughput_rps"))
+    for name, stats in load["routes"].items():
+        old = base.get("routes", {}).get(name)
+        if old:
+            ratios[name] = {key: ratio(stats[key], old.get(key)) for key in ("p50_ms", "p95_ms", "p99_ms")}
+    return {"commit": baseline.get("commit"), "ratios": ratios}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--products", type=int, default=3, help="products per order")
+    parser.add_argument("--transactions", type=int, default=5000, help="wallet transactions of the reseller")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--profile-requests", type=int, default=5, help="sequential cold calls per route")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help=f"route=weight,... of: {', '.join(DEFAULT_MIX)}")
+    parser.add_argument("--no-cache", action="store_true", help="disable the order response cache")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db_path = os.path.join(tempfile.mkdtemp(prefix="api-bench-"), "bench.db")
+    statements = build_app(db_path, args.orders, args.products, args.transactions, rng)
+    routes = build_routes(args.orders)
+    unknown = set(args.mix) - set(routes)
+    if unknown:
+        parser.error(f"unknown routes in --mix: {', '.join(sorted(unknown))}")
+    if args.no_cache:
+        response_cache.ttl = 0
+
+    async def run():
+        # One loop for both phases: the executor and loaders bind to it
+        profiled = await profile(routes, statements, args.profile_requests, rng)
+        return profiled, await drive(routes, args.mix, statements, args.requests, args.concurrency, rng)
+
+    # The app prints every request; keep that out of the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        profiled, load = asyncio.run(run())
+
+    report = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "profile": profiled,
+        "load": load,
+        "response_cache": response_cache.metrics(),
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["baseline"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Microbenchmark for the order list fetch + JSON encoding path.
+
+Seeds a temporary SQLite database with orders and products, then pages
+through a view with orderfetch.fetch_order_view and encodes every page the
+way the API would:
+
+- orm:     fetch_mode="two_phase" (ORM objects, dicts built per product,
+           float() per price) + jsonable_encoder + json.dumps, which is what
+           FastAPI's default JSONResponse does;
+- columns: fetch_mode="columns" (column tuples, total_quantity summed in SQL)
+           + services.json_response.dumps (orjson when installed).
+
+Reports orders per second for fetching, encoding and both together.
+
+    python -m benchmarks.order_serialization --orders 20000 --products 3
+    python -m benchmarks.order_serialization --page-size 100 --repeat 5
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+import models.customer_balance  # noqa: F401  (registers the tables create_all needs)
+import models.user  # noqa: F401
+from models.ordersReal import Order
+from orderfetch import OrderProduct, _PRODUCT_ORDER_ATTR, fetch_order_view
+from services.json_response import dumps, orjson
+from services.order_events import mark_orders_changed
+
+BUYER_ID = 1
+
+
+def seed(SessionLocal, orders, products_per_order, rng):
+    started = datetime(2024, 1, 1)
+    order_rows, product_rows = [], []
+    for order_id in range(1, orders + 1):
+        order_rows.append({
+            "orders_id": order_id,
+            "orders_serial": f"S{order_id:08d}",
+            "orders_buyer_id": BUYER_ID,
+            "orders_status": rng.choice(("OS", "OB", "OC")),
+            "orders_status_payment": rng.choice(("PD", "PU")),
+            "orders_status_shipping": rng.choice(("SS", "SU", "SP")),
+            "orders_status_return": rng.choice(("RA", "NA")),
+            "orders_status_dispute": rng.choice(("DP", "DN", "AD")),
+            "date_purchased": started + timedelta(minutes=rng.randint(0, 500000)),
+            "last_modified": started + timedelta(minutes=rng.randint(0, 500000)),
+            "currency_value": Decimal(rng.randint(100, 99999)) / 100,
+            "orders_shipping_fee": Decimal("5.00"),
+            "source": 1,
+        })
+        for line in range(products_per_order):
+            product_rows.append({
+                _PRODUCT_ORDER_ATTR: order_id,
+                "product_id": line,
+                "po_id": line,
+                "product_model": f"SKU{order_id}-{line}",
+                "product_quantity": rng.randint(1, 5),
+                "product_price": Decimal(rng.randint(100, 9999)) / 100,
+                "final_price": Decimal(rng.randint(100, 9999)) / 100,
+                "pd_name": f"Product {line}",
+            })
+    with SessionLocal() as db:
+        db.execute(insert(Order), order_rows)
+        db.execute(insert(OrderProduct), product_rows)
+        mark_orders_changed(db, {row["orders_buyer_id"] for row in order_rows})
+        db.commit()
+
+
+def encode_default(content):
+    # fastapi.responses.JSONResponse.render after jsonable_encoder
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+MODES = {
+    "orm": ("two_phase", encode_default),
+    "columns": ("columns", dumps),
+}
+
+
+def run_mode(SessionLocal, mode, view, page_size, repeat):
+    fetch_mode, encode = MODES[mode]
+    fetch_seconds = encode_seconds = 0.0
+    orders = size = 0
+    with SessionLocal() as db:
+        for _ in range(repeat):
+            cursor = None
+            while True:
+                started = time.perf_counter()
+                data = fetch_order_view(db, view, BUYER_ID, page_size=page_size, cursor=cursor,
+                                        fetch_mode=fetch_mode, count_mode="none", use_cache=False)
+                fetched = time.perf_counter()
+                body = encode({"success": True, "data": data})
+                fetch_seconds += fetched - started
+                encode_seconds += time.perf_counter() - fetched
+                orders += len(data["orders"])
+                size += len(body)
+                cursor = data["next_cursor"]
+                if not cursor:
+                    break
+            db.expunge_all()
+    return {
+        "orders": orders,
+        "fetch_seconds": round(fetch_seconds, 3),
+        "encode_seconds": round(encode_seconds, 3),
+        "fetch_orders_per_second": round(orders / fetch_seconds),
+        "encode_orders_per_second": round(orders / encode_seconds),
+        "orders_per_second": round(orders / (fetch_seconds + encode_seconds)),
+        "bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--products", type=int, default=3, help="products per order")
+    parser.add_argument("--view", default="all")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3, help="full passes over the view per mode")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="order-serialization-"), "orders.db")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    seed(SessionLocal, args.orders, args.products, random.Random(args.seed))
+
+    report = {"config": vars(args), "encoder": "orjson" if orjson is not None else "json"}
+    for mode in MODES:
+        run_mode(SessionLocal, mode, args.view, args.page_size, 1)  # warm up caches and compiled SQL
+        report[mode] = run_mode(SessionLocal, mode, args.view, args.page_size, args.repeat)
+    report["speedup"] = round(report["columns"]["orders_per_second"] / report["orm"]["orders_per_second"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Concurrency benchmark for wallet balance updates on a single hot account.
+
+Worker threads apply a random mix of credits and debits to one customer
+through StatsService.update_reseller_balance and report throughput. At the
+end the final balance is checked against the sum of the successful
+operations and against the ledger, so lost updates show up as drift.
+`--impl legacy` runs the previous read-modify-write implementation for
+comparison.
+
+    python -m benchmarks.wallet_contention --threads 16 --ops 200
+    python -m benchmarks.wallet_contention --impl legacy
+    python -m benchmarks.wallet_contention --db-url postgresql://localhost/wallet_bench
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+from models.customer_balance import CustomerBalance
+from models.user import Customer  # noqa: F401  (registers the customers table)
+from models.wallet_transaction import WalletTransaction
+from services.stats_service import StatsService, to_money
+
+HOT_CUSTOMER = 1
+
+
+def legacy_update(customer_id, amount, transaction_type, description, db):
+    """The read-modify-write update that StatsService used before."""
+    record = db.query(CustomerBalance).filter(CustomerBalance.customer_id == customer_id).first()
+    old_balance = float(record.currencies_balance)
+    if transaction_type == "add":
+        new_balance = old_balance + float(amount)
+    else:
+        if old_balance < float(amount):
+            raise ValueError("Insufficient balance")
+        new_balance = old_balance - float(amount)
+    record.currencies_balance = new_balance
+    db.add(WalletTransaction(
+        customer_id=customer_id, amount=amount, transaction_type=transaction_type, description=description,
+        balance_before=old_balance, balance_after=new_balance,
+    ))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--impl", choices=("atomic", "legacy"), default="atomic")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="operations per thread")
+    parser.add_argument("--initial-balance", default="1000.00")
+    parser.add_argument("--db-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    url = args.db_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="wallet-contention-"), "wallet.db")
+    connect_args = {"check_same_thread": False, "timeout": 60} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, pool_size=args.threads, max_overflow=0)
+    Base.metadata.create_all(engine, tables=[CustomerBalance.__table__, WalletTransaction.__table__])
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    with SessionLocal() as db:
+        db.query(WalletTransaction).filter(WalletTransaction.customer_id == HOT_CUSTOMER).delete()
+        db.query(CustomerBalance).filter(CustomerBalance.customer_id == HOT_CUSTOMER).delete()
+        db.add(CustomerBalance(customer_id=HOT_CUSTOMER, currencies_balance=Decimal(args.initial_balance)))
+        db.commit()
+
+    update = StatsService.update_reseller_balance if args.impl == "atomic" else legacy_update
+    lock = threading.Lock()
+    totals = {"applied": Decimal("0.00"), "ok": 0, "insufficient": 0, "errors": 0}
+    latencies = []
+
+    def worker(index):
+        rng = random.Random(args.seed + index)
+        applied, ok, insufficient, errors, samples = Decimal("0.00"), 0, 0, 0, []
+        with SessionLocal() as db:
+            for _ in range(args.ops):
+                kind = rng.choice(("add", "subtract"))
+                amount = to_money(rng.uniform(0.01, 25))
+                started = time.perf_counter()
+                try:
+                    update(HOT_CUSTOMER, amount, kind, "bench", db)
+                    applied += amount if kind == "add" else -amount
+                    ok += 1
+                except ValueError:
+                    db.rollback()
+                    insufficient += 1
+                except OperationalError:
+                    db.rollback()
+                    errors += 1
+                samples.append(time.perf_counter() - started)
+        with lock:
+            totals["applied"] += applied
+            totals["ok"] += ok
+            totals["insufficient"] += insufficient
+            totals["errors"] += errors
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with SessionLocal() as db:
+        final = to_money(db.execute(
+            select(CustomerBalance.currencies_balance).where(CustomerBalance.customer_id == HOT_CUSTOMER)
+        ).scalar_one())
+        ledger = db.execute(
+            select(WalletTransaction.transaction_type, func.sum(WalletTransaction.amount))
+            .where(WalletTransaction.customer_id == HOT_CUSTOMER)
+            .group_by(WalletTransaction.transaction_type)
+        ).all()
+    ledger_net = sum((to_money(total) if kind == "add" else -to_money(total)) for kind, total in ledger)
+    expected = to_money(args.initial_balance) + totals["applied"]
+    latencies.sort()
+
+    report = {
+        "impl": args.impl,
+        "threads": args.threads,
+        "operations": args.threads * args.ops,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_ops": round(args.threads * args.ops / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "succeeded": totals["ok"],
+        "insufficient_balance": totals["insufficient"],
+        "errors": totals["errors"],
+        "final_balance": str(final),
+        "expected_balance": str(expected),
+        "ledger_balance": str(to_money(args.initial_balance) + ledger_net),
+        "lost_update_drift": str(final - expected),
+        "consistent": final == expected == to_money(args.initial_balance) + ledger_net,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
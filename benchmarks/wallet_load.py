@@ -0,0 +1,187 @@
+"""
+Load test for the /wallet routes.
+
+Fires concurrent /wallet/balance, /wallet/update and /wallet/transactions
+calls against the wallet router backed by a local SQLite database, while a
+probe measures how late the event loop wakes up and how long a route that
+does no DB work takes. With blocking DB calls on the event loop both grow
+with every in-flight wallet call; with the routes running on
+services.db_executor they stay flat.
+
+    python -m benchmarks.wallet_load --requests 2000 --concurrency 64 --db-latency-ms 5
+    python -m benchmarks.wallet_load --mode inline    # blocking calls on the loop, for comparison
+
+`--db-latency-ms` adds a blocking sleep to every statement to stand in for
+the network round-trip to a real database server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import api.wallet as wallet_api
+from api.wallet import router as wallet_router
+from database.database import Base, get_db
+from models.customer_balance import CustomerBalance
+from models.user import Customer  # noqa: F401  (registers the customers table)
+from models.wallet_transaction import WalletTransaction  # noqa: F401
+from services.auth_service import AuthService, oauth2_scheme
+from services.db_executor import DBExecutor
+from services.wallet_group_commit import wallet_group_committer
+
+
+class InlineExecutor:
+    """Runs the DB call directly on the event loop, as the wallet routes used to."""
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def build_app(db_path, customers, db_latency, pool_size):
+    # In inline mode a blocked loop can not release connections, so a pool smaller
+    # than the concurrency deadlocks on checkout until pool_timeout instead of
+    # measuring anything.
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    if db_latency:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _network_round_trip(*args):
+            time.sleep(db_latency)
+
+    Base.metadata.create_all(engine, tables=[CustomerBalance.__table__, WalletTransaction.__table__])
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    with SessionLocal() as db:
+        db.query(CustomerBalance).delete()
+        db.add_all(CustomerBalance(customer_id=c, currencies_balance=1000000) for c in range(1, customers + 1))
+        db.commit()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    wallet_group_committer.session_factory = SessionLocal
+
+    app = FastAPI()
+    app.include_router(wallet_router)
+    app.dependency_overrides[get_db] = override_get_db
+    # Bearer token is the customer ID
+    app.dependency_overrides[oauth2_scheme] = lambda: "1"
+    AuthService.get_current_user_id = staticmethod(lambda token: int(token))
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def drive(app, requests, concurrency, probe_interval):
+    transport = httpx.ASGITransport(app=app)
+    latencies = {"balance": [], "update": [], "transactions": []}
+    probe = []
+    loop_lag = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(("balance", "update", "transactions")[i % 3])
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                kind = queue.get_nowait()
+                started = time.perf_counter()
+                if kind == "balance":
+                    response = await client.get("/wallet/balance")
+                elif kind == "update":
+                    response = await client.post("/wallet/update", json={"amount": 1.25, "transaction_type": "add"})
+                else:
+                    response = await client.get("/wallet/transactions", params={"page_size": 20})
+                latencies[kind].append(time.perf_counter() - started)
+                errors += response.status_code != 200
+
+        async def prober(done):
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(probe_interval)
+                woke = time.perf_counter()
+                loop_lag.append(woke - started - probe_interval)
+                await client.get("/ping")
+                probe.append(time.perf_counter() - woke)
+
+        done = asyncio.Event()
+        probe_task = asyncio.create_task(prober(done))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "errors": errors,
+        "routes": {kind: summarize(samples) for kind, samples in latencies.items()},
+        "ping": summarize(probe),
+        "event_loop_lag": summarize(loop_lag),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("executor", "inline"), default="executor")
+    parser.add_argument("--requests", type=int, default=1500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--customers", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=16, help="DB executor threads")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--probe-interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="wallet-load-"), "wallet.db")
+    app = build_app(db_path, args.customers, args.db_latency_ms / 1000, pool_size=args.concurrency + 1)
+    wallet_api.db_executor = InlineExecutor() if args.mode == "inline" else DBExecutor(max_workers=args.workers)
+    wallet_group_committer.executor = wallet_api.db_executor
+
+    report = asyncio.run(drive(app, args.requests, args.concurrency, args.probe_interval_ms / 1000))
+    report["config"] = vars(args)
+    if args.mode == "executor":
+        report["db_executor"] = wallet_api.db_executor.metrics()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
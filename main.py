@@ -1,14 +1,31 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from database.db import init_db
 from controllers.orderController import router as order_controller
 from api.wallet import router as wallet_router
+from api.orders import router as orders_router
+from services.order_summary_service import OrderSummaryService
+from services.order_search import run_search_backfill
+from services.ledger_service import LedgerService
+from services.db_executor import db_executor
+from services.dataloader import request_scope
+from services import instrumentation
+from services.auth_service import AuthService, oauth2_scheme
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    reconcile_task = asyncio.create_task(OrderSummaryService.run_periodic_reconcile())
+    checkpoint_task = asyncio.create_task(LedgerService.run_periodic_checkpoints())
+    search_backfill_task = asyncio.create_task(run_search_backfill())
     yield
+    search_backfill_task.cancel()
+    reconcile_task.cancel()
+    checkpoint_task.cancel()
+    db_executor.shutdown()
 
 app = FastAPI(lifespan=lifespan, title="Order Service")
 
@@ -42,12 +59,42 @@ async def log_requests(request, call_next):
     print(f"Response status: {response.status_code}\n")
     return response
 
+# Per-request memo for the batching loaders in services.dataloader
+@app.middleware("http")
+async def dataloader_scope(request, call_next):
+    with request_scope():
+        return await call_next(request)
+
+# SQL statement counts/timing per request, Server-Timing header and /metrics;
+# registered last so it wraps the other middleware
+instrumentation.install()
+app.middleware("http")(instrumentation.instrument_request)
+
 # Include order controller routes
 app.include_router(order_controller)
 
 # Include wallet API routes
 app.include_router(wallet_router)
 
+# Include order summary routes
+app.include_router(orders_router)
+
+# Prometheus metrics; scrapers authenticate with a bearer token, like /orders/cache-metrics
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(token: str = Depends(oauth2_scheme)):
+    try:
+        # Verify token and get user ID
+        user_id = AuthService.get_current_user_id(token)
+
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+        return PlainTextResponse(instrumentation.render_metrics(), media_type="text/plain; version=0.0.4")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Root endpoint
 @app.get("/")
 def read_root():
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, Text, ForeignKey, Index
+from database.database import Base
+
+class OrderSearchDocument(Base):
+    __tablename__ = "order_search_documents"
+
+    # Lower-cased delivery name, serial, Amazon order ID and product models of one order,
+    # maintained by services.order_search
+    orders_id = Column(Integer, ForeignKey("orders.orders_id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    buyer_id = Column(Integer, nullable=True, index=True)
+    document = Column(Text, nullable=False)
+
+    __table_args__ = (
+        # MySQL: FULLTEXT with the ngram parser; PostgreSQL: trigram GIN (needs the pg_trgm extension)
+        Index(
+            "ix_order_search_documents_document",
+            "document",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+            postgresql_using="gin",
+            postgresql_ops={"document": "gin_trgm_ops"},
+        ),
+    )
+
+    def __repr__(self):
+        return f"<OrderSearchDocument(orders_id={self.orders_id}, buyer_id={self.buyer_id})>"
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime
+from database.database import Base
+from sqlalchemy.sql import func
+
+class OrderStatusSummary(Base):
+    __tablename__ = "order_status_summary"
+
+    # One row per buyer, one counter per dashboard tab (see orderfetch.ORDER_VIEWS)
+    customer_id = Column(Integer, primary_key=True, autoincrement=False)
+    unpaid = Column(Integer, nullable=False, default=0)
+    wait_for_confirm = Column(Integer, nullable=False, default=0)
+    return_or_dispute = Column(Integer, nullable=False, default=0)
+    combined_payment = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    wait_for_shipping = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<OrderStatusSummary(customer_id={self.customer_id}, total={self.total})>"
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, DateTime, DECIMAL, ForeignKey, Index
+from database.database import Base
+from sqlalchemy.sql import func
+
+class WalletLedgerCheckpoint(Base):
+    __tablename__ = "wallet_ledger_checkpoints"
+    __table_args__ = (
+        Index("ix_wallet_ledger_checkpoints_customer_at", "customer_id", "checkpoint_at", "last_transaction_id"),
+        Index("ix_wallet_ledger_checkpoints_customer_txn", "customer_id", "last_transaction_id", unique=True),
+    )
+
+    # State of a customer's ledger right after `last_transaction_id` (see services.ledger_service)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    customer_id = Column(Integer, ForeignKey("customers.customers_id"), nullable=False)
+    last_transaction_id = Column(Integer, ForeignKey("wallet_transactions.id"), nullable=False)
+    checkpoint_at = Column(DateTime, nullable=False)  # created_at of the last transaction
+    balance = Column(DECIMAL(10, 2), nullable=False)
+    # Running totals since the customer's first transaction
+    total_added = Column(DECIMAL(14, 2), nullable=False)
+    total_subtracted = Column(DECIMAL(14, 2), nullable=False)
+    transaction_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+
+    def __repr__(self):
+        return f"<WalletLedgerCheckpoint(customer_id={self.customer_id}, last_transaction_id={self.last_transaction_id}, balance={self.balance})>"
@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from database.database import Base
 from sqlalchemy.sql import func
 #deployment comment
 class WalletTransaction(Base):
     __tablename__ = "wallet_transactions"
+    __table_args__ = (
+        # Per-customer ledger walks in id order (services.ledger_service)
+        Index("ix_wallet_transactions_customer_id_id", "customer_id", "id"),
+        # Transaction history pages, newest first (StatsService.get_wallet_transactions)
+        Index("ix_wallet_transactions_customer_type_created", "customer_id", "transaction_type", "created_at", "id"),
+        Index("ix_wallet_transactions_customer_created", "customer_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     customer_id = Column(Integer, ForeignKey("customers.customers_id"))
@@ -1,8 +1,709 @@
+import base64
+import json
+from dataclasses import dataclass
 from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import Float, Integer, and_, cast, or_, select, func, type_coerce
 from models.ordersReal import Order
-from typing import Optional, Dict, List
+from services.order_count_cache import order_count_cache
+from services.order_search import search_clause
+from services.response_cache import response_cache
+from services.etag import make_etag
+from typing import Optional, Dict, Iterable, Iterator, List, Tuple
+
+_ORDER_PRICE = Order.currency_value + Order.orders_shipping_fee
+
+
+def _price_of(order):
+    if order.currency_value is None or order.orders_shipping_fee is None:
+        return None
+    return order.currency_value + order.orders_shipping_fee
+
+
+# store_by -> (sort expression, descending, value of that expression on a loaded Order).
+# Every ordering is made total with orders_id as tie-breaker so it can be used as a keyset.
+SORT_KEYS = {
+    "date": (Order.date_purchased, False, lambda o: o.date_purchased),
+    "datedesc": (Order.date_purchased, True, lambda o: o.date_purchased),
+    "price": (_ORDER_PRICE, False, _price_of),
+    "pricedesc": (_ORDER_PRICE, True, _price_of),
+    "orderid": (Order.orders_serial, False, lambda o: o.orders_serial),
+    "orderiddesc": (Order.orders_serial, True, lambda o: o.orders_serial),
+    "last_modified": (Order.last_modified, True, lambda o: o.last_modified),
+}
+
+
+def _encode_cursor_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_cursor_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+    return value
+
+
+def encode_cursor(store_by: str, order) -> str:
+    """Opaque cursor pointing just after `order` in the `store_by` ordering."""
+    getter = SORT_KEYS[store_by][2]
+    return _make_cursor(store_by, getter(order), order.orders_id)
+
+
+def _make_cursor(store_by: str, value, orders_id: int) -> str:
+    payload = {"s": store_by, "k": _encode_cursor_value(value), "id": orders_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, store_by: str):
+    """Return (sort value, orders_id) from a cursor; raises ValueError if it is invalid
+    or was issued for a different ordering."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        key, last_id = _decode_cursor_value(payload["k"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if payload.get("s") != store_by:
+        raise ValueError("Cursor does not match the requested sort order")
+    return key, last_id
+
+
+def _keyset_filter(expr, descending: bool, value, last_id: int):
+    # NULLs sort before every value ascending and after every value descending
+    # (MySQL/SQLite semantics), so they form the tail of a descending order.
+    if descending:
+        if value is None:
+            return and_(expr.is_(None), Order.orders_id < last_id)
+        return or_(expr < value, and_(expr == value, Order.orders_id < last_id), expr.is_(None))
+    if value is None:
+        return or_(and_(expr.is_(None), Order.orders_id > last_id), expr.isnot(None))
+    return or_(expr > value, and_(expr == value, Order.orders_id > last_id))
+
+
+def _sort_orders(stmt, store_by: str):
+    expr, descending, _ = SORT_KEYS[store_by]
+    if descending:
+        return stmt.order_by(expr.desc(), Order.orders_id.desc())
+    return stmt.order_by(expr.asc(), Order.orders_id.asc())
+
+
+# Order.products, introspected so the two-phase fetch can query the product
+# table directly: (product entity, FK column, attribute holding the FK).
+_PRODUCTS_REL = Order.products.property
+OrderProduct = _PRODUCTS_REL.mapper.class_
+_PRODUCT_ORDER_FK = _PRODUCTS_REL.local_remote_pairs[0][1]
+_PRODUCT_ORDER_ATTR = _PRODUCTS_REL.mapper.get_property_by_column(_PRODUCT_ORDER_FK).key
+
+# Max orders_id values per IN (...) list when loading products.
+PRODUCT_IN_CHUNK = 500
+
+FETCH_MODES = ("two_phase", "joined", "columns")
+
+# fetch_mode="columns": response key -> product column. Prices come back as
+# floats from the column type's result processor instead of a float() per value.
+PRODUCT_FIELDS = {
+    "product_id": OrderProduct.product_id,
+    "quantity": OrderProduct.product_quantity,
+    "price": type_coerce(OrderProduct.product_price, Float),
+    "final_price": type_coerce(OrderProduct.final_price, Float),
+    "model": OrderProduct.product_model,
+    "po_id": OrderProduct.po_id,
+}
+
+
+
+def load_products(db: Session, orders) -> None:
+    """
+    Populate `products` on already loaded orders with one IN query per
+    PRODUCT_IN_CHUNK orders, stitching the rows back in Python.
+    """
+    by_id = {order.orders_id: [] for order in orders}
+    ids = list(by_id)
+    order_by = _PRODUCTS_REL.order_by or _PRODUCTS_REL.mapper.primary_key
+    for start in range(0, len(ids), PRODUCT_IN_CHUNK):
+        stmt = select(OrderProduct)\
+            .where(_PRODUCT_ORDER_FK.in_(ids[start:start + PRODUCT_IN_CHUNK]))\
+            .order_by(*order_by)
+        for product in db.execute(stmt).scalars():
+            by_id[getattr(product, _PRODUCT_ORDER_ATTR)].append(product)
+    for order in orders:
+        set_committed_value(order, "products", by_id[order.orders_id])
+
+
+def _page_bounds(stmt, store_by: str, page: int, page_size: Optional[int], cursor: Optional[str]):
+    # Keyset position or OFFSET, and a LIMIT one row past the page to detect a next page
+    if cursor:
+        expr, descending, _ = SORT_KEYS[store_by]
+        value, last_id = decode_cursor(cursor, store_by)
+        stmt = stmt.where(_keyset_filter(expr, descending, value, last_id))
+    elif page_size:
+        stmt = stmt.offset((page - 1) * page_size)
+    if page_size:
+        stmt = stmt.limit(page_size + 1)
+    return stmt
+
+
+def _fetch_page(
+    db: Session,
+    stmt,
+    store_by: str,
+    page: int,
+    page_size: Optional[int],
+    cursor: Optional[str] = None,
+    fetch_mode: str = "two_phase",
+    with_products: bool = True
+):
+    """
+    Fetch one page of an already sorted statement.
+
+    With a cursor the page starts right after the cursor position (keyset
+    pagination), so latency does not grow with page depth; otherwise `page`
+    is used with OFFSET. Returns (orders, next_cursor).
+
+    "two_phase" pages over the orders table alone and then loads the products
+    of that page with `load_products`; "joined" uses joinedload, which makes
+    SQLAlchemy wrap the LIMIT in a subquery and repeat each order row per product.
+    With `with_products` False the products are not loaded at all.
+    """
+    if fetch_mode not in FETCH_MODES:
+        raise ValueError(f"Invalid fetch_mode. Use one of {', '.join(FETCH_MODES)}")
+    stmt = _page_bounds(stmt, store_by, page, page_size, cursor)
+    if fetch_mode == "joined" and with_products:
+        orders = db.execute(stmt.options(joinedload(Order.products))).unique().scalars().all()
+    else:
+        orders = db.execute(stmt).scalars().all()
+
+    next_cursor = None
+    if page_size and len(orders) > page_size:
+        orders = orders[:page_size]
+        next_cursor = encode_cursor(store_by, orders[-1])
+    if fetch_mode == "two_phase" and with_products:
+        load_products(db, orders)
+    return orders, next_cursor
+
+
+# Response key -> Order column for the status fields a view projects.
+STATUS_COLUMNS = {
+    "status": "orders_status",
+    "status_payment": "orders_status_payment",
+    "status_shipping": "orders_status_shipping",
+    "status_return": "orders_status_return",
+    "status_dispute": "orders_status_dispute",
+}
+
+
+@dataclass(frozen=True)
+class OrderView:
+    """
+    A named dashboard tab over the orders table.
+
+    `status_rules` is a tuple of alternatives, each mapping an Order status
+    column to its allowed values; an order belongs to the view when it matches
+    every column of at least one alternative. An empty tuple matches all orders.
+    """
+    name: str
+    status_rules: Tuple[Dict[str, Tuple[str, ...]], ...]
+    status_fields: Tuple[str, ...]
+    default_sort: str = "last_modified"
+
+    def matches(self, order) -> bool:
+        if not self.status_rules:
+            return True
+        return any(
+            all(getattr(order, column) in values for column, values in rule.items())
+            for rule in self.status_rules
+        )
+
+
+ORDER_VIEWS: Dict[str, OrderView] = {
+    view.name: view
+    for view in (
+        OrderView(
+            name="unpaid",
+            status_rules=({"orders_status_payment": ("PU",)},),
+            status_fields=("status", "status_payment"),
+            default_sort="datedesc",
+        ),
+        OrderView(
+            name="wait_for_confirm",
+            status_rules=({
+                "orders_status": ("OS", "OB"),
+                "orders_status_payment": ("PD",),
+                "orders_status_shipping": ("SS",),
+            },),
+            status_fields=("status", "status_payment", "status_shipping"),
+        ),
+        OrderView(
+            name="return_or_dispute",
+            status_rules=(
+                {"orders_status_return": ("RA", "RR", "RC", "RS", "RD")},
+                {"orders_status_dispute": ("DP", "DD")},
+            ),
+            status_fields=("status", "status_return", "status_dispute"),
+        ),
+        OrderView(
+            name="combined_payment",  # Awaiting payment
+            status_rules=({
+                "orders_status": ("OS", "OB"),
+                "orders_status_payment": ("PU",),
+                "orders_status_dispute": ("DN", "AD", "DD"),
+            },),
+            status_fields=("status", "status_payment", "status_dispute"),
+        ),
+        OrderView(
+            name="cancelled",
+            status_rules=({"orders_status": ("OC",)},),
+            status_fields=("status",),
+        ),
+        OrderView(
+            name="wait_for_shipping",
+            status_rules=({
+                "orders_status": ("OS", "OB"),
+                "orders_status_payment": ("PD",),
+                "orders_status_shipping": ("SU", "SP"),
+            },),
+            status_fields=("status", "status_payment", "status_shipping"),
+        ),
+        OrderView(
+            name="all",
+            status_rules=(),
+            status_fields=("status", "status_payment", "status_shipping", "status_return", "status_dispute"),
+            default_sort="datedesc",
+        ),
+    )
+}
+
+
+def _column_in(column: str, values: Tuple[str, ...]):
+    attr = getattr(Order, column)
+    return attr == values[0] if len(values) == 1 else attr.in_(values)
+
+
+def view_predicate(view: OrderView):
+    """SQL expression selecting the orders that belong to `view`, or None for all orders."""
+    if not view.status_rules:
+        return None
+    clauses = [
+        and_(*(_column_in(column, values) for column, values in rule.items()))
+        for rule in view.status_rules
+    ]
+    return clauses[0] if len(clauses) == 1 else or_(*clauses)
+
+
+@lru_cache(maxsize=None)
+def _view_statement(view_name: str):
+    # Built once per view; per-request criteria are appended as bound
+    # parameters, so SQLAlchemy's compiled cache is shared across requests.
+    stmt = select(Order)
+    predicate = view_predicate(ORDER_VIEWS[view_name])
+    if predicate is not None:
+        stmt = stmt.where(predicate)
+    return stmt
+
+
+def _filtered_statement(
+    db: Session,
+    view: OrderView,
+    user_id: int,
+    from_date: Optional[datetime],
+    to_date: Optional[datetime],
+    order_search_item: Optional[str],
+    source_option: Optional[str],
+):
+    stmt = _view_statement(view.name)
+
+    # Special case for user_id 0 - don't filter by buyer_id
+    if user_id != 0:
+        stmt = stmt.where(Order.orders_buyer_id == user_id)
+    if from_date:
+        stmt = stmt.where(Order.date_purchased >= from_date)
+    if to_date:
+        stmt = stmt.where(Order.date_purchased <= to_date)
+    if order_search_item and order_search_item.strip():
+        stmt = stmt.where(search_clause(order_search_item, user_id, db.get_bind().dialect.name))
+    if source_option and source_option != "ALL":
+        stmt = stmt.where(Order.source == int(source_option))
+    return stmt
+
+
+COUNT_MODES = ("exact", "estimate", "none")
+
+# count_mode="estimate" with nothing cached counts at most this many rows.
+ESTIMATE_COUNT_CAP = 10000
+
+
+def _count_orders(db: Session, stmt, user_id: int, cache_key: Tuple, count_mode: str):
+    """
+    Return (total_count, exact) for an unsorted view statement.
+
+    "exact" serves a count cached within the TTL or counts in SQL; "estimate"
+    serves any cached count, however old, or counts up to ESTIMATE_COUNT_CAP
+    rows; "none" skips counting and returns (None, False).
+    """
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"Invalid count_mode. Use one of {', '.join(COUNT_MODES)}")
+    if count_mode == "none":
+        return None, False
+
+    # Read before counting, so a change committed meanwhile invalidates the count
+    generation = order_count_cache.generation(user_id)
+    if count_mode == "estimate":
+        cached = order_count_cache.get(user_id, cache_key, max_age=float("inf"), generation=generation)
+        if cached is not None:
+            return cached, False
+        capped = stmt.with_only_columns(Order.orders_id).limit(ESTIMATE_COUNT_CAP + 1).subquery()
+        count = db.execute(select(func.count()).select_from(capped)).scalar_one()
+        if count > ESTIMATE_COUNT_CAP:
+            return ESTIMATE_COUNT_CAP, False
+    else:
+        cached = order_count_cache.get(user_id, cache_key, generation=generation)
+        if cached is not None:
+            return cached, True
+        count = db.execute(select(func.count()).select_from(stmt.subquery())).scalar_one()
+
+    order_count_cache.set(user_id, cache_key, count, generation)
+    return count, True
+
+
+def view_fields(view: OrderView) -> Tuple[str, ...]:
+    """Response keys of the orders of `view`, in response order."""
+    return ("order_id", "order_serial", "date_purchased", *view.status_fields, "total_quantity", "products")
+
+
+def resolve_fields(
+    view: OrderView,
+    fields: Optional[Iterable[str]] = None,
+    include_products: bool = True
+) -> Tuple[str, ...]:
+    """
+    The response keys to produce for a sparse fieldset request, in response
+    order. order_id is always kept; raises ValueError for keys the view does not have.
+    """
+    available = view_fields(view)
+    if fields is not None:
+        unknown = set(fields) - set(available)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Use any of {', '.join(available)}")
+        available = tuple(field for field in available if field == "order_id" or field in fields)
+    if not include_products:
+        available = tuple(field for field in available if field != "products")
+    return available
+
+
+def _serialize_order(
+    order,
+    view: OrderView,
+    fields: Optional[Tuple[str, ...]] = None,
+    total_quantity: Optional[int] = None
+) -> Dict:
+    result = {
+        "order_id": order.orders_id,
+        "order_serial": order.orders_serial,
+        "date_purchased": order.date_purchased,
+    }
+    for field in view.status_fields:
+        result[field] = getattr(order, STATUS_COLUMNS[field])
+    if fields is not None and "products" not in fields:
+        # Loaded without products (see _fetch_page's with_products); the
+        # caller summed total_quantity in SQL if it is wanted
+        result["total_quantity"] = total_quantity
+        return {field: result[field] for field in fields}
+    products = order.products
+    result["total_quantity"] = sum(p.product_quantity for p in products)
+    result["products"] = [
+        {
+            "product_id": p.product_id,
+            "quantity": p.product_quantity,
+            "price": float(p.product_price),
+            "final_price": float(p.final_price),
+            "model": p.product_model,
+            "po_id": p.po_id
+        }
+        for p in products
+    ]
+    if fields is not None and len(fields) != len(result):
+        return {field: result[field] for field in fields}
+    return result
+
+
+@lru_cache(maxsize=None)
+def _order_columns(view_name: str) -> Dict:
+    # Response key -> Order column, in the key order _serialize_order produces
+    view = ORDER_VIEWS[view_name]
+    columns = {
+        "order_id": Order.orders_id,
+        "order_serial": Order.orders_serial,
+        "date_purchased": Order.date_purchased,
+    }
+    for field in view.status_fields:
+        columns[field] = getattr(Order, STATUS_COLUMNS[field])
+    return columns
+
+
+def _total_quantity(order_id):
+    # Correlated subquery summing the product quantities of `order_id`
+    return select(cast(func.coalesce(func.sum(OrderProduct.product_quantity), 0), Integer))\
+        .where(_PRODUCT_ORDER_FK == order_id)\
+        .scalar_subquery()
+
+
+def load_total_quantities(db: Session, order_ids: List[int]) -> Dict[int, int]:
+    """total_quantity of `order_ids`, summed in SQL without reading product rows out."""
+    quantities = {}
+    for start in range(0, len(order_ids), PRODUCT_IN_CHUNK):
+        chunk = order_ids[start:start + PRODUCT_IN_CHUNK]
+        quantities.update(db.execute(
+            select(Order.orders_id, _total_quantity(Order.orders_id)).where(Order.orders_id.in_(chunk))
+        ).all())
+    return quantities
+
+
+def load_product_rows(db: Session, order_ids: List[int]) -> Dict[int, List[Dict]]:
+    """Products of `order_ids` as response dicts keyed by order id, read as plain rows."""
+    by_id = {order_id: [] for order_id in order_ids}
+    keys = tuple(PRODUCT_FIELDS)
+    order_by = _PRODUCTS_REL.order_by or _PRODUCTS_REL.mapper.primary_key
+    for start in range(0, len(order_ids), PRODUCT_IN_CHUNK):
+        stmt = select(_PRODUCT_ORDER_FK, *PRODUCT_FIELDS.values())\
+            .where(_PRODUCT_ORDER_FK.in_(order_ids[start:start + PRODUCT_IN_CHUNK]))\
+            .order_by(*order_by)
+        for row in db.execute(stmt):
+            by_id[row[0]].append(dict(zip(keys, row[1:])))
+    return by_id
+
+
+def _fetch_rows(
+    db: Session,
+    stmt,
+    view: OrderView,
+    store_by: str,
+    page: int,
+    page_size: Optional[int],
+    cursor: Optional[str],
+    fields: Tuple[str, ...]
+):
+    """
+    fetch_mode="columns": like _fetch_page, but selects only the columns of
+    `fields` (plus the sort key) as tuples, sums total_quantity in SQL and
+    zips rows straight into response dicts without hydrating ORM objects.
+    Products are only queried when "products" is in `fields`.
+    Returns (serialized orders, next_cursor).
+    """
+    columns = {key: column for key, column in _order_columns(view.name).items() if key in fields}
+    expr, descending, _ = SORT_KEYS[store_by]
+    # The page is cut in a derived table first so total_quantity is only
+    # summed for the orders on it, not for every row the sort has to visit.
+    paged = _page_bounds(stmt, store_by, page, page_size, cursor)\
+        .with_only_columns(*(column.label(key) for key, column in columns.items()), expr.label("sort_key"))\
+        .subquery()
+    selected = [paged.c[key] for key in columns]
+    keys = tuple(columns)
+    if "total_quantity" in fields:
+        selected.append(_total_quantity(paged.c.order_id))
+        keys += ("total_quantity",)
+    sort_key, order_id = paged.c.sort_key, paged.c.order_id
+    rows = db.execute(
+        select(*selected, sort_key)
+        .order_by(*((sort_key.desc(), order_id.desc()) if descending else (sort_key.asc(), order_id.asc())))
+    ).all()
+
+    next_cursor = None
+    if page_size and len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = _make_cursor(store_by, rows[-1][-1], rows[-1][0])
+    orders = [dict(zip(keys, row)) for row in rows]
+    if "products" in fields:
+        products = load_product_rows(db, [order["order_id"] for order in orders])
+        for order in orders:
+            order["products"] = products[order["order_id"]]
+    return orders, next_cursor
+
+
+def fetch_order_view(
+    db: Session,
+    view_name: str,
+    user_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    order_search_item: Optional[str] = None,
+    page: int = 1,
+    page_size: Optional[int] = 20,
+    source_option: Optional[str] = "ALL",
+    store_by: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fetch_mode: str = "two_phase",
+    count_mode: str = "exact",
+    use_cache: bool = True,
+    fields: Optional[Iterable[str]] = None,
+    include_products: bool = True
+) -> Dict:
+    """
+    Run the filter / sort / count / page / serialize pipeline for a registered order view.
+
+    `page_size` of None or 0 returns every matching order. See `_fetch_page`
+    for how `cursor`, `page` and `fetch_mode` interact (`_fetch_rows` for
+    fetch_mode="columns", the fastest) and `_count_orders`
+    for `count_mode`; `count_exact` in the result tells whether
+    `total_count` is exact.
+
+    `fields` / `include_products` select a sparse fieldset (see
+    `resolve_fields`); without "products" no product rows are loaded, and
+    total_quantity, if kept, is summed in SQL.
+
+    Results are served from `response_cache` (dropped when the user's orders
+    change) unless `use_cache` is False; treat them as read-only.
+    """
+    view = ORDER_VIEWS[view_name]
+    fields = resolve_fields(view, fields, include_products)
+    args = (db, view_name, user_id, from_date, to_date, order_search_item, page, page_size,
+            source_option, store_by, cursor, fetch_mode, count_mode, fields)
+    if not use_cache:
+        return _build_order_view(*args)
+    params = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "search": order_search_item,
+        "page": page,
+        "page_size": page_size or None,
+        "source": None if source_option == "ALL" else source_option,
+        "store_by": store_by if store_by in SORT_KEYS else view.default_sort,
+        "cursor": cursor,
+        "fetch_mode": fetch_mode,
+        "count_mode": count_mode,
+        "fields": None if fields == view_fields(view) else ",".join(fields),
+    }
+    return response_cache.get_or_compute(f"orders:{view.name}", user_id, params, lambda: _build_order_view(*args))
+
+
+def _build_order_view(
+    db: Session,
+    view_name: str,
+    user_id: int,
+    from_date: Optional[datetime],
+    to_date: Optional[datetime],
+    order_search_item: Optional[str],
+    page: int,
+    page_size: Optional[int],
+    source_option: Optional[str],
+    store_by: Optional[str],
+    cursor: Optional[str],
+    fetch_mode: str,
+    count_mode: str,
+    fields: Tuple[str, ...]
+) -> Dict:
+    view = ORDER_VIEWS[view_name]
+    stmt = _filtered_statement(db, view, user_id, from_date, to_date, order_search_item, source_option)
+    if not source_option or source_option == "ALL":
+        source_option = None
+    count_key = (view.name, from_date, to_date, order_search_item or None, source_option)
+    total_count, count_exact = _count_orders(db, stmt, user_id, count_key, count_mode)
+
+    store_by = store_by if store_by in SORT_KEYS else view.default_sort
+    stmt = _sort_orders(stmt, store_by)
+    if fetch_mode == "columns":
+        orders, next_cursor = _fetch_rows(db, stmt, view, store_by, page, page_size, cursor, fields)
+    else:
+        with_products = "products" in fields
+        orders, next_cursor = _fetch_page(db, stmt, store_by, page, page_size, cursor, fetch_mode, with_products)
+        quantities = {}
+        if not with_products and "total_quantity" in fields:
+            quantities = load_total_quantities(db, [order.orders_id for order in orders])
+        orders = [_serialize_order(order, view, fields, quantities.get(order.orders_id)) for order in orders]
+
+    return {
+        "total_count": total_count,
+        "count_exact": count_exact,
+        "page": page,
+        "page_size": page_size,
+        "orders": orders,
+        "next_cursor": next_cursor
+    }
+
+
+# Rows fetched per round trip by iter_order_view's server-side cursor.
+EXPORT_YIELD_PER = 1000
+
+
+def iter_order_view(
+    db: Session,
+    view_name: str,
+    user_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    order_search_item: Optional[str] = None,
+    source_option: Optional[str] = "ALL",
+    store_by: Optional[str] = None,
+    yield_per: int = EXPORT_YIELD_PER
+) -> Iterator[Dict]:
+    """
+    Yield every order of a view, serialized like fetch_order_view, in one pass.
+
+    Orders are outer-joined to their products and read through a server-side
+    cursor (`yield_per`); an order's rows are adjacent in the sort order, so
+    each order is emitted as soon as its last product row arrives and memory
+    does not grow with the size of the view.
+    """
+    view = ORDER_VIEWS[view_name]
+    stmt = _filtered_statement(db, view, user_id, from_date, to_date, order_search_item, source_option)
+    store_by = store_by if store_by in SORT_KEYS else view.default_sort
+    stmt = _sort_orders(stmt, store_by)\
+        .outerjoin(OrderProduct, _PRODUCT_ORDER_FK == Order.orders_id)\
+        .add_columns(OrderProduct)\
+        .order_by(*(_PRODUCTS_REL.order_by or _PRODUCTS_REL.mapper.primary_key))\
+        .execution_options(yield_per=yield_per)
+
+    current, products = None, []
+    for order, product in db.execute(stmt):
+        if order is not current:
+            if current is not None:
+                set_committed_value(current, "products", products)
+                yield _serialize_order(current, view)
+            current, products = order, []
+        if product is not None:
+            products.append(product)
+    if current is not None:
+        set_committed_value(current, "products", products)
+        yield _serialize_order(current, view)
+
+
+def order_view_etag(
+    db: Session,
+    view_name: str,
+    user_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    order_search_item: Optional[str] = None,
+    source_option: Optional[str] = "ALL",
+    **page_params
+) -> str:
+    """
+    ETag of a fetch_order_view result, from one aggregate over the user's
+    orders (not the filtered view): their count and newest last_modified, an
+    index range on (orders_buyer_id, last_modified). Writers, including bulk
+    ones that bypass the ORM, must bump last_modified on every change; the
+    count covers deletes. `page_params` (page, sort, cursor, ...) are folded
+    in as given.
+    """
+    view = ORDER_VIEWS[view_name]
+    stmt = select(func.count(), func.max(Order.last_modified))
+    # Special case for user_id 0 - don't filter by buyer_id
+    if user_id != 0:
+        stmt = stmt.where(Order.orders_buyer_id == user_id)
+    count, last_modified = db.execute(stmt).one()
+    return make_etag(view.name, user_id, from_date, to_date, order_search_item, source_option,
+                     sorted(page_params.items()), count, last_modified)
+
 
 def get_order_with_products(order_id: int, db: Session):
     order = db.query(Order)\
@@ -13,6 +714,34 @@ def get_order_with_products(order_id: int, db: Session):
     if not order:
         return None
 
+    return _serialize_order_detail(order)
+
+
+# Most orders resolved by one get_orders_with_products call.
+MAX_BATCH_ORDERS = 100
+
+
+def get_orders_with_products(order_ids: Iterable[int], db: Session, buyer_id: Optional[int] = None) -> Dict[int, Dict]:
+    """
+    Resolve many orders with their products in one round trip, shaped like
+    get_order_with_products and keyed by order id. Ids that do not exist (or
+    belong to another buyer when `buyer_id` is given) are left out.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    if len(order_ids) > MAX_BATCH_ORDERS:
+        raise ValueError(f"At most {MAX_BATCH_ORDERS} orders can be fetched at once")
+    if not order_ids:
+        return {}
+
+    # No LIMIT, so joinedload is a plain outer join: orders and products in one query
+    stmt = select(Order).options(joinedload(Order.products)).where(Order.orders_id.in_(order_ids))
+    if buyer_id is not None:
+        stmt = stmt.where(Order.orders_buyer_id == buyer_id)
+    orders = {order.orders_id: order for order in db.execute(stmt).unique().scalars()}
+    return {order_id: _serialize_order_detail(orders[order_id]) for order_id in order_ids if order_id in orders}
+
+
+def _serialize_order_detail(order) -> Dict:
     return {
         "order_id": order.orders_id,
         "order_serial": order.orders_serial,
@@ -34,7 +763,8 @@ def get_order_with_products(order_id: int, db: Session):
             for p in order.products
         ]
     }
-    
+
+
 def get_unpaid_orders(
     user_id: int,
     db: Session,
@@ -42,57 +772,15 @@ def get_unpaid_orders(
     to_date: Optional[datetime] = None,
     page_no: Optional[int] = 0,
     number_rows: Optional[int] = 20,
+    cursor: Optional[str] = None,
+    count_mode: str = "exact",
 ):
-    query = db.query(Order).options(joinedload(Order.products))
-    
-    # Special case for user_id 0 - don't filter by buyer_id
-    if user_id != 0:
-        query = query.filter(Order.orders_buyer_id == user_id)
-        
-    query = query.filter(Order.orders_status_payment == "PU")
+    return fetch_order_view(
+        db, "unpaid", user_id, from_date, to_date,
+        page=page_no + 1, page_size=number_rows, cursor=cursor, count_mode=count_mode
+    )
 
-    if from_date:
-        query = query.filter(Order.date_purchased >= from_date)
-    if to_date:
-        query = query.filter(Order.date_purchased <= to_date)
 
-    query = query.order_by(Order.date_purchased.desc())
-
-    if number_rows:
-        query = query.offset(page_no * number_rows).limit(number_rows)
-
-    orders = query.all()
-
-    result = []
-    for order in orders:
-        products = order.products
-        quantity = sum(p.product_quantity for p in products)
-        result.append({
-            "order_id": order.orders_id,
-            "order_serial": order.orders_serial,
-            "date_purchased": order.date_purchased,
-            "status": order.orders_status,
-            "status_payment": order.orders_status_payment,
-            "total_quantity": quantity,
-            "products": [
-                {
-                    "product_id": p.product_id,
-                    "quantity": p.product_quantity,
-                    "price": float(p.product_price),
-                    "final_price": float(p.final_price),
-                    "model": p.product_model,
-                    "po_id": p.po_id
-                } for p in products
-            ]
-        })
-
-    return {
-        "total_count": len(result),
-        "page": page_no + 1,
-        "page_size": number_rows,
-        "orders": result
-    }
-    
 def get_buyer_wait_for_confirm_orders(
     db: Session,
     user_id: int,
@@ -102,82 +790,14 @@ def get_buyer_wait_for_confirm_orders(
     page: int = 1,
     page_size: int = 20,
     source_option: Optional[str] = "ALL",
-    store_by: Optional[str] = "last_modified"
-):
-    order_status = ['OS', 'OB']
-    order_status_payment = 'PD'
-    order_status_shipping = 'SS'
-
-    query = db.query(Order).options(joinedload(Order.products))
-    
-    # Special case for user_id 0 - don't filter by buyer_id
-    if user_id != 0:
-        query = query.filter(Order.orders_buyer_id == user_id)
-        
-    query = query.filter(Order.orders_status.in_(order_status))\
-        .filter(Order.orders_status_payment == order_status_payment)\
-        .filter(Order.orders_status_shipping == order_status_shipping)
-
-    if from_date:
-        query = query.filter(Order.date_purchased >= from_date)
-    if to_date:
-        query = query.filter(Order.date_purchased <= to_date)
-    if order_search_item:
-        like_val = f"%{order_search_item}%"
-        query = query.filter(
-            (Order.amazon_order_id == order_search_item) |
-            (Order.orders_serial == order_search_item) |
-            (Order.delivery_name.ilike(like_val))
-        )
-    if source_option and source_option != "ALL":
-        query = query.filter(Order.source == int(source_option))
-
-    sort_map = {
-        "date": Order.date_purchased.asc(),
-        "datedesc": Order.date_purchased.desc(),
-        "price": (Order.currency_value + Order.orders_shipping_fee).asc(),
-        "pricedesc": (Order.currency_value + Order.orders_shipping_fee).desc(),
-        "orderid": Order.orders_serial.asc(),
-        "orderiddesc": Order.orders_serial.desc(),
-        "last_modified": Order.last_modified.desc()
-    }
-    query = query.order_by(sort_map.get(store_by, Order.last_modified.desc()))
-
-    total_count = query.count()
-    orders = query.offset((page - 1) * page_size).limit(page_size).all()
-
-    result = []
-    for order in orders:
-        products = order.products
-        quantity = sum(p.product_quantity for p in products)
-
-        result.append({
-            "order_id": order.orders_id,
-            "order_serial": order.orders_serial,
-            "date_purchased": order.date_purchased,
-            "status": order.orders_status,
-            "status_payment": order.orders_status_payment,
-            "status_shipping": order.orders_status_shipping,
-            "total_quantity": quantity,
-            "products": [
-                {
-                    "product_id": p.product_id,
-                    "quantity": p.product_quantity,
-                    "price": float(p.product_price),
-                    "final_price": float(p.final_price),
-                    "model": p.product_model,
-                    "po_id": p.po_id
-                }
-                for p in products
-            ]
-        })
-
-    return {
-        "total_count": total_count,
-        "page": page,
-        "page_size": page_size,
-        "orders": result
-    }
+    store_by: Optional[str] = "last_modified",
+    cursor: Optional[str] = None,
+    count_mode: str = "exact"
+) -> Dict:
+    return fetch_order_view(
+        db, "wait_for_confirm", user_id, from_date, to_date, order_search_item,
+        page, page_size, source_option, store_by, cursor, count_mode=count_mode
+    )
 
 
 def get_return_or_dispute_orders(
@@ -189,84 +809,16 @@ def get_return_or_dispute_orders(
     page: int = 1,
     page_size: int = 20,
     source_option: Optional[str] = "ALL",
-    store_by: Optional[str] = "last_modified"
-):
-    status_return = ['RA', 'RR', 'RC', 'RS', 'RD']
-    status_dispute = ['DP', 'DD']
-
-    query = db.query(Order).options(joinedload(Order.products))
-    
-    # Special case for user_id 0 - don't filter by buyer_id
-    if user_id != 0:
-        query = query.filter(Order.orders_buyer_id == user_id)
-        
-    query = query.filter(
-            (Order.orders_status_return.in_(status_return)) |
-            (Order.orders_status_dispute.in_(status_dispute))
-        )
-
-    if from_date:
-        query = query.filter(Order.date_purchased >= from_date)
-    if to_date:
-        query = query.filter(Order.date_purchased <= to_date)
-    if order_search_item:
-        like = f"%{order_search_item}%"
-        query = query.filter(
-            or_(
-                Order.amazon_order_id == order_search_item,
-                Order.orders_serial == order_search_item,
-                Order.delivery_name.ilike(like)
-            )
-        )
-    if source_option != "ALL":
-        query = query.filter(Order.source == int(source_option))
-
-    sort_map = {
-        "date": Order.date_purchased.asc(),
-        "datedesc": Order.date_purchased.desc(),
-        "price": (Order.currency_value + Order.orders_shipping_fee).asc(),
-        "pricedesc": (Order.currency_value + Order.orders_shipping_fee).desc(),
-        "orderid": Order.orders_serial.asc(),
-        "orderiddesc": Order.orders_serial.desc(),
-        "last_modified": Order.last_modified.desc()
-    }
-    query = query.order_by(sort_map.get(store_by, Order.last_modified.desc()))
-
-    total_count = query.count()
-    orders = query.offset((page - 1) * page_size).limit(page_size).all()
+    store_by: Optional[str] = "last_modified",
+    cursor: Optional[str] = None,
+    count_mode: str = "exact"
+) -> Dict:
+    return fetch_order_view(
+        db, "return_or_dispute", user_id, from_date, to_date, order_search_item,
+        page, page_size, source_option, store_by, cursor, count_mode=count_mode
+    )
 
-    results = []
-    for order in orders:
-        products = order.products
-        quantity = sum(p.product_quantity for p in products)
-
-        results.append({
-            "order_id": order.orders_id,
-            "order_serial": order.orders_serial,
-            "date_purchased": order.date_purchased,
-            "status": order.orders_status,
-            "status_return": order.orders_status_return,
-            "status_dispute": order.orders_status_dispute,
-            "total_quantity": quantity,
-            "products": [
-                {
-                    "product_id": p.product_id,
-                    "quantity": p.product_quantity,
-                    "price": float(p.product_price),
-                    "final_price": float(p.final_price),
-                    "model": p.product_model,
-                    "po_id": p.po_id
-                } for p in products
-            ]
-        })
 
-    return {
-        "total_count": total_count,
-        "page": page,
-        "page_size": page_size,
-        "orders": results
-    }
-    
 def get_orders_for_combined_payment(  # Awaiting payment
     db: Session,
     user_id: int,
@@ -276,85 +828,16 @@ def get_orders_for_combined_payment(  # Awaiting payment
     page: int = 1,
     page_size: int = 20,
     source_option: Optional[str] = "ALL",
-    store_by: Optional[str] = "last_modified"
-):
-    order_status = ['OS', 'OB']
-    order_status_payment = 'PU'
-    order_status_dispute = ['DN', 'AD', 'DD']
-
-    query = db.query(Order).options(joinedload(Order.products))
-    
-    # Special case for user_id 0 - don't filter by buyer_id
-    if user_id != 0:
-        query = query.filter(Order.orders_buyer_id == user_id)
-        
-    query = query.filter(Order.orders_status.in_(order_status)) \
-        .filter(Order.orders_status_payment == order_status_payment) \
-        .filter(Order.orders_status_dispute.in_(order_status_dispute))
-
-    if from_date:
-        query = query.filter(Order.date_purchased >= from_date)
-    if to_date:
-        query = query.filter(Order.date_purchased <= to_date)
-    if order_search_item:
-        like_val = f"%{order_search_item}%"
-        query = query.filter(
-            or_(
-                Order.amazon_order_id == order_search_item,
-                Order.orders_serial == order_search_item,
-                Order.delivery_name.ilike(like_val)
-            )
-        )
-    if source_option != "ALL":
-        query = query.filter(Order.source == int(source_option))
-
-    # Sorting
-    sort_map = {
-        "date": Order.date_purchased.asc(),
-        "datedesc": Order.date_purchased.desc(),
-        "price": (Order.currency_value + Order.orders_shipping_fee).asc(),
-        "pricedesc": (Order.currency_value + Order.orders_shipping_fee).desc(),
-        "orderid": Order.orders_serial.asc(),
-        "orderiddesc": Order.orders_serial.desc(),
-        "last_modified": Order.last_modified.desc()
-    }
-    query = query.order_by(sort_map.get(store_by, Order.last_modified.desc()))
-
-    total_count = query.count()
-    orders = query.offset((page - 1) * page_size).limit(page_size).all()
+    store_by: Optional[str] = "last_modified",
+    cursor: Optional[str] = None,
+    count_mode: str = "exact"
+) -> Dict:
+    return fetch_order_view(
+        db, "combined_payment", user_id, from_date, to_date, order_search_item,
+        page, page_size, source_option, store_by, cursor, count_mode=count_mode
+    )
 
-    result = []
-    for order in orders:
-        products = order.products
-        quantity = sum(p.product_quantity for p in products)
-
-        result.append({
-            "order_id": order.orders_id,
-            "order_serial": order.orders_serial,
-            "date_purchased": order.date_purchased,
-            "status": order.orders_status,
-            "status_payment": order.orders_status_payment,
-            "status_dispute": order.orders_status_dispute,
-            "total_quantity": quantity,
-            "products": [
-                {
-                    "product_id": p.product_id,
-                    "quantity": p.product_quantity,
-                    "price": float(p.product_price),
-                    "final_price": float(p.final_price),
-                    "model": p.product_model,
-                    "po_id": p.po_id
-                } for p in products
-            ]
-        })
 
-    return {
-        "total_count": total_count,
-        "page": page,
-        "page_size": page_size,
-        "orders": result
-    }
-    
 def get_cancelled_orders(
     db: Session,
     user_id: int,
@@ -364,74 +847,16 @@ def get_cancelled_orders(
     page: int = 1,
     page_size: int = 20,
     source_option: Optional[str] = "ALL",
-    store_by: Optional[str] = "last_modified"
-):
-    query = db.query(Order).options(joinedload(Order.products))
-    
-    # Special case for user_id 0 - don't filter by buyer_id
-    if user_id != 0:
-        query = query.filter(Order.orders_buyer_id == user_id)
-        
-    query = query.filter(Order.orders_status == "OC")  # Cancelled
-
-    if from_date:
-        query = query.filter(Order.date_purchased >= from_date)
-    if to_date:
-        query = query.filter(Order.date_purchased <= to_date)
-    if order_search_item:
-        like_val = f"%{order_search_item}%"
-        query = query.filter(
-            (Order.amazon_order_id == order_search_item) |
-            (Order.orders_serial == order_search_item) |
-            (Order.delivery_name.ilike(like_val))
-        )
-    if source_option and source_option != "ALL":
-        query = query.filter(Order.source == int(source_option))
-
-    sort_map = {
-        "date": Order.date_purchased.asc(),
-        "datedesc": Order.date_purchased.desc(),
-        "price": (Order.currency_value + Order.orders_shipping_fee).asc(),
-        "pricedesc": (Order.currency_value + Order.orders_shipping_fee).desc(),
-        "orderid": Order.orders_serial.asc(),
-        "orderiddesc": Order.orders_serial.desc(),
-        "last_modified": Order.last_modified.desc()
-    }
-    query = query.order_by(sort_map.get(store_by, Order.last_modified.desc()))
-
-    total_count = query.count()
-    orders = query.offset((page - 1) * page_size).limit(page_size).all()
+    store_by: Optional[str] = "last_modified",
+    cursor: Optional[str] = None,
+    count_mode: str = "exact"
+) -> Dict:
+    return fetch_order_view(
+        db, "cancelled", user_id, from_date, to_date, order_search_item,
+        page, page_size, source_option, store_by, cursor, count_mode=count_mode
+    )
 
-    results = []
-    for order in orders:
-        products = order.products
-        quantity = sum(p.product_quantity for p in products)
-
-        results.append({
-            "order_id": order.orders_id,
-            "order_serial": order.orders_serial,
-            "date_purchased": order.date_purchased,
-            "status": order.orders_status,
-            "total_quantity": quantity,
-            "products": [
-                {
-                    "product_id": p.product_id,
-                    "quantity": p.product_quantity,
-                    "price": float(p.product_price),
-                    "final_price": float(p.final_price),
-                    "model": p.product_model,
-                    "po_id": p.po_id
-                }
-                for p in products
-            ]
-        })
 
-    return {
-        "total_count": total_count,
-        "page": page,
-        "page_size": page_size,
-        "orders": results
-    }
 def get_buyer_wait_for_shipping_orders(
     db: Session,
     user_id: int,
@@ -441,86 +866,16 @@ def get_buyer_wait_for_shipping_orders(
     page: int = 1,
     page_size: int = 20,
     source_option: Optional[str] = "ALL",
-    store_by: Optional[str] = "last_modified"
-):
-    order_status = ['OS', 'OB']
-    order_status_payment = 'PD'
-    order_status_shipping = ['SU', 'SP']
-
-    query = db.query(Order).options(joinedload(Order.products))
-    
-    # Special case for user_id 0 - don't filter by buyer_id
-    if user_id != 0:
-        query = query.filter(Order.orders_buyer_id == user_id)
-        
-    query = query.filter(Order.orders_status.in_(order_status)) \
-        .filter(Order.orders_status_payment == order_status_payment) \
-        .filter(Order.orders_status_shipping.in_(order_status_shipping))
-
-    if from_date:
-        query = query.filter(Order.date_purchased >= from_date)
-    if to_date:
-        query = query.filter(Order.date_purchased <= to_date)
-    if order_search_item:
-        like_val = f"%{order_search_item}%"
-        query = query.filter(
-            or_(
-                Order.amazon_order_id == order_search_item,
-                Order.orders_serial == order_search_item,
-                Order.delivery_name.ilike(like_val)
-            )
-        )
-    if source_option != "ALL":
-        query = query.filter(Order.source == int(source_option))
-
-    sort_map = {
-        "date": Order.date_purchased.asc(),
-        "datedesc": Order.date_purchased.desc(),
-        "price": (Order.currency_value + Order.orders_shipping_fee).asc(),
-        "pricedesc": (Order.currency_value + Order.orders_shipping_fee).desc(),
-        "orderid": Order.orders_serial.asc(),
-        "orderiddesc": Order.orders_serial.desc(),
-        "last_modified": Order.last_modified.desc()
-    }
-    query = query.order_by(sort_map.get(store_by, Order.last_modified.desc()))
-
-    total_count = query.count()
-    orders = query.offset((page - 1) * page_size).limit(page_size).all()
+    store_by: Optional[str] = "last_modified",
+    cursor: Optional[str] = None,
+    count_mode: str = "exact"
+) -> Dict:
+    return fetch_order_view(
+        db, "wait_for_shipping", user_id, from_date, to_date, order_search_item,
+        page, page_size, source_option, store_by, cursor, count_mode=count_mode
+    )
 
-    result = []
-    for order in orders:
-        products = order.products
-        quantity = sum(p.product_quantity for p in products)
-
-        result.append({
-            "order_id": order.orders_id,
-            "order_serial": order.orders_serial,
-            "date_purchased": order.date_purchased,
-            "status": order.orders_status,
-            "status_payment": order.orders_status_payment,
-            "status_shipping": order.orders_status_shipping,
-            "total_quantity": quantity,
-            "products": [
-                {
-                    "product_id": p.product_id,
-                    "quantity": p.product_quantity,
-                    "price": float(p.product_price),
-                    "final_price": float(p.final_price),
-                    "model": p.product_model,
-                    "po_id": p.po_id
-                }
-                for p in products
-            ]
-        })
 
-    return {
-        "total_count": total_count,
-        "page": page,
-        "page_size": page_size,
-        "orders": result
-    }
-
-    
 def get_all_orders_for_user(
     db: Session,
     user_id: int,
@@ -530,73 +885,11 @@ def get_all_orders_for_user(
     page: int = 1,
     page_size: int = 20,
     source_option: Optional[str] = "ALL",
-    store_by: Optional[str] = "last_modified"
+    store_by: Optional[str] = "last_modified",
+    cursor: Optional[str] = None,
+    count_mode: str = "exact"
 ) -> Dict:
-    query = db.query(Order).options(joinedload(Order.products))
-    
-    # Special case for user_id 0 - don't filter by buyer_id
-    if user_id != 0:
-        query = query.filter(Order.orders_buyer_id == user_id)
-
-    if from_date:
-        query = query.filter(Order.date_purchased >= from_date)
-    if to_date:
-        query = query.filter(Order.date_purchased <= to_date)
-    if order_search_item:
-        like = f"%{order_search_item}%"
-        query = query.filter(
-            or_(
-                Order.amazon_order_id == order_search_item,
-                Order.orders_serial == order_search_item,
-                Order.delivery_name.ilike(like)
-            )
-        )
-    if source_option and source_option != "ALL":
-        query = query.filter(Order.source == int(source_option))
-
-    sort_map = {
-        "date": Order.date_purchased.asc(),
-        "datedesc": Order.date_purchased.desc(),
-        "price": (Order.currency_value + Order.orders_shipping_fee).asc(),
-        "pricedesc": (Order.currency_value + Order.orders_shipping_fee).desc(),
-        "orderid": Order.orders_serial.asc(),
-        "orderiddesc": Order.orders_serial.desc(),
-        "last_modified": Order.last_modified.desc()
-    }
-    query = query.order_by(sort_map.get(store_by, Order.date_purchased.desc()))
-
-    total_count = query.count()
-    orders = query.offset((page - 1) * page_size).limit(page_size).all()
-
-    results = []
-    for order in orders:
-        products = order.products
-        quantity = sum(p.product_quantity for p in products)
-        results.append({
-            "order_id": order.orders_id,
-            "order_serial": order.orders_serial,
-            "date_purchased": order.date_purchased,
-            "status": order.orders_status,
-            "status_payment": order.orders_status_payment,
-            "status_shipping": order.orders_status_shipping,
-            "status_return": order.orders_status_return,
-            "status_dispute": order.orders_status_dispute,
-            "total_quantity": quantity,
-            "products": [
-                {
-                    "product_id": p.product_id,
-                    "quantity": p.product_quantity,
-                    "price": float(p.product_price),
-                    "final_price": float(p.final_price),
-                    "model": p.product_model,
-                    "po_id": p.po_id
-                } for p in products
-            ]
-        })
-
-    return {
-        "total_count": total_count,
-        "page": page,
-        "page_size": page_size,
-        "orders": results
-    } 
\ No newline at end of file
+    return fetch_order_view(
+        db, "all", user_id, from_date, to_date, order_search_item,
+        page, page_size, source_option, store_by, cursor, count_mode=count_mode
+    )
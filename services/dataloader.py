@@ -0,0 +1,187 @@
+import asyncio
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from database.database import SessionLocal
+from models.customer_balance import CustomerBalance
+from orderfetch import get_orders_with_products
+from services.db_executor import db_executor
+
+# Seconds a lookup waits for others to join its batch
+DATALOADER_WINDOW = float(os.environ.get("DATALOADER_WINDOW", "0.002"))
+# A batch is dispatched right away once it has this many keys
+DATALOADER_MAX_BATCH = 100
+
+# (loader, key) -> future of the lookups made during the current request
+_request_memo: ContextVar[Optional[Dict]] = ContextVar("dataloader_request_memo", default=None)
+
+
+@contextmanager
+def request_scope():
+    """
+    Scope for per-request memoization: within it, loading the same key twice
+    returns the first result without another lookup. Opened per HTTP request
+    by the middleware in main.py.
+    """
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+class BatchLoader:
+    """
+    Coalesces concurrent `load` calls, from any request, that arrive within
+    `window` seconds into one call of `batch_fn(keys) -> {key: value}`, which
+    runs on the DB executor. Keys missing from the result load as None.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Hashable]], Dict], window: float = DATALOADER_WINDOW,
+                 max_batch: int = DATALOADER_MAX_BATCH, executor=db_executor):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        self.executor = executor
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {"loads": 0, "memo_hits": 0, "coalesced": 0, "batches": 0, "keys_fetched": 0}
+
+    async def load(self, key: Hashable):
+        self._stats["loads"] += 1
+        memo = _request_memo.get()
+        if memo is not None:
+            future = memo.get((self.name, key))
+            if future is not None:
+                self._stats["memo_hits"] += 1
+                return await asyncio.shield(future)
+        future = self._enqueue(key)
+        if memo is not None:
+            memo[(self.name, key)] = future
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> Dict:
+        keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*(self.load(key) for key in keys))
+        return dict(zip(keys, values))
+
+    def metrics(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+    def _enqueue(self, key: Hashable) -> asyncio.Future:
+        future = self._pending.get(key)
+        if future is not None:
+            # Already requested by a concurrent lookup
+            self._stats["coalesced"] += 1
+            return future
+        loop = asyncio.get_running_loop()
+        future = self._pending[key] = loop.create_future()
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+        return future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        self._stats["batches"] += 1
+        self._stats["keys_fetched"] += len(batch)
+        try:
+            values = await self.executor.run(self.batch_fn, list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+class SingleFlight:
+    """
+    Runs identical concurrent calls once: while a call for `key` is in
+    flight, later callers with the same key await its result instead of
+    starting their own.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"calls": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        self._stats["calls"] += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._stats["shared"] += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._in_flight)}
+
+
+def run_with_session(fn: Callable, *args, **kwargs):
+    """
+    Call `fn(db, *args, **kwargs)` with a session of its own, for work whose
+    result is shared by several requests and so must not use any one
+    request's session.
+    """
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def _with_session(fn: Callable) -> Callable[[List[Hashable]], Dict]:
+    return lambda keys: run_with_session(lambda db: fn(keys, db))
+
+
+def _load_orders(order_ids, db):
+    return get_orders_with_products(order_ids, db)
+
+
+def _load_balances(customer_ids, db):
+    rows = db.execute(
+        select(CustomerBalance.customer_id, CustomerBalance.currencies_balance)
+        .where(CustomerBalance.customer_id.in_(customer_ids))
+    ).all()
+    # Same shape as StatsService.get_reseller_balance
+    balances = {
+        customer_id: {"customer_id": customer_id, "currencies_balance": float(balance)}
+        for customer_id, balance in rows
+    }
+    for customer_id in customer_ids:
+        balances.setdefault(customer_id, {"message": "Balance not found", "currencies_balance": 0.00})
+    return balances
+
+
+# Serialized order detail (see orderfetch.get_order_with_products) by order id
+order_loader = BatchLoader("order", _with_session(_load_orders))
+# Wallet balance by customer id
+balance_loader = BatchLoader("balance", _with_session(_load_balances))
+
+request_singleflight = SingleFlight()
+
+
+def metrics() -> Dict[str, Any]:
+    return {
+        **{loader.name: loader.metrics() for loader in (order_loader, balance_loader)},
+        "singleflight": request_singleflight.metrics(),
+    }
@@ -0,0 +1,103 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+# Threads running blocking DB work; keep at or below the SQLAlchemy pool size
+DB_EXECUTOR_WORKERS = int(os.environ.get("DB_EXECUTOR_WORKERS", "16"))
+# Calls allowed to wait for a thread before callers are held back
+DB_EXECUTOR_QUEUE = int(os.environ.get("DB_EXECUTOR_QUEUE", "256"))
+
+
+class DBExecutor:
+    """
+    Bounded thread pool for blocking SQLAlchemy work called from async routes,
+    so a DB round-trip never stalls the event loop.
+
+    At most `max_workers` calls run at once and `max_queue` more wait for a
+    thread; further callers wait on a semaphore without occupying a thread.
+    """
+
+    def __init__(self, max_workers: int = DB_EXECUTOR_WORKERS, max_queue: int = DB_EXECUTOR_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self._slots = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "saturated_waits": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+            "queue_wait_seconds_total": 0.0,
+            "run_seconds_total": 0.0,
+            "run_seconds_max": 0.0,
+        }
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        return self._slots
+
+    def _record(self, **changes) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                self._stats[key] += value
+
+    def _timed(self, fn: Callable[..., T], submitted_at: float) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._stats["queue_wait_seconds_total"] += started - submitted_at
+            self._stats["in_flight"] += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._stats["in_flight"])
+        failed = False
+        try:
+            return fn()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stats["in_flight"] -= 1
+                self._stats["failed" if failed else "completed"] += 1
+                self._stats["run_seconds_total"] += elapsed
+                self._stats["run_seconds_max"] = max(self._stats["run_seconds_max"], elapsed)
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run `fn(*args, **kwargs)` on the pool and await its result."""
+        slots = self._semaphore()
+        if slots.locked():
+            self._record(saturated_waits=1)
+        async with slots:
+            self._record(submitted=1)
+            loop = asyncio.get_running_loop()
+            # Run in a copy of the caller's context, so context variables such as
+            # the per-request stats of services.instrumentation reach the thread
+            call = partial(contextvars.copy_context().run, fn, *args, **kwargs)
+            return await loop.run_in_executor(self._pool, self._timed, call, time.perf_counter())
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        done = stats["completed"] + stats["failed"]
+        stats["max_workers"] = self.max_workers
+        stats["max_queue"] = self.max_queue
+        stats["queued"] = stats["submitted"] - done - stats["in_flight"]
+        stats["run_seconds_avg"] = stats["run_seconds_total"] / done if done else 0.0
+        return stats
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+db_executor = DBExecutor()
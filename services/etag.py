@@ -0,0 +1,29 @@
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import Response
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over `parts`, which must be JSON-serializable (datetimes are stringified)."""
+    raw = json.dumps(parts, separators=(",", ":"), default=str)
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header lists `etag` (weak comparison) or is "*"."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,107 @@
+import csv
+import io
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from services.json_response import dumps
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# Records encoded into one chunk of the response body
+EXPORT_CHUNK_RECORDS = 500
+
+# One CSV line per order product; order fields repeat on each of its lines
+ORDER_CSV_COLUMNS = (
+    "order_id", "order_serial", "date_purchased",
+    "status", "status_payment", "status_shipping", "status_return", "status_dispute",
+    "total_quantity", "product_id", "quantity", "price", "final_price", "model", "po_id",
+)
+
+WALLET_CSV_COLUMNS = (
+    "id", "created_at", "transaction_type", "amount", "balance_before", "balance_after", "description",
+)
+
+_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def encode_ndjson(records: Iterable[Dict]) -> Iterator[bytes]:
+    """One JSON document per line, EXPORT_CHUNK_RECORDS lines per chunk."""
+    lines = []
+    for record in records:
+        lines.append(dumps(record))
+        if len(lines) >= EXPORT_CHUNK_RECORDS:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def encode_csv(rows: Iterable[Dict], columns: Sequence[str]) -> Iterator[bytes]:
+    """A header line, then `rows` as CSV, EXPORT_CHUNK_RECORDS lines per chunk."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, restval="", extrasaction="ignore")
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= EXPORT_CHUNK_RECORDS:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+def order_csv_rows(orders: Iterable[Dict]) -> Iterator[Dict]:
+    """Flatten serialized orders (see orderfetch) into one row per product."""
+    for order in orders:
+        row = {key: value for key, value in order.items() if key != "products"}
+        if isinstance(row.get("date_purchased"), datetime):
+            row["date_purchased"] = row["date_purchased"].isoformat()
+        if not order["products"]:
+            yield row
+        for product in order["products"]:
+            yield {**row, **product}
+
+
+def _with_session(produce: Callable[[Session], Iterable[Dict]]) -> Iterator[Dict]:
+    # The request's session is closed before the body streams, so the
+    # export holds its own for as long as the client keeps reading.
+    db = SessionLocal()
+    try:
+        yield from produce(db)
+    finally:
+        db.close()
+
+
+def export_response(
+    produce: Callable[[Session], Iterable[Dict]],
+    export_format: str,
+    filename: str,
+    csv_columns: Sequence[str],
+    csv_rows: Optional[Callable[[Iterable[Dict]], Iterable[Dict]]] = None
+) -> StreamingResponse:
+    """
+    Stream the records `produce(db)` yields as CSV or NDJSON.
+
+    The body is a plain generator, which Starlette iterates in its threadpool,
+    so the blocking database reads stay off the event loop and only one chunk
+    is held in memory at a time.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format. Use one of {', '.join(EXPORT_FORMATS)}")
+    records = _with_session(produce)
+    if export_format == "csv":
+        body = encode_csv(csv_rows(records) if csv_rows else records, csv_columns)
+    else:
+        body = encode_ndjson(records)
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
@@ -0,0 +1,261 @@
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services import dataloader
+from services.db_executor import db_executor
+from services.response_cache import response_cache
+
+# Statements slower than this many seconds are logged at warning level to
+# `logger`, with redacted parameters
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_SECONDS", "0.2"))
+# Characters of SQL kept in the slow query log
+SLOW_QUERY_MAX_SQL = int(os.environ.get("SLOW_QUERY_MAX_SQL", "2000"))
+logger = logging.getLogger(__name__)
+# Upper bounds (seconds) of the request duration histogram buckets
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """SQL statements run on behalf of one HTTP request, from any thread."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float) -> None:
+        with self._lock:
+            self.statements += 1
+            self.db_seconds += elapsed
+            self.slowest_seconds = max(self.slowest_seconds, elapsed)
+
+
+# Stats of the request being served; DBExecutor carries it into its threads
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("instrumentation_request_stats", default=None)
+
+
+def redact(parameters) -> Any:
+    """Bound parameters with every value replaced by its type name, keeping their shape."""
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return type(parameters)(redact(value) for value in parameters)
+    return f"<{type(parameters).__name__}>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("instrumentation_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("instrumentation_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(elapsed)
+    metrics.record_statement(elapsed)
+    if elapsed >= SLOW_QUERY_SECONDS:
+        source = stats.label if stats is not None else "outside a request"
+        sql = " ".join(statement.split())[:SLOW_QUERY_MAX_SQL]
+        logger.warning("Slow query (%.1f ms, %s): %s parameters=%s", elapsed * 1000, source, sql, redact(parameters))
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for a failed statement
+    if exception_context.connection is not None:
+        started = exception_context.connection.info.get("instrumentation_started")
+        if started:
+            started.pop()
+
+
+def install() -> None:
+    """Time the statements of every engine (idempotent)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+class EndpointStats:
+    def __init__(self, buckets: int):
+        self.buckets = [0] * buckets
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slowest_statement_seconds = 0.0
+
+
+class Metrics:
+    """Request and SQL totals per endpoint, rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: Tuple[float, ...] = REQUEST_DURATION_BUCKETS):
+        self.bucket_bounds = buckets
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple[str, str, int], int] = {}
+        self._endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+        self._statements = 0
+        self._db_seconds = 0.0
+
+    def record_statement(self, elapsed: float) -> None:
+        with self._lock:
+            self._statements += 1
+            self._db_seconds += elapsed
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        with self._lock:
+            key = (method, route, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+            endpoint = self._endpoints.get((method, route))
+            if endpoint is None:
+                endpoint = self._endpoints[(method, route)] = EndpointStats(len(self.bucket_bounds))
+            for i, bound in enumerate(self.bucket_bounds):
+                if seconds <= bound:
+                    endpoint.buckets[i] += 1
+            endpoint.count += 1
+            endpoint.seconds += seconds
+            endpoint.statements += stats.statements
+            endpoint.db_seconds += stats.db_seconds
+            endpoint.slowest_statement_seconds = max(endpoint.slowest_statement_seconds, stats.slowest_seconds)
+
+    def render(self, components: Dict[str, Dict[str, Any]]) -> str:
+        """
+        Prometheus text exposition of the request and SQL metrics, followed by
+        the numeric values of `components` (name -> metrics() dict) as gauges.
+        """
+        with self._lock:
+            responses = sorted(self._responses.items())
+            endpoints = sorted(
+                (key, {**vars(endpoint), "buckets": list(endpoint.buckets)}) for key, endpoint in self._endpoints.items()
+            )
+            statements, db_seconds = self._statements, self._db_seconds
+
+        lines: List[str] = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def sample(name, labels, value):
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        header("http_requests_total", "counter", "HTTP requests by endpoint and status.")
+        for (method, route, status), count in responses:
+            sample("http_requests_total", {"method": method, "route": route, "status": status}, count)
+
+        header("http_request_duration_seconds", "histogram", "HTTP request duration by endpoint.")
+        for (method, route), endpoint in endpoints:
+            labels = {"method": method, "route": route}
+            for bound, count in zip(self.bucket_bounds, endpoint["buckets"]):
+                sample("http_request_duration_seconds_bucket", {**labels, "le": bound}, count)
+            sample("http_request_duration_seconds_bucket", {**labels, "le": "+Inf"}, endpoint["count"])
+            sample("http_request_duration_seconds_sum", labels, endpoint["seconds"])
+            sample("http_request_duration_seconds_count", labels, endpoint["count"])
+
+        for name, kind, field, help_text in (
+            ("http_request_db_statements_total", "counter", "statements", "SQL statements run by requests to the endpoint."),
+            ("http_request_db_seconds_total", "counter", "db_seconds", "Time in SQL statements of requests to the endpoint."),
+            ("http_request_db_slowest_statement_seconds", "gauge", "slowest_statement_seconds",
+             "Slowest SQL statement of a request to the endpoint."),
+        ):
+            header(name, kind, help_text)
+            for (method, route), endpoint in endpoints:
+                sample(name, {"method": method, "route": route}, endpoint[field])
+
+        header("db_statements_total", "counter", "SQL statements run, in or outside requests.")
+        sample("db_statements_total", {}, statements)
+        header("db_statement_seconds_total", "counter", "Time in SQL statements, in or outside requests.")
+        sample("db_statement_seconds_total", {}, db_seconds)
+
+        for component, values in components.items():
+            for key, samples in _gauges(values).items():
+                name = f"app_{component}_{key}"
+                header(name, "gauge", f"{component} {key.replace('_', ' ')}.")
+                for labels, value in samples:
+                    sample(name, labels, value)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _gauges(values: Dict[str, Any]) -> Dict[str, List]:
+    # Numeric values become gauges; a nested dict (e.g. one per loader) becomes a "name" label
+    gauges: Dict[str, List] = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            for nested_key, nested_value in value.items():
+                if isinstance(nested_value, (int, float)):
+                    gauges.setdefault(nested_key, []).append(({"name": key}, nested_value))
+        elif isinstance(value, (int, float)):
+            gauges.setdefault(key, []).append(({}, value))
+    return gauges
+
+
+def route_label(request) -> str:
+    """Path template of the matched route, so /orders/order/{order_id} is one series."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing(stats: RequestStats, seconds: float) -> str:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+        f'db-slowest;dur={stats.slowest_seconds * 1000:.2f};desc="slowest query", '
+        f"app;dur={seconds * 1000:.2f}"
+    )
+
+
+async def instrument_request(request, call_next):
+    """
+    HTTP middleware: counts and times the SQL statements of the request,
+    adds a Server-Timing header (DB time and statement count, slowest
+    statement, whole request) and records the endpoint metrics.
+    """
+    stats = RequestStats(f"{request.method} {request.url.path}")
+    token = _request_stats.set(stats)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        seconds = time.perf_counter() - started
+        _request_stats.reset(token)
+        metrics.record_request(request.method, route_label(request), status, seconds, stats)
+    response.headers["Server-Timing"] = server_timing(stats, seconds)
+    return response
+
+
+def render_metrics() -> str:
+    """The /metrics body: request and SQL metrics plus DB executor, response cache and DataLoader stats."""
+    return metrics.render({
+        "db_executor": db_executor.metrics(),
+        "response_cache": response_cache.metrics(),
+        "dataloader": dataloader.metrics(),
+    })
+
+
+metrics = Metrics()
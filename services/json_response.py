@@ -0,0 +1,37 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used without it
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to JSON bytes with orjson when it is installed, rendering dates as ISO 8601."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded in one pass by `dumps`. Returning it from a route
+    skips FastAPI's response_model validation and jsonable_encoder walk, so
+    the content must already be JSON-ready (dicts, lists, scalars, dates).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
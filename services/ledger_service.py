@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from models.customer_balance import CustomerBalance
+from models.wallet_ledger_checkpoint import WalletLedgerCheckpoint
+from models.wallet_transaction import WalletTransaction
+from services.db_executor import db_executor
+from services.stats_service import to_money
+
+# Most transactions between two checkpoints of a customer, which bounds every tail scan
+CHECKPOINT_EVERY = int(os.environ.get("WALLET_CHECKPOINT_EVERY", "1000"))
+# Seconds between two checkpoint + verification runs
+CHECKPOINT_INTERVAL = float(os.environ.get("WALLET_CHECKPOINT_INTERVAL", "3600"))
+# Transaction ids below the newest checkpoint that are still checked for late commits
+CHECKPOINT_LOOKBACK = 10000
+
+logger = logging.getLogger(__name__)
+
+_ADDED = func.coalesce(func.sum(case((WalletTransaction.transaction_type == "add", WalletTransaction.amount), else_=0)), 0)
+_SUBTRACTED = func.coalesce(func.sum(case((WalletTransaction.transaction_type == "subtract", WalletTransaction.amount), else_=0)), 0)
+
+
+class LedgerService:
+    @staticmethod
+    def create_checkpoints(db: Session, customer_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Checkpoint the ledgers that gained transactions since their last checkpoint
+
+        Parameters:
+        - db: Database session
+        - customer_ids: Customers to checkpoint, or None for every customer with new transactions
+
+        Returns:
+        - The number of checkpoints written
+        """
+        if customer_ids is None:
+            customer_ids = LedgerService._customers_with_new_transactions(db)
+
+        created = 0
+        for customer_id in customer_ids:
+            created += LedgerService._checkpoint_customer(customer_id, db)
+        return created
+
+    @staticmethod
+    def balance_at(customer_id: int, at: datetime, db: Session):
+        """
+        Get a customer's wallet balance as it was at a point in time
+
+        Parameters:
+        - customer_id: The ID of the customer
+        - at: The point in time
+        - db: Database session
+
+        Returns:
+        - The balance and the ledger totals up to `at`
+        """
+        state = LedgerService._ledger_state(customer_id, at, db)
+        return {
+            "customer_id": customer_id,
+            "at": at.isoformat(),
+            "balance": float(state["balance"]),
+            "total_added": float(state["total_added"]),
+            "total_subtracted": float(state["total_subtracted"]),
+            "transaction_count": state["transaction_count"],
+        }
+
+    @staticmethod
+    def range_summary(customer_id: int, start: datetime, end: datetime, db: Session):
+        """
+        Sum a customer's wallet adds and subtracts between two points in time
+
+        Parameters:
+        - customer_id: The ID of the customer
+        - start: Transactions after this time are counted
+        - end: Transactions up to and including this time are counted
+        - db: Database session
+
+        Returns:
+        - Opening and closing balance, totals and number of transactions in the range
+        """
+        if end < start:
+            raise ValueError("end must not be before start")
+        opening = LedgerService._ledger_state(customer_id, start, db)
+        closing = LedgerService._ledger_state(customer_id, end, db)
+        added = closing["total_added"] - opening["total_added"]
+        subtracted = closing["total_subtracted"] - opening["total_subtracted"]
+        return {
+            "customer_id": customer_id,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "opening_balance": float(opening["balance"]),
+            "closing_balance": float(closing["balance"]),
+            "total_added": float(added),
+            "total_subtracted": float(subtracted),
+            "net_change": float(added - subtracted),
+            "transaction_count": closing["transaction_count"] - opening["transaction_count"],
+        }
+
+    @staticmethod
+    def verify_balances(db: Session, customer_ids: Optional[Iterable[int]] = None) -> Dict:
+        """
+        Check that every CustomerBalance equals the balance its ledger adds up to
+
+        Parameters:
+        - db: Database session
+        - customer_ids: Customers to verify, or None for all of them
+
+        Returns:
+        - The number of customers checked and one entry per mismatch
+        """
+        stmt = select(CustomerBalance.customer_id, CustomerBalance.currencies_balance)
+        if customer_ids is not None:
+            stmt = stmt.where(CustomerBalance.customer_id.in_(list(customer_ids)))
+
+        checked = 0
+        mismatches = []
+        for customer_id, stored in db.execute(stmt).all():
+            checked += 1
+            state = LedgerService._ledger_state(customer_id, None, db)
+            stored = to_money(stored or 0)
+            # The ledger must add up to the stored balance, and the last row must agree with both
+            if state["balance"] != stored or state["last_balance_after"] not in (None, stored):
+                mismatches.append({
+                    "customer_id": customer_id,
+                    "balance": float(stored),
+                    "ledger_balance": float(state["balance"]),
+                    "last_balance_after": None if state["last_balance_after"] is None else float(state["last_balance_after"]),
+                    "difference": float(stored - state["balance"]),
+                })
+        return {"checked": checked, "mismatches": mismatches}
+
+    @staticmethod
+    async def run_periodic_checkpoints(interval: float = CHECKPOINT_INTERVAL):
+        """
+        Checkpoint new ledger entries and verify every balance each `interval` seconds.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await db_executor.run(LedgerService._checkpoint_and_verify)
+
+    @staticmethod
+    def _checkpoint_and_verify():
+        db = SessionLocal()
+        try:
+            LedgerService.create_checkpoints(db)
+            report = LedgerService.verify_balances(db)
+            for mismatch in report["mismatches"]:
+                logger.error("Wallet ledger mismatch: %s", mismatch)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _customers_with_new_transactions(db: Session) -> List[int]:
+        # Customer rows are written under their balance lock, so per customer ids grow
+        # in commit order; across customers a slow commit can land below the newest
+        # checkpoint, hence the lookback.
+        watermark = db.execute(select(func.max(WalletLedgerCheckpoint.last_transaction_id))).scalar() or 0
+        return list(db.execute(
+            select(WalletTransaction.customer_id)
+            .where(WalletTransaction.id > max(watermark - CHECKPOINT_LOOKBACK, 0))
+            .distinct()
+        ).scalars())
+
+    @staticmethod
+    def _checkpoint_customer(customer_id: int, db: Session) -> int:
+        last = LedgerService._latest_checkpoint(customer_id, db)
+        if last is not None:
+            balance, added, subtracted = to_money(last.balance), to_money(last.total_added), to_money(last.total_subtracted)
+            count, last_id = last.transaction_count, last.last_transaction_id
+        else:
+            balance, added, subtracted, count, last_id = None, Decimal("0.00"), Decimal("0.00"), 0, 0
+
+        created = 0
+        while True:
+            rows = db.execute(
+                select(WalletTransaction.id, WalletTransaction.amount, WalletTransaction.transaction_type,
+                       WalletTransaction.balance_before, WalletTransaction.created_at)
+                .where(WalletTransaction.customer_id == customer_id, WalletTransaction.id > last_id)
+                .order_by(WalletTransaction.id)
+                .limit(CHECKPOINT_EVERY)
+            ).all()
+            if not rows:
+                break
+            if balance is None:
+                # Balances may predate the ledger: start from the first row's opening balance
+                balance = to_money(rows[0].balance_before)
+            for row in rows:
+                amount = to_money(row.amount)
+                if row.transaction_type == "add":
+                    balance += amount
+                    added += amount
+                else:
+                    balance -= amount
+                    subtracted += amount
+            count += len(rows)
+            last_id = rows[-1].id
+            db.add(WalletLedgerCheckpoint(
+                customer_id=customer_id,
+                last_transaction_id=last_id,
+                checkpoint_at=rows[-1].created_at,
+                balance=balance,
+                total_added=added,
+                total_subtracted=subtracted,
+                transaction_count=count,
+            ))
+            db.commit()
+            created += 1
+        return created
+
+    @staticmethod
+    def _latest_checkpoint(customer_id: int, db: Session, at: Optional[datetime] = None):
+        stmt = select(WalletLedgerCheckpoint).where(WalletLedgerCheckpoint.customer_id == customer_id)
+        if at is not None:
+            stmt = stmt.where(WalletLedgerCheckpoint.checkpoint_at <= at)
+            stmt = stmt.order_by(WalletLedgerCheckpoint.checkpoint_at.desc(), WalletLedgerCheckpoint.last_transaction_id.desc())
+        else:
+            stmt = stmt.order_by(WalletLedgerCheckpoint.last_transaction_id.desc())
+        return db.execute(stmt.limit(1)).scalar_one_or_none()
+
+    @staticmethod
+    def _ledger_state(customer_id: int, at: Optional[datetime], db: Session) -> Dict:
+        """
+        Balance and running totals after the customer's last transaction up to `at`
+        (None for now): the nearest checkpoint plus the transactions after it.
+        """
+        checkpoint = LedgerService._latest_checkpoint(customer_id, db, at)
+        tail = [WalletTransaction.customer_id == customer_id]
+        if checkpoint is not None:
+            tail.append(WalletTransaction.id > checkpoint.last_transaction_id)
+        if at is not None:
+            tail.append(WalletTransaction.created_at <= at)
+            # The next checkpoint caps the scan at CHECKPOINT_EVERY rows
+            next_id = db.execute(
+                select(func.min(WalletLedgerCheckpoint.last_transaction_id))
+                .where(WalletLedgerCheckpoint.customer_id == customer_id, WalletLedgerCheckpoint.checkpoint_at > at)
+            ).scalar()
+            if next_id is not None:
+                tail.append(WalletTransaction.id <= next_id)
+
+        count, added, subtracted = db.execute(
+            select(func.count(WalletTransaction.id), _ADDED, _SUBTRACTED).where(*tail)
+        ).one()
+        added, subtracted = to_money(added), to_money(subtracted)
+
+        if checkpoint is not None:
+            opening = to_money(checkpoint.balance)
+            state = {
+                "total_added": to_money(checkpoint.total_added) + added,
+                "total_subtracted": to_money(checkpoint.total_subtracted) + subtracted,
+                "transaction_count": checkpoint.transaction_count + count,
+            }
+        else:
+            opening = LedgerService._opening_balance(customer_id, db)
+            state = {"total_added": added, "total_subtracted": subtracted, "transaction_count": count}
+        state["balance"] = opening + added - subtracted
+
+        state["last_balance_after"] = None
+        if at is None:
+            last_balance_after = db.execute(
+                select(WalletTransaction.balance_after)
+                .where(WalletTransaction.customer_id == customer_id)
+                .order_by(WalletTransaction.id.desc())
+                .limit(1)
+            ).scalar()
+            if last_balance_after is not None:
+                state["last_balance_after"] = to_money(last_balance_after)
+        return state
+
+    @staticmethod
+    def _opening_balance(customer_id: int, db: Session) -> Decimal:
+        # Balance before the customer's first transaction; without any, the stored balance
+        first = db.execute(
+            select(WalletTransaction.balance_before)
+            .where(WalletTransaction.customer_id == customer_id)
+            .order_by(WalletTransaction.id)
+            .limit(1)
+        ).scalar()
+        if first is not None:
+            return to_money(first)
+        stored = db.execute(
+            select(CustomerBalance.currencies_balance).where(CustomerBalance.customer_id == customer_id)
+        ).scalar()
+        return to_money(stored or 0)
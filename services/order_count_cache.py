@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Set, Tuple
+
+from services.order_events import on_orders_changed
+from services.response_cache import response_cache
+
+# Seconds a cached count is served for count_mode="exact".
+COUNT_CACHE_TTL = 30
+# Distinct filter combinations remembered per user.
+MAX_ENTRIES_PER_USER = 256
+
+
+class OrderCountCache:
+    """
+    total_count per (user, view, filters), kept for `ttl` seconds and dropped
+    as soon as orders of that user change.
+
+    Counts cached for user_id 0 cover every buyer, so they are dropped on any change.
+
+    Counts are held in-process; each is stored with the user's `generation`
+    when it was taken, and served only while that is unchanged, so a shared
+    generation (response_cache with a Redis backend) carries invalidations
+    from other workers. A failing generation lookup (None) is a miss.
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL, max_entries_per_user: int = MAX_ENTRIES_PER_USER,
+                 generation: Optional[Callable[[int], Optional[int]]] = None):
+        self.ttl = ttl
+        self.max_entries_per_user = max_entries_per_user
+        self.generation = generation or (lambda user_id: 0)
+        self._entries: Dict[int, Dict[Hashable, Tuple[int, float, int]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, key: Hashable, max_age: Optional[float] = None,
+            generation: Optional[int] = None) -> Optional[int]:
+        """
+        Cached count, or None if absent, older than `max_age` (default: the
+        TTL) or taken in another generation (default: the current one).
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get(user_id, {}).get(key)
+        if entry is None or time.monotonic() - entry[1] > max_age:
+            return None
+        if generation is None:
+            generation = self.generation(user_id)
+        if generation is None or generation != entry[2]:
+            return None
+        return entry[0]
+
+    def set(self, user_id: int, key: Hashable, count: int, generation: Optional[int]) -> None:
+        """Cache `count`, taken when the user's generation was `generation` (read before counting)."""
+        if generation is None:
+            return
+        with self._lock:
+            entries = self._entries.setdefault(user_id, {})
+            entries.pop(key, None)
+            if len(entries) >= self.max_entries_per_user:
+                del entries[next(iter(entries))]
+            entries[key] = (count, time.monotonic(), generation)
+
+    def invalidate(self, user_ids: Set[int]) -> None:
+        with self._lock:
+            for user_id in (*user_ids, 0):
+                self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+order_count_cache = OrderCountCache(generation=response_cache.generation)
+on_orders_changed(order_count_cache.invalidate)
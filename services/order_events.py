@@ -0,0 +1,71 @@
+from typing import Callable, Iterable, List, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models.ordersReal import Order
+
+# Callbacks invoked with the set of buyer IDs whose orders changed.
+_listeners: List[Callable[[Set[int]], None]] = []
+
+_PENDING_KEY = "changed_order_buyers"
+
+
+def on_orders_changed(callback: Callable[[Set[int]], None]) -> Callable[[Set[int]], None]:
+    """
+    Register a callback run after a commit that inserted, updated or deleted
+    orders, and after every explicit `notify_orders_changed` call.
+    Usable as a decorator.
+    """
+    _listeners.append(callback)
+    return callback
+
+
+def notify_orders_changed(buyer_ids: Iterable[int]) -> None:
+    """
+    Tell subscribers that orders of these buyers changed, right away. Writes
+    inside a session should use `mark_orders_changed`, so subscribers only
+    hear of committed data.
+    """
+    buyer_ids = {buyer_id for buyer_id in buyer_ids if buyer_id is not None}
+    if not buyer_ids:
+        return
+    for callback in _listeners:
+        callback(buyer_ids)
+
+
+def mark_orders_changed(session: Session, buyer_ids: Iterable[int]) -> None:
+    """
+    Hook for writes that bypass the ORM unit of work (bulk INSERT/UPDATE
+    statements, `session.execute(insert(Order), rows)`): subscribers are
+    told about these buyers after the session commits, like for ORM writes,
+    and not at all if it rolls back.
+    """
+    session.info.setdefault(_PENDING_KEY, set()).update(buyer_ids)
+
+
+def _buyers_of(order) -> Set[int]:
+    buyers = {order.orders_buyer_id}
+    history = inspect(order).attrs.orders_buyer_id.history
+    buyers.update(history.deleted or ())
+    return buyers
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_orders(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Order):
+            pending.update(_buyers_of(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changed_orders(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        notify_orders_changed(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_orders(session):
+    session.info.pop(_PENDING_KEY, None)
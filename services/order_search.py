@@ -0,0 +1,210 @@
+import asyncio
+import re
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, insert, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from models.ordersReal import Order
+from models.order_search_document import OrderSearchDocument
+
+_PRODUCTS_REL = Order.products.property
+_OrderProduct = _PRODUCTS_REL.mapper.class_
+_PRODUCT_ORDER_FK = _PRODUCTS_REL.local_remote_pairs[0][1]
+_PRODUCT_ORDER_ATTR = _PRODUCTS_REL.mapper.get_property_by_column(_PRODUCT_ORDER_FK).key
+
+# Order columns copied into the search document. Serials and Amazon order
+# IDs stay out: they are matched exactly, on their unique indexes.
+DOCUMENT_COLUMNS = ("delivery_name",)
+
+AMAZON_ORDER_ID_RE = re.compile(r"^\d{3}-\d{7}-\d{7}$")
+ORDER_SERIAL_RE = re.compile(r"^\d+$")
+
+# Max orders_id values per IN (...) list when refreshing documents.
+REFRESH_CHUNK = 500
+
+
+# Set once backfill_search_documents has given every existing order a
+# document; until then names are matched with the old ILIKE scan.
+search_documents_ready = False
+
+
+def plan_search(term: str):
+    """
+    Decide how to run a search term: ("amazon_order_id", term) and
+    ("orders_serial", term) are exact lookups on the unique order indexes,
+    ORed with the name match; ("text", term) is the name match alone.
+    """
+    term = term.strip()
+    if AMAZON_ORDER_ID_RE.match(term):
+        return "amazon_order_id", term
+    if ORDER_SERIAL_RE.match(term):
+        return "orders_serial", term
+    return "text", term
+
+
+def _text_match(term: str, dialect_name: str):
+    document = OrderSearchDocument.document
+    if dialect_name in ("mysql", "mariadb"):
+        # MATCH ... AGAINST in boolean mode; the quoted phrase makes the ngram
+        # parser require every n-gram of the term, in order
+        return document.match('"%s"' % term.replace('"', " "))
+    # PostgreSQL serves LIKE '%term%' from the trigram index; elsewhere it scans
+    return document.contains(term, autoescape=True)
+
+
+def _name_match(term: str, user_id: int, dialect_name: str):
+    if not search_documents_ready:
+        return Order.delivery_name.ilike(f"%{term}%")
+    matches = select(OrderSearchDocument.orders_id).where(_text_match(term.lower(), dialect_name))
+    # Special case for user_id 0 - don't filter by buyer_id
+    if user_id != 0:
+        matches = matches.where(OrderSearchDocument.buyer_id == user_id)
+    return Order.orders_id.in_(matches)
+
+
+def search_clause(term: str, user_id: int, dialect_name: str):
+    """
+    WHERE clause on Order for a search term: an exact Amazon order ID or
+    serial match, or a delivery name / product model match. `plan_search`
+    only decides which exact lookup is worth adding; a term that looks like
+    an ID still matches names.
+    """
+    kind, value = plan_search(term)
+    name_match = _name_match(value, user_id, dialect_name)
+    if kind == "amazon_order_id":
+        return or_(Order.amazon_order_id == value, name_match)
+    if kind == "orders_serial":
+        return or_(Order.orders_serial == value, name_match)
+    # Serials are not always numeric, so any term may still be one
+    return or_(Order.amazon_order_id == value, Order.orders_serial == value, name_match)
+
+
+def build_document(values: Iterable[Optional[str]]) -> str:
+    return " ".join(str(value) for value in values if value).lower()
+
+
+def refresh_search_documents(connection, order_ids: Iterable[int]) -> None:
+    """
+    Rewrite the search documents of these orders from the current table
+    contents; documents of orders that no longer exist are removed.
+    """
+    ids = sorted(set(order_ids))
+    table = OrderSearchDocument.__table__
+    for start in range(0, len(ids), REFRESH_CHUNK):
+        chunk = ids[start:start + REFRESH_CHUNK]
+        models = defaultdict(list)
+        for orders_id, model in connection.execute(
+            select(_PRODUCT_ORDER_FK, _OrderProduct.product_model).where(_PRODUCT_ORDER_FK.in_(chunk))
+        ):
+            models[orders_id].append(model)
+        rows = [
+            {
+                "orders_id": row.orders_id,
+                "buyer_id": row.orders_buyer_id,
+                "document": build_document((*row[2:], *models[row.orders_id])),
+            }
+            for row in connection.execute(
+                select(Order.orders_id, Order.orders_buyer_id, *(getattr(Order, c) for c in DOCUMENT_COLUMNS))
+                .where(Order.orders_id.in_(chunk))
+            )
+        ]
+        connection.execute(delete(table).where(table.c.orders_id.in_(chunk)))
+        if rows:
+            connection.execute(insert(table), rows)
+
+
+def rebuild_search_documents(db: Session, batch_size: int = 1000) -> int:
+    """
+    Repair every search document, committing per batch.
+    Returns the number of orders processed.
+    """
+    processed, last_id = 0, None
+    while True:
+        stmt = select(Order.orders_id).order_by(Order.orders_id).limit(batch_size)
+        if last_id is not None:
+            stmt = stmt.where(Order.orders_id > last_id)
+        ids = db.execute(stmt).scalars().all()
+        if not ids:
+            return processed
+        refresh_search_documents(db.connection(), ids)
+        db.commit()
+        processed += len(ids)
+        last_id = ids[-1]
+
+
+def backfill_search_documents(db: Session, batch_size: int = 1000) -> int:
+    """
+    Write the documents of orders that have none yet (orders created before
+    the document table, or by writes that bypassed the ORM), committing per
+    batch. Returns the number of orders backfilled.
+    """
+    processed, last_id = 0, None
+    while True:
+        stmt = (
+            select(Order.orders_id)
+            .where(~select(OrderSearchDocument.orders_id)
+                   .where(OrderSearchDocument.orders_id == Order.orders_id).exists())
+            .order_by(Order.orders_id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(Order.orders_id > last_id)
+        ids = db.execute(stmt).scalars().all()
+        if not ids:
+            return processed
+        refresh_search_documents(db.connection(), ids)
+        db.commit()
+        processed += len(ids)
+        last_id = ids[-1]
+
+
+def _backfill():
+    global search_documents_ready
+    db = SessionLocal()
+    try:
+        backfill_search_documents(db)
+    finally:
+        db.close()
+    search_documents_ready = True
+
+
+async def run_search_backfill():
+    """
+    Backfill missing search documents at startup, then switch name search
+    from the ILIKE scan to the document index. New and changed orders keep
+    their documents current through the after_flush hook meanwhile.
+    """
+    await asyncio.to_thread(_backfill)
+
+
+def _document_changed(obj) -> bool:
+    state = inspect(obj)
+    if isinstance(obj, Order):
+        columns = ("orders_buyer_id", *DOCUMENT_COLUMNS)
+    else:
+        columns = ("product_model", _PRODUCT_ORDER_ATTR)
+    return any(state.attrs[column].history.has_changes() for column in columns)
+
+
+def _affected_order_ids(obj):
+    if isinstance(obj, Order):
+        return {obj.orders_id}
+    history = inspect(obj).attrs[_PRODUCT_ORDER_ATTR].history
+    return {getattr(obj, _PRODUCT_ORDER_ATTR), *(history.deleted or ())}
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_changed_documents(session, flush_context):
+    order_ids = set()
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, (Order, _OrderProduct)):
+            order_ids.update(_affected_order_ids(obj))
+    for obj in session.dirty:
+        if isinstance(obj, (Order, _OrderProduct)) and _document_changed(obj):
+            order_ids.update(_affected_order_ids(obj))
+    order_ids.discard(None)
+    if order_ids:
+        refresh_search_documents(session.connection(), order_ids)
@@ -0,0 +1,204 @@
+import asyncio
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from models.ordersReal import Order
+from models.order_status_summary import OrderStatusSummary
+from orderfetch import ORDER_VIEWS, STATUS_COLUMNS, view_predicate
+
+# Order view name -> OrderStatusSummary counter column
+SUMMARY_COLUMNS = {name: ("total" if name == "all" else name) for name in ORDER_VIEWS}
+
+# Seconds between two full reconciliations of the summary table.
+RECONCILE_INTERVAL = 3600
+
+
+class OrderSummaryService:
+    @staticmethod
+    def get_order_summary(customer_id: int, db: Session):
+        """
+        Get the number of orders in every dashboard tab for a buyer
+
+        Parameters:
+        - customer_id: The buyer ID, or 0 for all buyers
+        - db: Database session
+
+        Returns:
+        - The counters keyed by order view name
+        """
+        if customer_id == 0:
+            row = db.execute(
+                select(*(func.coalesce(func.sum(getattr(OrderStatusSummary, column)), 0)
+                         for column in SUMMARY_COLUMNS.values()))
+            ).one()
+            counts = dict(zip(SUMMARY_COLUMNS, (int(value) for value in row)))
+            return {"customer_id": 0, "counts": counts}
+
+        summary = db.get(OrderStatusSummary, customer_id)
+        if summary is None:
+            # Counted and stored in a session of its own, leaving the caller's
+            # transaction untouched
+            own_db = SessionLocal()
+            try:
+                OrderSummaryService.reconcile_order_summaries(own_db, [customer_id])
+                return _summary_payload(own_db.get(OrderStatusSummary, customer_id))
+            finally:
+                own_db.close()
+
+        return _summary_payload(summary)
+
+    @staticmethod
+    def reconcile_order_summaries(db: Session, customer_ids: Optional[Iterable[int]] = None):
+        """
+        Recount the summary rows from the orders table and commit
+
+        The summary rows are locked (SELECT ... FOR UPDATE) before the orders
+        are counted, so an order write that is applying its `col = col + delta`
+        either finishes first and is in the count, or waits and is added on
+        top of the recount.
+
+        Parameters:
+        - db: Database session
+        - customer_ids: Buyers to recount, or None for every buyer
+
+        Returns:
+        - The number of summary rows that were created or corrected
+        """
+        counters = []
+        for name, column in SUMMARY_COLUMNS.items():
+            predicate = view_predicate(ORDER_VIEWS[name])
+            if predicate is None:
+                counters.append(func.count().label(column))
+            else:
+                counters.append(func.coalesce(func.sum(case((predicate, 1), else_=0)), 0).label(column))
+
+        stmt = select(Order.orders_buyer_id, *counters)\
+            .where(Order.orders_buyer_id.isnot(None))\
+            .group_by(Order.orders_buyer_id)
+        summaries = db.query(OrderStatusSummary).with_for_update()
+        if customer_ids is not None:
+            customer_ids = list(customer_ids)
+            stmt = stmt.where(Order.orders_buyer_id.in_(customer_ids))
+            summaries = summaries.filter(OrderStatusSummary.customer_id.in_(customer_ids))
+
+        existing = {summary.customer_id: summary for summary in summaries}
+        counts = {row.orders_buyer_id: row._mapping for row in db.execute(stmt)}
+        zeros = {column: 0 for column in SUMMARY_COLUMNS.values()}
+
+        corrected = 0
+        for customer_id in set(counts) | set(existing) | set(customer_ids or ()):
+            values = counts.get(customer_id, zeros)
+            summary = existing.get(customer_id)
+            if summary is None:
+                summary = OrderStatusSummary(customer_id=customer_id)
+                db.add(summary)
+            elif all(getattr(summary, column) == values[column] for column in zeros):
+                continue
+            for column in zeros:
+                setattr(summary, column, int(values[column]))
+            corrected += 1
+
+        db.commit()
+        return corrected
+
+    @staticmethod
+    async def run_periodic_reconcile(interval: float = RECONCILE_INTERVAL):
+        """
+        Reconcile every summary row each `interval` seconds, correcting drift
+        from writes that bypassed the ORM.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(OrderSummaryService._reconcile_all)
+
+    @staticmethod
+    def _reconcile_all():
+        db = SessionLocal()
+        try:
+            OrderSummaryService.reconcile_order_summaries(db)
+        finally:
+            db.close()
+
+
+def _summary_payload(summary: OrderStatusSummary):
+    return {
+        "customer_id": summary.customer_id,
+        "counts": {name: getattr(summary, column) for name, column in SUMMARY_COLUMNS.items()},
+        "updated_at": summary.updated_at.isoformat() if summary.updated_at else None
+    }
+
+
+# Columns whose committed values the after_flush deltas need
+_TRACKED_COLUMNS = ("orders_buyer_id", *STATUS_COLUMNS.values())
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# active_history makes a set load the replaced value first, even when the
+# attribute is expired (e.g. after a commit), so it shows up in history.deleted
+for _column in _TRACKED_COLUMNS:
+    event.listen(getattr(Order, _column), "set", _load_old_value, active_history=True)
+
+
+def _committed_status(order):
+    # Values the order had before this flush
+    state = inspect(order)
+    values = {}
+    for column in _TRACKED_COLUMNS:
+        history = state.attrs[column].history
+        values[column] = history.deleted[0] if history.deleted else getattr(order, column)
+    return SimpleNamespace(**values)
+
+
+def _count_views(deltas, order, step: int):
+    if order.orders_buyer_id is None:
+        return
+    for name, column in SUMMARY_COLUMNS.items():
+        if ORDER_VIEWS[name].matches(order):
+            deltas[order.orders_buyer_id][column] += step
+
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted_status(session, flush_context, instances):
+    # A deleted order's expired columns can not be loaded once its row is gone
+    for order in session.deleted:
+        if isinstance(order, Order):
+            expired = inspect(order).expired_attributes.intersection(_TRACKED_COLUMNS)
+            if expired:
+                session.refresh(order, attribute_names=list(expired))
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_summary_deltas(session, flush_context):
+    # Keep the counters in step with ORM writes inside the same transaction.
+    deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for order in session.new:
+        if isinstance(order, Order):
+            _count_views(deltas, order, 1)
+    for order in session.deleted:
+        if isinstance(order, Order):
+            _count_views(deltas, _committed_status(order), -1)
+    for order in session.dirty:
+        if isinstance(order, Order) and session.is_modified(order):
+            _count_views(deltas, _committed_status(order), -1)
+            _count_views(deltas, order, 1)
+
+    for customer_id, columns in deltas.items():
+        values = {
+            column: getattr(OrderStatusSummary, column) + delta
+            for column, delta in columns.items() if delta
+        }
+        if values:
+            # A buyer without a summary row yet is counted from scratch on first read
+            session.connection().execute(
+                update(OrderStatusSummary)
+                .where(OrderStatusSummary.customer_id == customer_id)
+                .values(**values)
+            )
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    import redis
+except ImportError:  # optional: only needed when RESPONSE_CACHE_URL is set
+    redis = None
+
+from services.order_events import on_orders_changed
+
+# Seconds a cached response is served
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "15"))
+# Responses kept by the in-process backend
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+# redis://host:port/db to share the cache, and its invalidations, between
+# workers; falls back to REDIS_URL. Unset, the cache is in-process, which is
+# only correct with a single worker: the others never see its invalidations
+# and serve stale pages and counts until RESPONSE_CACHE_TTL / COUNT_CACHE_TTL.
+RESPONSE_CACHE_URL = os.environ.get("RESPONSE_CACHE_URL") or os.environ.get("REDIS_URL")
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU with a TTL per entry. Values are returned as stored, so
+    callers must not mutate them. Single worker only (see RESPONSE_CACHE_URL).
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RedisCacheBackend:
+    """
+    Backend over any client with Redis' get / set(ex=) / incr commands
+    (redis-py, or fakeredis locally). Values are stored as JSON, so dates come
+    back as ISO strings, which is what the API renders them as anyway.
+    """
+
+    def __init__(self, client, prefix: str = "response-cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value, ttl: float) -> None:
+        raw = json.dumps(value, default=_json_default, separators=(",", ":"))
+        self.client.set(self.prefix + key, raw, ex=max(1, int(ttl)))
+
+    def counter(self, key: str) -> int:
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Stable key for `params`: keys sorted, strings stripped, empty values dropped."""
+    normalized = {name: _normalize(value) for name, value in params.items()}
+    normalized = {name: value for name, value in normalized.items() if value is not None}
+    raw = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+class ResponseCache:
+    """
+    Caches computed responses per user. Each user has a generation number that
+    is part of every key; invalidating a user bumps it, which orphans all of
+    their entries at once (the backend's TTL / LRU reclaims them).
+
+    Responses cached for user_id 0 cover every buyer, so they are invalidated
+    on any change. Backend errors are counted and the response is computed directly.
+    With a shared backend the generations are shared too, so an invalidation
+    in one worker reaches all of them (order_count_cache checks them as well).
+    """
+
+    def __init__(self, backend=None, ttl: float = RESPONSE_CACHE_TTL):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "errors": 0}
+
+    def get_or_compute(self, namespace: str, user_id: int, params: Dict[str, Any], compute: Callable[[], Any]):
+        """Cached response for (user, namespace, params), computing and storing it on a miss."""
+        try:
+            key = f"u{user_id}:g{self.backend.counter(f'gen:{user_id}')}:{cache_key(namespace, params)}"
+            value = self.backend.get(key)
+        except Exception:
+            self._count("errors")
+            return compute()
+        if value is not None:
+            self._count("hits")
+            return value
+
+        self._count("misses")
+        value = compute()
+        try:
+            self.backend.set(key, value, self.ttl)
+            self._count("sets")
+        except Exception:
+            self._count("errors")
+        return value
+
+    def generation(self, user_id: int) -> Optional[int]:
+        """The user's current generation; None when the backend fails."""
+        try:
+            return self.backend.counter(f"gen:{user_id}")
+        except Exception:
+            self._count("errors")
+            return None
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        for user_id in {*user_ids, 0}:
+            try:
+                self.backend.incr(f"gen:{user_id}")
+                self._count("invalidations")
+            except Exception:
+                self._count("errors")
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["backend"] = type(self.backend).__name__
+        stats["ttl"] = self.ttl
+        return stats
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+
+def _default_backend():
+    if RESPONSE_CACHE_URL:
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_URL / REDIS_URL is set but the redis package is not installed")
+        return RedisCacheBackend(redis.Redis.from_url(RESPONSE_CACHE_URL))
+    return MemoryCacheBackend()
+
+
+response_cache = ResponseCache(_default_backend())
+on_orders_changed(response_cache.invalidate)
@@ -1,9 +1,45 @@
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from models.user import Customer
 from models.customer_balance import CustomerBalance
 from models.wallet_transaction import WalletTransaction
 from database.database import get_db
 from datetime import datetime
+from typing import Any, Dict, Iterator, List
+import base64
+import json
+from services.etag import make_etag
+
+CENT = Decimal("0.01")
+
+
+def to_money(value) -> Decimal:
+    """Exact amount rounded to the cent, matching the DECIMAL(10, 2) columns."""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+def encode_transaction_cursor(transaction, transaction_type: str = None) -> str:
+    """Opaque cursor pointing just after `transaction` in the newest-first history."""
+    payload = {"t": transaction_type, "at": transaction.created_at.isoformat(), "id": transaction.id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_transaction_cursor(cursor: str, transaction_type: str = None):
+    """Return (created_at, id) from a cursor; raises ValueError if it is invalid
+    or was issued for a different transaction_type filter."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        created_at, last_id = datetime.fromisoformat(payload["at"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if payload.get("t") != (transaction_type or None):
+        raise ValueError("Cursor does not match the requested transaction_type")
+    return created_at, last_id
 
 class StatsService:
     @staticmethod
@@ -18,7 +54,19 @@ class StatsService:
         }
         
     @staticmethod
-    def update_reseller_balance(customer_id: int, amount: float, transaction_type: str, description: str, db: Session):
+    def get_wallet_etag(customer_id: int, db: Session, *params) -> str:
+        """
+        ETag of a customer's wallet reads: every balance change adds a ledger row,
+        so the newest ledger id changes exactly when the wallet does. `params`
+        (filters, page, ...) are folded in for paged reads.
+        """
+        last_id = db.execute(
+            select(func.max(WalletTransaction.id)).where(WalletTransaction.customer_id == customer_id)
+        ).scalar()
+        return make_etag("wallet", customer_id, last_id, *params)
+
+    @staticmethod
+    def update_reseller_balance(customer_id: int, amount, transaction_type: str, description: str, db: Session):
         """
         Update a reseller's wallet balance
         
@@ -32,32 +80,62 @@ class StatsService:
         Returns:
         - The updated balance information
         """
-        # Get or create balance record
-        balance_record = db.query(CustomerBalance).filter(CustomerBalance.customer_id == customer_id).first()
+        transaction = StatsService._record_balance_change(customer_id, amount, transaction_type, description, db)
+        db.flush()
+        result = StatsService._balance_change_result(transaction)
+        db.commit()
         
-        if not balance_record:
-            # Create a new balance record
-            balance_record = CustomerBalance(
-                customer_id=customer_id,
-                currencies_balance=0.0
-            )
-            db.add(balance_record)
-        
-        # Calculate new balance
-        old_balance = float(balance_record.currencies_balance)
-        new_balance = old_balance
-        
-        if transaction_type == "add":
-            new_balance = old_balance + amount
-        elif transaction_type == "subtract":
-            if old_balance < amount:
-                raise ValueError("Insufficient balance")
-            new_balance = old_balance - amount
-        else:
-            raise ValueError("Invalid transaction type. Use 'add' or 'subtract'")
+        return result
+
+    @staticmethod
+    def apply_balance_updates(updates: List[Dict[str, Any]], db: Session):
+        """
+        Apply many wallet updates atomically in a single transaction
+        
+        Parameters:
+        - updates: Dicts with customer_id, amount, transaction_type and description
+        - db: Database session
+        
+        Returns:
+        - One result per update, in input order, shaped like update_reseller_balance's
+        
+        Raises ValueError naming the first update that can not be applied; nothing
+        is committed in that case.
+        """
+        # Rows are locked in customer order so concurrent batches can not deadlock;
+        # the sort is stable, so each customer's updates keep their input order
+        order = sorted(range(len(updates)), key=lambda i: updates[i]["customer_id"])
+        transactions = [None] * len(updates)
+        try:
+            for i in order:
+                try:
+                    transactions[i] = StatsService._record_balance_change(db=db, **updates[i])
+                except ValueError as e:
+                    raise ValueError(f"Update {i}: {e}")
+            db.flush()
+            results = [StatsService._balance_change_result(t) for t in transactions]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
         
-        # Update balance
-        balance_record.currencies_balance = new_balance
+        return results
+
+    @staticmethod
+    def _record_balance_change(customer_id: int, amount, transaction_type: str, description: str, db: Session):
+        """
+        Change the balance and add its ledger row without committing.
+        Returns the pending WalletTransaction.
+        """
+        amount = to_money(amount)
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+        if transaction_type not in ("add", "subtract"):
+            raise ValueError("Invalid transaction type. Use 'add' or 'subtract'")
+
+        # Apply the change in the database, under the row lock the UPDATE takes
+        new_balance = StatsService._apply_balance_delta(customer_id, amount, transaction_type, db)
+        old_balance = new_balance - amount if transaction_type == "add" else new_balance + amount
         
         # Create transaction record
         transaction = WalletTransaction(
@@ -69,48 +147,113 @@ class StatsService:
             balance_after=new_balance,
             created_at=datetime.now()
         )
-        
         db.add(transaction)
-        db.commit()
-        
+        return transaction
+
+    @staticmethod
+    def _balance_change_result(transaction: WalletTransaction):
         return {
-            "customer_id": customer_id,
-            "old_balance": old_balance,
-            "new_balance": new_balance,
+            "customer_id": transaction.customer_id,
+            "old_balance": float(transaction.balance_before),
+            "new_balance": float(transaction.balance_after),
             "transaction_id": transaction.id
         }
+
+    @staticmethod
+    def _apply_balance_delta(customer_id: int, amount: Decimal, transaction_type: str, db: Session) -> Decimal:
+        """
+        Atomically add or subtract `amount` with a single conditional UPDATE and
+        return the new balance. A subtract only matches while the balance covers
+        it, so concurrent debits can never overdraw or overwrite each other.
+        Creates the balance row on the first "add". Does not commit.
+        """
+        balance = CustomerBalance.currencies_balance
+        delta = amount if transaction_type == "add" else -amount
+        stmt = update(CustomerBalance)\
+            .where(CustomerBalance.customer_id == customer_id)\
+            .values(currencies_balance=balance + delta)\
+            .execution_options(synchronize_session=False)
+        if transaction_type == "subtract":
+            stmt = stmt.where(balance >= amount)
+
+        for _ in range(2):
+            if db.get_bind().dialect.update_returning:
+                new_balance = db.execute(stmt.returning(balance)).scalar_one_or_none()
+            elif db.execute(stmt).rowcount:
+                # Row stays locked by our UPDATE, so this reads our own write
+                new_balance = db.execute(
+                    select(balance).where(CustomerBalance.customer_id == customer_id)
+                ).scalar_one()
+            else:
+                new_balance = None
+            if new_balance is not None:
+                return to_money(new_balance)
+
+            exists = db.execute(
+                select(CustomerBalance.customer_id).where(CustomerBalance.customer_id == customer_id)
+            ).first()
+            if exists or transaction_type == "subtract":
+                raise ValueError("Insufficient balance")
+            try:
+                with db.begin_nested():
+                    db.add(CustomerBalance(customer_id=customer_id, currencies_balance=amount))
+                return amount
+            except IntegrityError:
+                # Created concurrently; apply the UPDATE to that row instead
+                continue
+        raise ValueError("Could not update balance")
         
     @staticmethod
-    def get_wallet_transactions(customer_id: int, transaction_type: str = None, page: int = 1, page_size: int = 20, db: Session = None):
+    def get_wallet_transactions(customer_id: int, transaction_type: str = None, page: int = 1, page_size: int = 20,
+                                db: Session = None, cursor: str = None, include_count: bool = True):
         """
         Get wallet transaction history for a customer
         
         Parameters:
         - customer_id: The ID of the customer
         - transaction_type: Optional filter by transaction type ("add", "subtract", or None for all)
-        - page: Page number for pagination
+        - page: Page number for pagination, ignored when a cursor is given
         - page_size: Number of items per page
         - db: Database session
+        - cursor: next_cursor of the previous page; seeks instead of skipping rows
+        - include_count: False skips counting the history (total_count is then None)
         
         Returns:
-        - List of transaction records
+        - List of transaction records and the cursor of the next page (None on the last page)
+        
+        Raises ValueError for a malformed cursor or one issued for another transaction_type.
         """
         query = db.query(WalletTransaction).filter(WalletTransaction.customer_id == customer_id)
         
         if transaction_type:
             query = query.filter(WalletTransaction.transaction_type == transaction_type)
         
-        # Order by most recent first
-        query = query.order_by(WalletTransaction.created_at.desc())
+        total_count = query.count() if include_count else None
+        
+        if cursor:
+            created_at, last_id = decode_transaction_cursor(cursor, transaction_type)
+            query = query.filter(or_(
+                WalletTransaction.created_at < created_at,
+                and_(WalletTransaction.created_at == created_at, WalletTransaction.id < last_id),
+            ))
         
-        # Apply pagination
-        total_count = query.count()
-        transactions = query.offset((page - 1) * page_size).limit(page_size).all()
+        # Order by most recent first; id breaks ties between rows of the same second
+        query = query.order_by(WalletTransaction.created_at.desc(), WalletTransaction.id.desc())
+        
+        # Apply pagination; one extra row tells whether a next page exists
+        if not cursor:
+            query = query.offset((page - 1) * page_size)
+        transactions = query.limit(page_size + 1).all()
+        next_cursor = None
+        if len(transactions) > page_size:
+            transactions = transactions[:page_size]
+            next_cursor = encode_transaction_cursor(transactions[-1], transaction_type)
         
         return {
             "total_count": total_count,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_cursor,
             "transactions": [
                 {
                     "id": t.id,
@@ -123,4 +266,47 @@ class StatsService:
                 }
                 for t in transactions
             ]
-        } 
\ No newline at end of file
+        }
+
+    @staticmethod
+    def iter_wallet_transactions(customer_id: int, transaction_type: str = None, db: Session = None,
+                                 yield_per: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a customer's whole wallet history, oldest first, in one pass
+        
+        Parameters:
+        - customer_id: The ID of the customer
+        - transaction_type: Optional filter by transaction type ("add", "subtract", or None for all)
+        - db: Database session
+        - yield_per: Rows fetched per round trip from the server-side cursor
+        
+        Returns:
+        - An iterator of transaction records shaped like get_wallet_transactions'
+        """
+        stmt = select(
+            WalletTransaction.id,
+            WalletTransaction.amount,
+            WalletTransaction.transaction_type,
+            WalletTransaction.description,
+            WalletTransaction.balance_before,
+            WalletTransaction.balance_after,
+            WalletTransaction.created_at,
+        ).where(WalletTransaction.customer_id == customer_id)
+        
+        if transaction_type:
+            stmt = stmt.where(WalletTransaction.transaction_type == transaction_type)
+        
+        stmt = stmt.order_by(WalletTransaction.created_at, WalletTransaction.id)\
+            .execution_options(yield_per=yield_per)
+        
+        for t in db.execute(stmt):
+            yield {
+                "id": t.id,
+                "amount": float(t.amount),
+                "transaction_type": t.transaction_type,
+                "description": t.description,
+                "balance_before": float(t.balance_before),
+                "balance_after": float(t.balance_after),
+                "created_at": t.created_at.isoformat()
+            }
+
@@ -0,0 +1,60 @@
+import itertools
+import os
+import sys
+from datetime import date
+
+import pytest
+
+pytest.importorskip("numpy")
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend-mock"))
+
+import mock_data  # noqa: E402
+from columnar_store import ColumnarOrderStore  # noqa: E402
+from order_store import OrderStore  # noqa: E402
+
+EPOCH = date(2025, 1, 1)
+DATES = [None, "", "2024-11-15", "2024-12-01", "2024-12-31", "2024-13-01"]
+SEARCHES = [None, " ", "ord-1001", "CUSTOMER 4", "5", "r-1\ncus", "nobody"]
+SOURCES = [None, "All", "Amazon", "Others", "eBay"]
+STATUSES = [None, "delivered", "abnormal", "refunded"]
+
+
+@pytest.fixture(scope="module")
+def columnar(tmp_path_factory):
+    return ColumnarOrderStore(mock_data.load_or_generate(2000, 7, str(tmp_path_factory.mktemp("cache")), EPOCH))
+
+
+@pytest.fixture(scope="module")
+def indexed(columnar):
+    # The indexed store over the same orders, as dicts; its filter is the
+    # reference (see test_order_store.py)
+    return OrderStore([columnar[position] for position in range(len(columnar))])
+
+
+@pytest.mark.parametrize("from_date, to_date", list(itertools.product(DATES, DATES)))
+def test_date_ranges_match_the_indexed_store(columnar, indexed, from_date, to_date):
+    assert list(columnar.filter(from_date, to_date)) == list(indexed.filter(from_date, to_date))
+
+
+@pytest.mark.parametrize("search, source, status", list(itertools.product(SEARCHES, SOURCES, STATUSES)))
+def test_combined_filters_match_the_indexed_store(columnar, indexed, search, source, status):
+    args = ("2024-11-20", "2024-12-20", search, source, status)
+    assert list(columnar.filter(*args)) == list(indexed.filter(*args))
+
+
+def test_pages_and_lookups(columnar, indexed):
+    selection = columnar.filter(source_option="Amazon")
+    assert len(selection) == len(indexed.filter(source_option="Amazon"))
+    assert selection[10:30] == indexed.filter(source_option="Amazon")[10:30]
+    assert columnar.get("ORD-101234") == indexed.get("ORD-101234")
+    assert columnar.get("ORD-101234")["delivery_name"] == "Customer 1234"
+    assert columnar.get("ORD-99") is None
+
+
+def test_orders_keep_the_generate_mock_orders_shape(columnar):
+    order = columnar[0]
+    assert set(order) == {"order_id", "marketplace", "status", "amount", "date_purchased", "delivery_name",
+                          "delivery_address", "delivery_phone", "items"}
+    assert order["items"] and set(order["items"][0]) == {"item_id", "product_name", "quantity", "price"}
+    assert date(2024, 11, 2) <= date.fromisoformat(order["date_purchased"]) <= date(2024, 12, 31)
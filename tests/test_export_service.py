@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+import models.user  # noqa: F401  (wallet_transactions references customers)
+from models.ordersReal import Order
+from models.wallet_transaction import WalletTransaction
+from orderfetch import SORT_KEYS, OrderProduct, fetch_order_view, iter_order_view
+import services.export_service as export_service
+from services.export_service import (
+    ORDER_CSV_COLUMNS, WALLET_CSV_COLUMNS, export_response, order_csv_rows,
+)
+from services.stats_service import StatsService
+
+BUYER_ID = 1
+
+
+@pytest.fixture
+def SessionLocal(monkeypatch, tmp_path):
+    # A file database, so the streamed body's own session sees the seed
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(export_service, "SessionLocal", factory)
+    # Small chunks, so the exports below span several of them
+    monkeypatch.setattr(export_service, "EXPORT_CHUNK_RECORDS", 2)
+    with factory() as db:
+        for orders_id in range(1, 8):
+            db.add(Order(
+                orders_id=orders_id, orders_serial=f"S{orders_id:06d}", orders_buyer_id=BUYER_ID,
+                orders_status="OS", orders_status_payment="PD", orders_status_shipping="SS",
+                orders_status_return="NA", orders_status_dispute="DN",
+                date_purchased=datetime(2024, 1, orders_id), last_modified=datetime(2024, 1, orders_id),
+            ))
+            # Order 4 has no products; the others one to three
+            for n in range(orders_id % 4):
+                db.add(OrderProduct(
+                    orders_id=orders_id, product_id=orders_id * 10 + n, po_id=f"PO{orders_id}",
+                    product_model=f"M{n}", product_quantity=n + 1,
+                    product_price=Decimal("2.50"), final_price=Decimal("3.00"),
+                ))
+        db.add(Order(orders_id=8, orders_serial="other", orders_buyer_id=2, date_purchased=datetime(2024, 1, 1)))
+        for i in range(5):
+            db.add(WalletTransaction(
+                customer_id=BUYER_ID, amount=Decimal("1.25"), transaction_type="add" if i % 2 else "subtract",
+                description=f"tx {i}", balance_before=Decimal("0.00"), balance_after=Decimal("0.00"),
+                created_at=datetime(2024, 1, 1, 0, 0, i // 2),
+            ))
+        db.commit()
+    return factory
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/orders/export")
+    def export_orders(format: str = "csv"):
+        return export_response(
+            lambda db: iter_order_view(db, "all", BUYER_ID, store_by="datedesc", yield_per=3),
+            format, filename="orders-all", csv_columns=ORDER_CSV_COLUMNS, csv_rows=order_csv_rows,
+        )
+
+    @app.get("/wallet/export")
+    def export_wallet(format: str = "csv", transaction_type: str = None):
+        return export_response(
+            lambda db: StatsService.iter_wallet_transactions(BUYER_ID, transaction_type, db, yield_per=2),
+            format, filename="wallet-transactions", csv_columns=WALLET_CSV_COLUMNS,
+        )
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("store_by", sorted(SORT_KEYS))
+def test_iter_order_view_matches_fetch_order_view(SessionLocal, store_by):
+    with SessionLocal() as db:
+        expected = fetch_order_view(db, "all", BUYER_ID, page_size=None, store_by=store_by, use_cache=False)
+    with SessionLocal() as db:
+        streamed = list(iter_order_view(db, "all", BUYER_ID, store_by=store_by, yield_per=2))
+    assert streamed == expected["orders"]
+
+
+def test_order_csv_has_one_line_per_product(SessionLocal, client):
+    response = client.get("/orders/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="orders-all.csv"'
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert tuple(rows[0]) == ORDER_CSV_COLUMNS
+    # 1 + 2 + 3 + 1 (no products) + 1 + 2 + 3 lines, newest order first
+    assert [row["order_id"] for row in rows] == ["7"] * 3 + ["6"] * 2 + ["5", "4"] + ["3"] * 3 + ["2"] * 2 + ["1"]
+    empty = next(row for row in rows if row["order_id"] == "4")
+    assert (empty["product_id"], empty["total_quantity"]) == ("", "0")
+    assert rows[0]["date_purchased"] == "2024-01-07T00:00:00"
+    assert (rows[0]["total_quantity"], rows[0]["price"], rows[0]["po_id"]) == ("6", "2.5", "PO7")
+
+
+def test_order_ndjson_has_one_document_per_order(SessionLocal, client):
+    response = client.get("/orders/export", params={"format": "ndjson"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    orders = [json.loads(line) for line in response.text.splitlines()]
+    assert [order["order_id"] for order in orders] == [7, 6, 5, 4, 3, 2, 1]
+    assert [len(order["products"]) for order in orders] == [3, 2, 1, 0, 3, 2, 1]
+
+
+@pytest.mark.parametrize("transaction_type, expected", [(None, 5), ("add", 2)])
+def test_wallet_export_is_oldest_first(SessionLocal, client, transaction_type, expected):
+    params = {"format": "ndjson", **({"transaction_type": transaction_type} if transaction_type else {})}
+    records = [json.loads(line) for line in client.get("/wallet/export", params=params).text.splitlines()]
+    assert len(records) == expected
+    assert [r["id"] for r in records] == sorted(r["id"] for r in records)
+    assert all(r["amount"] == 1.25 for r in records)
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/wallet/export").text)))
+    assert tuple(rows[0]) == WALLET_CSV_COLUMNS
+    assert len(rows) == 5
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Invalid format"):
+        export_response(lambda db: [], "xml", "orders", ORDER_CSV_COLUMNS)
@@ -0,0 +1,101 @@
+import io
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend-mock"))
+
+import import_jobs  # noqa: E402
+import order_import  # noqa: E402
+
+HEADER = "order-id,order-item-id,sku,quantity-purchased,consumer_price\n"
+ROWS = 2500  # more than one DEFAULT_BATCH_SIZE batch
+
+
+@pytest.fixture
+def jobs(monkeypatch, tmp_path):
+    database = str(tmp_path / "imports.sqlite3")
+
+    def connect(path=database):
+        conn = sqlite3.connect(path, timeout=30)
+        conn.executescript(order_import.SCHEMA)
+        return conn
+
+    monkeypatch.setattr(order_import, "connect", connect)
+    monkeypatch.setattr(import_jobs, "SPOOL_DIR", str(tmp_path / "spool"))
+    # Jobs run in the test thread instead of the worker pool
+    monkeypatch.setattr(import_jobs, "_submit", lambda job_id: None)
+    import_jobs._stopping.clear()
+    yield import_jobs
+    import_jobs._stopping.clear()
+
+
+def upload(bad_rows=()):
+    rows = [f"O{n},I{n},SKU{n},{'x' if n in bad_rows else 1},2.00\n" for n in range(1, ROWS + 1)]
+    return io.BytesIO((HEADER + "".join(rows)).encode())
+
+
+def imported_orders(jobs):
+    conn = jobs.connect()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM imported_orders").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_job_imports_the_spooled_file_and_removes_it(jobs):
+    job_id = jobs.create_job(upload(bad_rows=(10,)), "orders.csv")
+    jobs.run_job(job_id)
+
+    job = jobs.get_job(job_id)
+    assert job["status"] == "completed"
+    assert (job["rows_processed"], job["rows_rejected"]) == (ROWS - 1, 1)
+    assert job["errors"] == ["line 11: quantity-purchased is not a number"]
+    assert job["progress"] == 1.0
+    assert imported_orders(jobs) == ROWS - 1
+    assert not os.listdir(jobs.SPOOL_DIR)
+
+
+def test_interrupted_job_resumes_from_its_checkpoint(jobs, monkeypatch):
+    write_batch = order_import.write_batch
+    batches = []
+
+    def stop_during_second_batch(conn, batch):
+        batches.append(len(batch))
+        if len(batches) == 2:
+            jobs._stopping.set()
+        return write_batch(conn, batch)
+
+    monkeypatch.setattr(order_import, "write_batch", stop_during_second_batch)
+    job_id = jobs.create_job(upload(bad_rows=(2400,)), "orders.csv")
+    jobs.run_job(job_id)
+
+    # Shut down mid-import: still resumable, first batch checkpointed, second rolled back
+    job = jobs.get_job(job_id)
+    assert job["status"] == "running"
+    assert job["rows_processed"] == order_import.DEFAULT_BATCH_SIZE
+    assert imported_orders(jobs) == order_import.DEFAULT_BATCH_SIZE
+
+    jobs._stopping.clear()
+    jobs.run_job(job_id)
+    job = jobs.get_job(job_id)
+    assert job["status"] == "completed"
+    assert (job["rows_processed"], job["rows_rejected"]) == (ROWS - 1, 1)
+    assert job["errors"] == ["line 2401: quantity-purchased is not a number"]
+    assert imported_orders(jobs) == ROWS - 1
+
+
+def test_unfinished_jobs_are_queued_again(jobs, monkeypatch):
+    queued = []
+    monkeypatch.setattr(jobs, "_submit", queued.append)
+    job_id = jobs.create_job(upload(), "orders.csv")
+    assert jobs.resume_unfinished_jobs() == 1
+    assert queued == [job_id, job_id]
+
+
+def test_unreadable_upload_is_rejected_before_queueing(jobs):
+    with pytest.raises(order_import.CSVImportError):
+        jobs.create_job(io.BytesIO(b"just,some,columns\n"), "bad.csv")
+    assert not os.listdir(jobs.SPOOL_DIR)
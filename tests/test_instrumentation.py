@@ -0,0 +1,107 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import services.instrumentation as instrumentation
+from services.instrumentation import Metrics, RequestStats, redact, server_timing
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    fresh = Metrics(buckets=(0.1, 1.0))
+    monkeypatch.setattr(instrumentation, "metrics", fresh)
+    return fresh
+
+
+@pytest.fixture
+def client(metrics):
+    engine = create_engine("sqlite://")
+    instrumentation.install()
+    app = FastAPI()
+    app.middleware("http")(instrumentation.instrument_request)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT :id"), {"id": item_id})
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def stats(statements, db_seconds, slowest_seconds):
+    result = RequestStats("GET /")
+    result.statements, result.db_seconds, result.slowest_seconds = statements, db_seconds, slowest_seconds
+    return result
+
+
+def test_redact_keeps_the_shape_but_not_the_values():
+    assert redact({"id": 7, "names": ["a", None], "pair": (1.5, b"x")}) == {
+        "id": "<int>", "names": ["<str>", "<NoneType>"], "pair": ("<float>", "<bytes>"),
+    }
+    assert redact([{"token": "secret"}]) == [{"token": "<str>"}]
+
+
+def test_server_timing_header():
+    assert server_timing(stats(3, 0.0125, 0.01), 0.05) == (
+        'db;dur=12.50;desc="3 queries", db-slowest;dur=10.00;desc="slowest query", app;dur=50.00'
+    )
+
+
+def test_render_prometheus_text(metrics):
+    metrics.record_request("GET", "/orders/view", 200, 0.05, stats(2, 0.01, 0.008))
+    metrics.record_request("GET", "/orders/view", 200, 0.5, stats(4, 0.03, 0.02))
+    metrics.record_request("GET", "/orders/view", 500, 2.0, stats(0, 0.0, 0.0))
+    metrics.record_statement(0.25)
+    body = metrics.render({"cache": {"hits": 3, "backend": "memory", "loaders": {"orders": {"hits": 1}}}})
+    lines = body.splitlines()
+
+    assert body.endswith("\n")
+    assert "# TYPE http_requests_total counter" in lines
+    assert 'http_requests_total{method="GET",route="/orders/view",status="200"} 2' in lines
+    assert 'http_requests_total{method="GET",route="/orders/view",status="500"} 1' in lines
+    # Buckets are cumulative and +Inf equals the count
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/orders/view",le="0.1"} 1' in lines
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/orders/view",le="1.0"} 2' in lines
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/orders/view",le="+Inf"} 3' in lines
+    assert 'http_request_duration_seconds_sum{method="GET",route="/orders/view"} 2.55' in lines
+    assert 'http_request_db_statements_total{method="GET",route="/orders/view"} 6' in lines
+    assert 'http_request_db_slowest_statement_seconds{method="GET",route="/orders/view"} 0.02' in lines
+    assert "db_statements_total 1" in lines
+    assert "db_statement_seconds_total 0.25" in lines
+    # Numeric component values become gauges; strings are left out
+    assert "# TYPE app_cache_hits gauge" in lines
+    assert "app_cache_hits 3" in lines
+    assert 'app_cache_hits{name="loaders"}' not in body
+    assert "backend" not in body
+
+
+def test_label_values_are_escaped(metrics):
+    metrics.record_request("GET", 'a"b\\c\nd', 404, 0.01, stats(0, 0.0, 0.0))
+    assert 'route="a\\"b\\\\c\\nd"' in metrics.render({})
+
+
+def test_middleware_times_the_request_statements(client, metrics):
+    response = client.get("/items/5")
+    assert response.status_code == 200
+    assert 'desc="3 queries"' in response.headers["Server-Timing"]
+
+    client.get("/items/6")
+    body = metrics.render({})
+    # One series per route template, not per path
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in body
+    assert 'http_request_db_statements_total{method="GET",route="/items/{item_id}"} 6' in body
+
+
+def test_slow_statements_are_logged_redacted(client, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_SECONDS", 0.0)
+    with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+        client.get("/items/12345")
+    assert "Slow query" in caplog.text
+    assert "GET /items/12345" in caplog.text
+    assert "parameters=('<int>',)" in caplog.text
+    assert "(12345,)" not in caplog.text
@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+import models.user  # noqa: F401  (wallet_transactions references customers)
+from models.customer_balance import CustomerBalance
+from models.wallet_ledger_checkpoint import WalletLedgerCheckpoint
+from models.wallet_transaction import WalletTransaction
+import services.ledger_service as ledger_service
+from services.ledger_service import LedgerService
+
+CUSTOMER_ID = 1
+START = datetime(2024, 1, 1)
+# (amount, type) of the seeded ledger, one transaction a minute from START
+LEDGER = [("100.00", "add"), ("30.50", "subtract"), ("12.25", "add"), ("81.75", "subtract"),
+          ("40.00", "add"), ("0.01", "subtract"), ("5.00", "add")]
+
+
+@pytest.fixture
+def SessionLocal(monkeypatch, tmp_path):
+    monkeypatch.setattr(ledger_service, "CHECKPOINT_EVERY", 3)
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(ledger_service, "SessionLocal", factory)
+    with factory() as db:
+        add_transactions(db, LEDGER)
+    return factory
+
+
+@pytest.fixture
+def db(SessionLocal):
+    with SessionLocal() as session:
+        yield session
+
+
+def add_transactions(db, entries):
+    balance = db.get(CustomerBalance, CUSTOMER_ID)
+    if balance is None:
+        balance = CustomerBalance(customer_id=CUSTOMER_ID, currencies_balance=Decimal("0.00"))
+        db.add(balance)
+    existing = db.execute(select(func.count()).select_from(WalletTransaction)).scalar()
+    for minute, (amount, kind) in enumerate(entries, start=existing):
+        before = Decimal(balance.currencies_balance)
+        after = before + Decimal(amount) if kind == "add" else before - Decimal(amount)
+        db.add(WalletTransaction(customer_id=CUSTOMER_ID, amount=Decimal(amount), transaction_type=kind,
+                                 balance_before=before, balance_after=after,
+                                 created_at=START + timedelta(minutes=minute)))
+        balance.currencies_balance = after
+    db.commit()
+
+
+def expected_balance(entries):
+    return sum((Decimal(a) if kind == "add" else -Decimal(a) for a, kind in entries), Decimal("0.00"))
+
+
+def test_checkpoints_cover_new_transactions_once(db):
+    assert LedgerService.create_checkpoints(db) == 3
+    assert LedgerService.create_checkpoints(db) == 0
+
+    add_transactions(db, [("1.00", "add")])
+    assert LedgerService.create_checkpoints(db) == 1
+    last = db.execute(
+        select(WalletLedgerCheckpoint).order_by(WalletLedgerCheckpoint.last_transaction_id.desc())
+    ).scalars().first()
+    assert (last.transaction_count, last.balance) == (8, expected_balance(LEDGER) + 1)
+
+
+@pytest.mark.parametrize("checkpointed", [False, True])
+def test_balance_at_matches_the_ledger_up_to_that_time(db, checkpointed):
+    if checkpointed:
+        LedgerService.create_checkpoints(db)
+    for minute in range(len(LEDGER)):
+        at = START + timedelta(minutes=minute, seconds=30)
+        state = LedgerService.balance_at(CUSTOMER_ID, at, db)
+        assert state["balance"] == float(expected_balance(LEDGER[:minute + 1]))
+        assert state["transaction_count"] == minute + 1
+    assert LedgerService.balance_at(CUSTOMER_ID, START - timedelta(days=1), db)["balance"] == 0.0
+
+
+def test_range_summary_totals_the_transactions_in_between(db):
+    LedgerService.create_checkpoints(db)
+    summary = LedgerService.range_summary(CUSTOMER_ID, START, START + timedelta(minutes=4), db)
+    # Transactions after START (exclusive) up to minute 4 (inclusive)
+    assert summary["opening_balance"] == 100.0
+    assert (summary["total_added"], summary["total_subtracted"]) == (52.25, 112.25)
+    assert summary["closing_balance"] == 40.0
+    assert summary["transaction_count"] == 4
+
+    with pytest.raises(ValueError, match="end must not be before start"):
+        LedgerService.range_summary(CUSTOMER_ID, START, START - timedelta(minutes=1), db)
+
+
+def test_verify_reports_a_balance_the_ledger_does_not_add_up_to(db):
+    LedgerService.create_checkpoints(db)
+    assert LedgerService.verify_balances(db) == {"checked": 1, "mismatches": []}
+
+    db.get(CustomerBalance, CUSTOMER_ID).currencies_balance = expected_balance(LEDGER) + Decimal("2.50")
+    db.commit()
+    report = LedgerService.verify_balances(db, [CUSTOMER_ID])
+    assert report["checked"] == 1
+    assert report["mismatches"][0]["difference"] == 2.5
+
+
+def test_periodic_run_logs_mismatches(SessionLocal, caplog):
+    with SessionLocal() as db:
+        db.get(CustomerBalance, CUSTOMER_ID).currencies_balance = Decimal("0.00")
+        db.commit()
+    with caplog.at_level(logging.ERROR, logger=ledger_service.__name__):
+        LedgerService._checkpoint_and_verify()
+    assert "Wallet ledger mismatch" in caplog.text
+    with SessionLocal() as db:
+        assert db.execute(select(func.count()).select_from(WalletLedgerCheckpoint)).scalar() == 3
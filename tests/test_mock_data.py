@@ -0,0 +1,51 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend-mock"))
+
+import mock_data  # noqa: E402
+
+EPOCH = date(2025, 1, 1)
+
+
+def assert_same_columns(left, right):
+    assert set(left) == set(right)
+    for name, value in left.items():
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(value, right[name], err_msg=name)
+        else:
+            assert value == right[name], name
+
+
+def test_same_count_and_seed_give_the_same_orders():
+    assert_same_columns(mock_data.generate_columns(300, 7), mock_data.generate_columns(300, 7))
+    other = mock_data.generate_columns(300, 8)
+    assert not np.array_equal(mock_data.generate_columns(300, 7)["amount"], other["amount"])
+
+
+def test_cache_round_trip(tmp_path, monkeypatch):
+    generated = mock_data.generate_columns(300, 7)
+    first = mock_data.load_or_generate(300, 7, str(tmp_path), EPOCH)
+    assert_same_columns(first, mock_data._resolve_dates(generated, EPOCH))
+    (cached,) = os.listdir(tmp_path)
+    assert cached == f"orders-300-seed7-v{mock_data.GENERATOR_VERSION}"
+
+    # The second start maps the cache instead of generating again
+    monkeypatch.setattr(mock_data, "generate_columns", lambda count, seed: pytest.fail("regenerated"))
+    second = mock_data.load_or_generate(300, 7, str(tmp_path), EPOCH)
+    assert isinstance(second["amount"], np.memmap)
+    assert_same_columns(first, second)
+
+
+def test_one_cache_serves_any_epoch(tmp_path):
+    january = mock_data.load_or_generate(300, 7, str(tmp_path), EPOCH)
+    march = mock_data.load_or_generate(300, 7, str(tmp_path), date(2025, 3, 1))
+    np.testing.assert_array_equal(march["date"] - january["date"], 59)
+    assert (january["date"] < EPOCH.toordinal()).all()
+    assert (january["date"] >= EPOCH.toordinal() - mock_data.DAYS).all()
+    assert len(os.listdir(tmp_path)) == 1
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+from models.ordersReal import Order
+import orderfetch
+from orderfetch import fetch_order_view
+from services.order_count_cache import OrderCountCache, order_count_cache
+from services.response_cache import response_cache
+
+BUYER_ID = 1
+
+
+@pytest.fixture
+def db():
+    order_count_cache.clear()
+    response_cache.clear()
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([make_order(orders_id) for orders_id in range(1, 6)])
+        session.commit()
+        yield session
+    order_count_cache.clear()
+
+
+def make_order(orders_id):
+    return Order(orders_id=orders_id, orders_serial=f"S{orders_id:06d}", orders_buyer_id=BUYER_ID,
+                 orders_status="OS", date_purchased=datetime(2024, 1, 1))
+
+
+def insert_behind_the_orm(db, orders_id):
+    db.execute(text("INSERT INTO orders (orders_id, orders_buyer_id) VALUES (:id, :buyer)"),
+               {"id": orders_id, "buyer": BUYER_ID})
+    db.commit()
+
+
+def count(db, count_mode="exact"):
+    page = fetch_order_view(db, "all", BUYER_ID, page_size=2, count_mode=count_mode, use_cache=False)
+    return page["total_count"], page["count_exact"]
+
+
+def test_exact_count_is_cached_until_orders_change(db):
+    assert count(db) == (5, True)
+    insert_behind_the_orm(db, 6)
+    assert count(db) == (5, True)
+
+    db.add(make_order(7))
+    db.commit()
+    assert count(db) == (7, True)
+
+
+def test_estimate_serves_a_stale_count_and_caps_a_fresh_one(db, monkeypatch):
+    assert count(db) == (5, True)
+    insert_behind_the_orm(db, 6)
+    assert count(db, "estimate") == (5, False)
+
+    order_count_cache.clear()
+    monkeypatch.setattr(orderfetch, "ESTIMATE_COUNT_CAP", 3)
+    assert count(db, "estimate") == (3, False)
+
+
+def test_small_estimate_is_exact_and_cached(db):
+    assert count(db, "estimate") == (5, True)
+    insert_behind_the_orm(db, 6)
+    assert count(db) == (5, True)
+
+
+def test_count_mode_none_skips_counting(db):
+    assert count(db, "none") == (None, False)
+
+
+def test_unknown_count_mode_is_rejected(db):
+    with pytest.raises(ValueError, match="count_mode"):
+        count(db, "approximate")
+
+
+def test_entries_expire_and_follow_the_generation():
+    generations = {BUYER_ID: 1}
+    cache = OrderCountCache(ttl=60, generation=generations.get)
+    cache.set(BUYER_ID, "all", 5, 1)
+    assert cache.get(BUYER_ID, "all") == 5
+    assert cache.get(BUYER_ID, "all", max_age=-1) is None
+
+    # Another worker invalidated the user through the shared generation
+    generations[BUYER_ID] = 2
+    assert cache.get(BUYER_ID, "all") is None
+    # A count taken before the change is not stored under the new generation
+    cache.set(BUYER_ID, "all", 5, 1)
+    assert cache.get(BUYER_ID, "all") is None
+
+
+def test_changes_of_any_user_drop_the_all_buyers_counts():
+    cache = OrderCountCache()
+    cache.set(0, "all", 10, 0)
+    cache.set(2, "all", 3, 0)
+    cache.invalidate({BUYER_ID})
+    assert cache.get(0, "all") is None
+    assert cache.get(2, "all") == 3
@@ -0,0 +1,91 @@
+import io
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend-mock"))
+
+import order_import  # noqa: E402
+from order_import import CSVImportError, ImportStats, import_orders  # noqa: E402
+
+HEADER = "order-id,order-item-id,sku,quantity-purchased,consumer_price,recipient-name\n"
+
+
+def csv_bytes(rows):
+    return (HEADER + "".join(rows)).encode()
+
+
+def row(n, quantity="1", name="Asha"):
+    return f"O{n},I{n},SKU{n},{quantity},10.50,{name}\n"
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(order_import.SCHEMA)
+    yield conn
+    conn.close()
+
+
+def count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_rows_are_upserted_in_batches_and_bad_rows_reported_by_line(conn):
+    data = csv_bytes([row(1), row(2, quantity="x"), row(3), "\n", row(4, quantity="0"), row(1)])
+    batches = []
+    stats = import_orders(io.BytesIO(data), conn, batch_size=2, on_batch=lambda s, offset: batches.append(offset))
+
+    assert stats.rows_processed == 3
+    assert stats.rows_rejected == 2
+    assert stats.errors == ["line 3: quantity-purchased is not a number", "line 6: quantity-purchased must be positive"]
+    assert count(conn, "imported_orders") == 2
+    assert count(conn, "imported_order_items") == 2
+    assert batches[-1] == len(data)
+    assert stats.bytes_processed == len(data)
+
+
+def test_quoted_field_spanning_lines_keeps_later_line_numbers(conn):
+    data = csv_bytes([row(1, name='"Asha\nKumar"'), row(2, quantity="x")])
+    stats = import_orders(io.BytesIO(data), conn)
+    assert conn.execute("SELECT recipient_name FROM imported_orders").fetchone()[0] == "Asha\nKumar"
+    assert stats.errors == ["line 4: quantity-purchased is not a number"]
+
+
+def test_resumed_import_continues_offsets_and_line_numbers(conn):
+    data = csv_bytes([row(1), row(2), row(3), row(4, quantity="x"), row(5), row(6, quantity="x")])
+    checkpoints = []
+
+    class Stop(Exception):
+        pass
+
+    def stop_after_first_batch(stats, offset):
+        checkpoints.append((offset, stats.rows_processed, stats.lines_read))
+        if len(checkpoints) == 2:
+            raise Stop
+
+    with pytest.raises(Stop):
+        import_orders(io.BytesIO(data), conn, batch_size=2, on_batch=stop_after_first_batch)
+    # The second batch rolled back with its checkpoint; resume from the first
+    offset, rows_processed, lines_read = checkpoints[0]
+    assert (rows_processed, lines_read) == (2, 3)
+    assert count(conn, "imported_orders") == 2
+
+    stats = import_orders(io.BytesIO(data), conn, batch_size=2, start_offset=offset,
+                          stats=ImportStats(rows_processed=rows_processed, lines_read=lines_read))
+    assert stats.rows_processed == 4
+    assert stats.errors == ["line 5: quantity-purchased is not a number", "line 7: quantity-purchased is not a number"]
+    assert count(conn, "imported_orders") == 4
+
+
+def test_missing_columns_fail_the_whole_file(conn):
+    with pytest.raises(CSVImportError, match="Missing required columns: sku"):
+        import_orders(io.BytesIO(b"order-id,order-item-id,quantity-purchased,consumer_price\n"), conn)
+
+
+def test_invalid_utf8_names_its_line(conn):
+    data = csv_bytes([row(1)]) + b"O2,I2,SKU2,1,1.00,\xff\n"
+    with pytest.raises(CSVImportError, match="Line 3 is not valid UTF-8"):
+        import_orders(io.BytesIO(data), conn)
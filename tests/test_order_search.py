@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+from models.ordersReal import Order
+from models.order_search_document import OrderSearchDocument
+import services.order_search as order_search
+from services.order_search import backfill_search_documents, search_clause
+
+BUYER_ID = 1
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(order_search, "search_documents_ready", False)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([
+            make_order(1, "S-100", "Asha 2024"),
+            make_order(2, "S-1000", "Ravi"),
+            make_order(3, "4711", "Meena"),
+        ])
+        session.commit()
+        yield session
+
+
+def make_order(orders_id, serial, name):
+    return Order(
+        orders_id=orders_id, orders_serial=serial, orders_buyer_id=BUYER_ID, delivery_name=name,
+        orders_status="OS", date_purchased=datetime(2024, 1, 1),
+    )
+
+
+def search(db, term):
+    clause = search_clause(term, BUYER_ID, db.get_bind().dialect.name)
+    return sorted(db.execute(select(Order.orders_id).where(clause)).scalars())
+
+
+@pytest.mark.parametrize("ready", [False, True])
+def test_search_keeps_exact_ids_and_name_match(db, monkeypatch, ready):
+    if ready:
+        backfill_search_documents(db)
+        monkeypatch.setattr(order_search, "search_documents_ready", True)
+    # A serial that is not all digits matches exactly, not as a substring
+    assert search(db, "S-100") == [1]
+    # An all-digit term is a serial lookup and a name match
+    assert search(db, "2024") == [1]
+    assert search(db, "4711") == [3]
+    assert search(db, "ravi") == [2]
+
+
+def test_backfill_writes_missing_documents_only(db):
+    db.execute(delete(OrderSearchDocument).where(OrderSearchDocument.orders_id != 2))
+    db.commit()
+    assert backfill_search_documents(db, batch_size=1) == 2
+    assert sorted(db.execute(select(OrderSearchDocument.orders_id)).scalars()) == [1, 2, 3]
+    assert backfill_search_documents(db) == 0
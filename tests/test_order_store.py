@@ -0,0 +1,85 @@
+import itertools
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend-mock"))
+
+from orderController import generate_mock_orders, iter_mock_orders  # noqa: E402
+from order_store import OrderStore  # noqa: E402
+
+EPOCH = date(2025, 1, 1)
+DATES = [None, "", "2024-11-15", "2024-12-01", "2024-12-31", "2025-02-01", "2024-13-01", "not a date"]
+SEARCHES = [None, " ", "ord-1001", "CUSTOMER 4", "5", "nobody"]
+SOURCES = [None, "All", "Amazon", "Shopify", "eBay"]
+STATUSES = [None, "shipped", "ticketed", "refunded"]
+
+
+def baseline_filter(orders, from_date=None, to_date=None, order_search_item=None, source_option=None, status=None):
+    """The list-scanning filter_orders OrderStore replaced."""
+    def day(value):
+        return datetime.strptime(value, "%Y-%m-%d")
+
+    def valid(value):
+        try:
+            return value and value.strip() and day(value)
+        except ValueError:
+            return None
+
+    result = orders
+    if status:
+        result = [order for order in result if order["status"] == status]
+    if source_option and source_option != "All":
+        result = [order for order in result if order["marketplace"] == source_option]
+    if valid(from_date):
+        result = [order for order in result if day(order["date_purchased"]) >= day(from_date)]
+    if valid(to_date):
+        result = [order for order in result if day(order["date_purchased"]) <= day(to_date)]
+    if order_search_item and order_search_item.strip():
+        term = order_search_item.lower()
+        result = [order for order in result
+                  if term in order["order_id"].lower() or term in order["delivery_name"].lower()]
+    return result
+
+
+@pytest.fixture(scope="module")
+def orders():
+    return generate_mock_orders(500, seed=7, epoch=EPOCH)
+
+
+@pytest.fixture(scope="module")
+def store(orders):
+    return OrderStore(orders)
+
+
+@pytest.mark.parametrize("from_date, to_date", list(itertools.product(DATES, DATES)))
+def test_date_ranges_match_the_baseline(orders, store, from_date, to_date):
+    assert list(store.filter(from_date, to_date)) == baseline_filter(orders, from_date, to_date)
+
+
+@pytest.mark.parametrize("search, source, status", list(itertools.product(SEARCHES, SOURCES, STATUSES)))
+def test_combined_filters_match_the_baseline(orders, store, search, source, status):
+    args = ("2024-11-20", "2024-12-20", search, source, status)
+    assert list(store.filter(*args)) == baseline_filter(orders, *args)
+
+
+def test_selection_slices_like_a_list(orders, store):
+    selection = store.filter(source_option="Amazon")
+    expected = baseline_filter(orders, source_option="Amazon")
+    assert len(selection) == len(expected)
+    assert selection[5:25] == expected[5:25]
+    assert selection[-1] is expected[-1]
+
+
+def test_get_by_order_id(orders, store):
+    assert store.get("ORD-100042") is orders[41]
+    assert store.get("ORD-1") is None
+
+
+def test_generated_orders_are_reproducible_and_anchored_on_the_epoch(orders):
+    assert list(iter_mock_orders(500, seed=7, epoch=EPOCH)) == orders
+    assert generate_mock_orders(500, seed=8, epoch=EPOCH) != orders
+    days = {date.fromisoformat(order["date_purchased"]) for order in orders}
+    assert date(2024, 11, 2) <= min(days) and max(days) <= date(2024, 12, 31)
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+from models.ordersReal import Order
+from models.order_status_summary import OrderStatusSummary
+import services.order_summary_service as order_summary_service
+from services.order_summary_service import OrderSummaryService
+
+BUYER_ID = 1
+
+
+@pytest.fixture
+def SessionLocal(monkeypatch, tmp_path):
+    # A file database, so separate sessions get separate connections
+    engine = create_engine(f"sqlite:///{tmp_path / 'orders.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    monkeypatch.setattr(order_summary_service, "SessionLocal", factory)
+    return factory
+
+
+def make_order(orders_id, status="OS"):
+    return Order(
+        orders_id=orders_id, orders_serial=f"S{orders_id:06d}", orders_buyer_id=BUYER_ID,
+        orders_status=status, orders_status_payment="PD", orders_status_shipping="SS",
+        orders_status_return="NA", orders_status_dispute="DN", date_purchased=datetime(2024, 1, 1),
+    )
+
+
+def counts(SessionLocal):
+    with SessionLocal() as db:
+        return OrderSummaryService.get_order_summary(BUYER_ID, db)["counts"]
+
+
+def seed(SessionLocal, *orders):
+    with SessionLocal() as db:
+        db.add_all(orders)
+        db.commit()
+        OrderSummaryService.reconcile_order_summaries(db, [BUYER_ID])
+
+
+def test_status_change_on_expired_order_moves_counters(SessionLocal):
+    seed(SessionLocal, make_order(1, "OS"))
+    assert counts(SessionLocal)["wait_for_confirm"] == 1
+
+    with SessionLocal() as db:
+        order = db.get(Order, 1)
+        db.commit()  # expires every attribute of the order
+        order.orders_status = "OC"
+        db.commit()
+
+    summary = counts(SessionLocal)
+    assert summary["wait_for_confirm"] == 0
+    assert summary["cancelled"] == 1
+    assert summary["all"] == 1
+
+
+def test_deleting_expired_order_decrements_counters(SessionLocal):
+    seed(SessionLocal, make_order(1, "OC"), make_order(2, "OS"))
+
+    with SessionLocal() as db:
+        order = db.get(Order, 1)
+        db.commit()
+        db.delete(order)
+        db.commit()
+
+    summary = counts(SessionLocal)
+    assert summary["cancelled"] == 0
+    assert summary["wait_for_confirm"] == 1
+    assert summary["all"] == 1
+
+
+def test_first_summary_read_leaves_callers_transaction_open(SessionLocal):
+    seed(SessionLocal, make_order(1))
+    with SessionLocal() as db:
+        db.query(OrderStatusSummary).delete()
+        db.commit()
+
+    with SessionLocal() as db:
+        db.add(make_order(2))
+        assert OrderSummaryService.get_order_summary(BUYER_ID, db)["counts"]["all"] == 1
+        db.rollback()
+        assert db.get(Order, 2) is None
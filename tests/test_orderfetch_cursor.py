@@ -0,0 +1,76 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+from models.ordersReal import Order
+from orderfetch import SORT_KEYS, decode_cursor, encode_cursor, fetch_order_view
+
+BUYER_ID = 1
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        # Repeated and missing sort values, so ties and NULLs cross page boundaries
+        for orders_id, day, price in [(1, 3, "10.00"), (2, 1, "20.00"), (3, 3, "10.00"), (4, None, None),
+                                      (5, 2, "5.50"), (6, 3, None), (7, 1, "20.00")]:
+            when = datetime(2024, 1, day) if day else None
+            session.add(Order(
+                orders_id=orders_id, orders_serial=f"S{orders_id % 3}", orders_buyer_id=BUYER_ID,
+                orders_status="OS", orders_status_payment="PD", orders_status_shipping="SS",
+                orders_status_return="NA", orders_status_dispute="DN", date_purchased=when, last_modified=when,
+                currency_value=Decimal(price) if price else None, orders_shipping_fee=Decimal("1.00"),
+            ))
+        session.add(Order(orders_id=8, orders_serial="other", orders_buyer_id=2, date_purchased=datetime(2024, 1, 1)))
+        session.commit()
+        yield session
+
+
+def ids(page):
+    return [order["order_id"] for order in page["orders"]]
+
+
+@pytest.mark.parametrize("store_by", sorted(SORT_KEYS))
+def test_cursor_pages_match_the_full_ordering(db, store_by):
+    expected = ids(fetch_order_view(db, "all", BUYER_ID, page_size=None, store_by=store_by, use_cache=False))
+    assert sorted(expected) == [1, 2, 3, 4, 5, 6, 7]
+
+    seen, cursor = [], None
+    while True:
+        page = fetch_order_view(db, "all", BUYER_ID, page_size=2, store_by=store_by, cursor=cursor,
+                                use_cache=False, count_mode="none")
+        seen += ids(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_offset_pages_end_without_cursor(db):
+    last = fetch_order_view(db, "all", BUYER_ID, page=4, page_size=2, store_by="date", use_cache=False)
+    assert len(last["orders"]) == 1
+    assert last["next_cursor"] is None
+
+
+def test_cursor_round_trips_datetime_and_decimal_keys(db):
+    order = db.get(Order, 1)
+    assert decode_cursor(encode_cursor("datedesc", order), "datedesc") == (datetime(2024, 1, 3), 1)
+    assert decode_cursor(encode_cursor("price", order), "price") == (Decimal("11.00"), 1)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "eyJzIjoiZGF0ZSJ9"])
+def test_invalid_cursor_is_rejected(db, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        fetch_order_view(db, "all", BUYER_ID, store_by="date", cursor=cursor, use_cache=False)
+
+
+def test_cursor_of_another_sort_order_is_rejected(db):
+    cursor = encode_cursor("date", db.get(Order, 1))
+    with pytest.raises(ValueError, match="sort order"):
+        fetch_order_view(db, "all", BUYER_ID, store_by="price", cursor=cursor, use_cache=False)
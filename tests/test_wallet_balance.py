@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+import models.user  # noqa: F401  (wallet_transactions references customers)
+from models.customer_balance import CustomerBalance
+from models.wallet_transaction import WalletTransaction
+from services.stats_service import StatsService
+
+CUSTOMER_ID = 1
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def balance(db, customer_id=CUSTOMER_ID):
+    return db.execute(
+        select(CustomerBalance.currencies_balance).where(CustomerBalance.customer_id == customer_id)
+    ).scalar()
+
+
+def transactions(db):
+    return db.execute(select(func.count()).select_from(WalletTransaction)).scalar()
+
+
+def test_first_add_creates_the_balance_and_amounts_stay_exact(db):
+    StatsService.update_reseller_balance(CUSTOMER_ID, 0.1, "add", "top up", db)
+    result = StatsService.update_reseller_balance(CUSTOMER_ID, "0.2", "add", "top up", db)
+    assert result["old_balance"] == 0.1
+    assert result["new_balance"] == 0.3
+    assert balance(db) == Decimal("0.30")
+
+    result = StatsService.update_reseller_balance(CUSTOMER_ID, "0.30", "subtract", "order", db)
+    assert balance(db) == Decimal("0.00")
+    ledger = db.get(WalletTransaction, result["transaction_id"])
+    assert (ledger.balance_before, ledger.balance_after) == (Decimal("0.30"), Decimal("0.00"))
+
+
+def test_subtract_beyond_the_balance_changes_nothing(db):
+    StatsService.update_reseller_balance(CUSTOMER_ID, 10, "add", "top up", db)
+    with pytest.raises(ValueError, match="Insufficient balance"):
+        StatsService.update_reseller_balance(CUSTOMER_ID, "10.01", "subtract", "order", db)
+    db.rollback()
+    assert balance(db) == Decimal("10.00")
+    assert transactions(db) == 1
+
+
+def test_subtract_without_a_balance_row_is_insufficient(db):
+    with pytest.raises(ValueError, match="Insufficient balance"):
+        StatsService.update_reseller_balance(CUSTOMER_ID, 1, "subtract", "order", db)
+    db.rollback()
+    assert balance(db) is None
+
+
+@pytest.mark.parametrize("amount, transaction_type, message", [
+    (0, "add", "Amount must be positive"),
+    ("-5", "add", "Amount must be positive"),
+    (1, "refund", "Invalid transaction type"),
+])
+def test_invalid_updates_are_rejected(db, amount, transaction_type, message):
+    with pytest.raises(ValueError, match=message):
+        StatsService.update_reseller_balance(CUSTOMER_ID, amount, transaction_type, "", db)
+
+
+def test_batch_applies_every_update_in_input_order(db):
+    results = StatsService.apply_balance_updates([
+        {"customer_id": 2, "amount": 5, "transaction_type": "add", "description": ""},
+        {"customer_id": 1, "amount": 7, "transaction_type": "add", "description": ""},
+        {"customer_id": 2, "amount": 3, "transaction_type": "subtract", "description": ""},
+    ], db)
+    assert [(r["customer_id"], r["new_balance"]) for r in results] == [(2, 5.0), (1, 7.0), (2, 2.0)]
+    assert (balance(db, 1), balance(db, 2)) == (Decimal("7.00"), Decimal("2.00"))
+
+
+def test_batch_with_one_failing_update_rolls_back_entirely(db):
+    StatsService.update_reseller_balance(CUSTOMER_ID, 10, "add", "top up", db)
+    with pytest.raises(ValueError, match="Update 1: Insufficient balance"):
+        StatsService.apply_balance_updates([
+            {"customer_id": CUSTOMER_ID, "amount": 4, "transaction_type": "subtract", "description": ""},
+            {"customer_id": CUSTOMER_ID, "amount": 7, "transaction_type": "subtract", "description": ""},
+            {"customer_id": 2, "amount": 1, "transaction_type": "add", "description": ""},
+        ], db)
+    assert balance(db) == Decimal("10.00")
+    assert balance(db, 2) is None
+    assert transactions(db) == 1
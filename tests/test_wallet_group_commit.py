@@ -0,0 +1,105 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+import models.user  # noqa: F401  (wallet_transactions references customers)
+from models.customer_balance import CustomerBalance
+from models.wallet_transaction import WalletTransaction
+from services.stats_service import StatsService
+from services.wallet_group_commit import WalletGroupCommitter
+
+CUSTOMER_ID = 1
+
+
+class InlineExecutor:
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+@pytest.fixture
+def SessionLocal():
+    engine = create_engine("sqlite://")
+
+    # pysqlite defers BEGIN until the first write, which breaks SAVEPOINT;
+    # emit it ourselves (the SQLAlchemy recipe for SQLite savepoints)
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(CustomerBalance(customer_id=CUSTOMER_ID, currencies_balance=Decimal("10.00")))
+        db.commit()
+    return factory
+
+
+def update(amount, transaction_type="subtract", customer_id=CUSTOMER_ID):
+    return customer_id, amount, transaction_type, "test"
+
+
+def run_group(committer, *updates):
+    async def submit_all():
+        return await asyncio.gather(*(committer.submit(*u) for u in updates), return_exceptions=True)
+    return asyncio.run(submit_all())
+
+
+def test_failing_update_does_not_poison_its_group(SessionLocal):
+    committer = WalletGroupCommitter(SessionLocal, window=0.01, executor=InlineExecutor())
+    results = run_group(committer, update(4), update(20), update(5, "add"), update(6), update(1, "add", customer_id=2))
+
+    assert isinstance(results[1], ValueError) and "Insufficient balance" in str(results[1])
+    assert [r["new_balance"] for i, r in enumerate(results) if i != 1] == [6.0, 11.0, 5.0, 1.0]
+    assert (committer.groups_committed, committer.updates_committed) == (1, 4)
+
+    with SessionLocal() as db:
+        assert db.get(CustomerBalance, CUSTOMER_ID).currencies_balance == Decimal("5.00")
+        assert db.get(CustomerBalance, 2).currencies_balance == Decimal("1.00")
+        assert db.execute(select(func.count()).select_from(WalletTransaction)).scalar() == 4
+
+
+def test_update_failing_after_its_writes_is_rolled_back_alone(SessionLocal, monkeypatch):
+    record = StatsService._record_balance_change
+
+    def fail_after_writing(**update):
+        transaction = record(**update)
+        if update["description"] == "fails late":
+            raise ValueError("Rejected after writing")
+        return transaction
+
+    monkeypatch.setattr(StatsService, "_record_balance_change", staticmethod(fail_after_writing))
+    committer = WalletGroupCommitter(SessionLocal, window=0.01, executor=InlineExecutor())
+    results = run_group(committer, update(1), (CUSTOMER_ID, 3, "subtract", "fails late"), update(2))
+
+    assert isinstance(results[1], ValueError)
+    assert [results[0]["new_balance"], results[2]["new_balance"]] == [9.0, 7.0]
+    with SessionLocal() as db:
+        assert db.get(CustomerBalance, CUSTOMER_ID).currencies_balance == Decimal("7.00")
+        assert db.execute(select(func.count()).select_from(WalletTransaction)).scalar() == 2
+
+
+def test_full_group_is_committed_without_waiting_for_the_window(SessionLocal):
+    committer = WalletGroupCommitter(SessionLocal, window=60, max_batch=2, executor=InlineExecutor())
+    results = run_group(committer, update(1), update(2))
+    assert [r["new_balance"] for r in results] == [9.0, 7.0]
+    assert committer.groups_committed == 1
+
+
+def test_commit_failure_reaches_every_caller(SessionLocal):
+    class FailingExecutor:
+        async def run(self, fn, *args):
+            raise RuntimeError("database is gone")
+
+    committer = WalletGroupCommitter(SessionLocal, window=0.01, executor=FailingExecutor())
+    results = run_group(committer, update(1), update(2))
+    assert all(isinstance(r, RuntimeError) for r in results)
+    with SessionLocal() as db:
+        assert db.get(CustomerBalance, CUSTOMER_ID).currencies_balance == Decimal("10.00")
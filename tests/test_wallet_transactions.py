@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base
+import models.user  # noqa: F401  (wallet_transactions references customers)
+from models.wallet_transaction import WalletTransaction
+from services.stats_service import StatsService, encode_transaction_cursor
+
+CUSTOMER_ID = 1
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        # 12 transactions, three per second, alternating add/subtract
+        for i in range(12):
+            session.add(WalletTransaction(
+                customer_id=CUSTOMER_ID, amount=Decimal("1.00"),
+                transaction_type="add" if i % 2 == 0 else "subtract",
+                description=f"tx {i}", balance_before=Decimal("0.00"), balance_after=Decimal("0.00"),
+                created_at=START + timedelta(seconds=i // 3),
+            ))
+        session.add(WalletTransaction(
+            customer_id=2, amount=Decimal("1.00"), transaction_type="add", description="other customer",
+            balance_before=Decimal("0.00"), balance_after=Decimal("0.00"), created_at=START,
+        ))
+        session.commit()
+        yield session
+
+
+def walk(db, transaction_type=None, page_size=5):
+    """Follow next_cursor until the last page; returns the ids in page order."""
+    ids, cursor = [], None
+    while True:
+        page = StatsService.get_wallet_transactions(CUSTOMER_ID, transaction_type, page_size=page_size,
+                                                    db=db, cursor=cursor, include_count=False)
+        ids.extend(t["id"] for t in page["transactions"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def newest_first(db, transaction_type=None):
+    query = db.query(WalletTransaction).filter(WalletTransaction.customer_id == CUSTOMER_ID)
+    if transaction_type:
+        query = query.filter(WalletTransaction.transaction_type == transaction_type)
+    return [t.id for t in query.order_by(WalletTransaction.created_at.desc(), WalletTransaction.id.desc())]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 5, 12, 20])
+def test_cursor_pages_cover_the_history_once_across_equal_timestamps(db, page_size):
+    assert walk(db, page_size=page_size) == newest_first(db)
+
+
+def test_cursor_and_offset_pages_agree(db):
+    first = StatsService.get_wallet_transactions(CUSTOMER_ID, page_size=4, db=db)
+    assert first["total_count"] == 12
+    by_offset = StatsService.get_wallet_transactions(CUSTOMER_ID, page=2, page_size=4, db=db)
+    by_cursor = StatsService.get_wallet_transactions(CUSTOMER_ID, page_size=4, db=db, cursor=first["next_cursor"])
+    assert by_cursor["transactions"] == by_offset["transactions"]
+
+
+def test_cursor_respects_the_transaction_type_filter(db):
+    ids = walk(db, "subtract", page_size=2)
+    assert ids == newest_first(db, "subtract")
+    assert len(ids) == 6
+
+
+def test_last_page_has_no_cursor(db):
+    page = StatsService.get_wallet_transactions(CUSTOMER_ID, page_size=12, db=db, include_count=False)
+    assert page["next_cursor"] is None
+    assert page["total_count"] is None
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "eyJ0IjpudWxsLCJhdCI6IngiLCJpZCI6MX0"])
+def test_malformed_cursor_is_rejected(db, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        StatsService.get_wallet_transactions(CUSTOMER_ID, db=db, cursor=cursor)
+
+
+def test_cursor_from_another_filter_is_rejected(db):
+    transaction = db.get(WalletTransaction, 5)
+    with pytest.raises(ValueError, match="transaction_type"):
+        StatsService.get_wallet_transactions(CUSTOMER_ID, "add", db=db,
+                                             cursor=encode_transaction_cursor(transaction, "subtract"))